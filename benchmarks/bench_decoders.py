@@ -0,0 +1,125 @@
+"""
+Compare the JSON decoder backends on recorded exchange payloads.
+
+    python3 benchmarks/bench_decoders.py --record   # download fresh payloads into benchmarks/payloads
+    python3 benchmarks/bench_decoders.py            # benchmark every installed backend
+
+Without recorded payloads, synthetic ones shaped like the real responses are generated.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+
+from cex_adaptors.exchanges.decoder import DECODERS
+
+PAYLOAD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "payloads")
+
+PAYLOAD_URLS = {
+    "binance_spot_exchange_info": "https://api.binance.com/api/v3/exchangeInfo",
+    "binance_spot_tickers": "https://api.binance.com/api/v3/ticker/24hr",
+    "binance_spot_depth_5000": "https://api.binance.com/api/v3/depth?symbol=BTCUSDT&limit=5000",
+    "binance_linear_exchange_info": "https://fapi.binance.com/fapi/v1/exchangeInfo",
+    "okx_swap_instruments": "https://www.okx.com/api/v5/public/instruments?instType=SWAP",
+    "okx_tickers": "https://www.okx.com/api/v5/market/tickers?instType=SPOT",
+}
+
+
+async def record() -> None:
+    import aiohttp
+
+    os.makedirs(PAYLOAD_DIR, exist_ok=True)
+    async with aiohttp.ClientSession() as session:
+        for name, url in PAYLOAD_URLS.items():
+            async with session.get(url) as response:
+                body = await response.read()
+            with open(os.path.join(PAYLOAD_DIR, f"{name}.json"), "wb") as f:
+                f.write(body)
+            print(f"recorded {name}: {len(body) / 1e6:.2f} MB")
+
+
+def synthesize() -> dict:
+    rng = random.Random(0)
+
+    def price() -> str:
+        return f"{rng.uniform(0.0001, 70000):.8f}"
+
+    symbols = [
+        {
+            "symbol": f"COIN{i}USDT",
+            "status": "TRADING",
+            "baseAsset": f"COIN{i}",
+            "quoteAsset": "USDT",
+            "baseAssetPrecision": 8,
+            "quotePrecision": 8,
+            "orderTypes": ["LIMIT", "LIMIT_MAKER", "MARKET", "STOP_LOSS_LIMIT", "TAKE_PROFIT_LIMIT"],
+            "isSpotTradingAllowed": True,
+            "isMarginTradingAllowed": bool(i % 2),
+            "filters": [
+                {"filterType": "PRICE_FILTER", "minPrice": "0.01", "maxPrice": "1000000.00", "tickSize": "0.01"},
+                {"filterType": "LOT_SIZE", "minQty": "0.00001", "maxQty": "9000.0", "stepSize": "0.00001"},
+                {"filterType": "NOTIONAL", "minNotional": "5.0", "applyMinToMarket": True},
+            ],
+            "permissions": ["SPOT", "MARGIN"],
+        }
+        for i in range(2500)
+    ]
+    tickers = [
+        {
+            "symbol": f"COIN{i}USDT",
+            "priceChange": price(),
+            "lastPrice": price(),
+            "bidPrice": price(),
+            "askPrice": price(),
+            "volume": price(),
+            "quoteVolume": price(),
+            "openTime": 1700000000000,
+            "closeTime": 1700086400000,
+            "count": rng.randint(0, 10**6),
+        }
+        for i in range(2500)
+    ]
+    depth = {
+        "lastUpdateId": 1027024,
+        "bids": [[price(), price()] for _ in range(5000)],
+        "asks": [[price(), price()] for _ in range(5000)],
+    }
+    payloads = {"exchange_info": {"symbols": symbols}, "tickers": tickers, "depth_5000": depth}
+    return {f"synthetic_{name}": json.dumps(payload).encode() for name, payload in payloads.items()}
+
+
+def load_payloads() -> dict:
+    if not os.path.isdir(PAYLOAD_DIR):
+        return synthesize()
+    payloads = {}
+    for file in sorted(os.listdir(PAYLOAD_DIR)):
+        if file.endswith(".json"):
+            with open(os.path.join(PAYLOAD_DIR, file), "rb") as f:
+                payloads[file[:-5]] = f.read()
+    return payloads or synthesize()
+
+
+def bench(payloads: dict, rounds: int) -> None:
+    print(f"{'payload':<34}{'MB':>7}" + "".join(f"{name:>12}" for name in DECODERS))
+    for name, body in payloads.items():
+        timings = []
+        for decoder in DECODERS.values():
+            decoder(body)
+            start = time.perf_counter()
+            for _ in range(rounds):
+                decoder(body)
+            timings.append((time.perf_counter() - start) / rounds * 1000)
+        print(f"{name:<34}{len(body) / 1e6:>7.2f}" + "".join(f"{t:>10.2f}ms" for t in timings))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--record", action="store_true", help="download fresh payloads before benchmarking")
+    parser.add_argument("--rounds", type=int, default=20, help="decodes per payload and backend")
+    args = parser.parse_args()
+
+    if args.record:
+        asyncio.run(record())
+    bench(load_payloads(), args.rounds)
@@ -0,0 +1,110 @@
+"""
+Compare compiled parser specs with the per-field loop they replace on a 5000 instrument payload.
+
+    python3 benchmarks/bench_exchange_info.py
+
+The loop baseline evaluates shared values once per field using them, as the specs did before they were compiled.
+"""
+import argparse
+import inspect
+import time
+
+from cex_adaptors.parsers.base import Parser
+from cex_adaptors.parsers.binance import BinanceParser
+from cex_adaptors.parsers.gateio import GateioParser
+from cex_adaptors.parsers.htx import HtxParser
+
+INSTRUMENTS = 5000
+
+
+def binance_spot(i: int) -> dict:
+    return {
+        "symbol": f"COIN{i}USDT",
+        "status": "TRADING",
+        "baseAsset": f"COIN{i}",
+        "quoteAsset": "USDT",
+        "isMarginTradingAllowed": bool(i % 2),
+    }
+
+
+def binance_linear(i: int) -> dict:
+    return {
+        "symbol": f"1000COIN{i}USDT",
+        "status": "TRADING",
+        "contractType": "PERPETUAL",
+        "baseAsset": f"1000COIN{i}",
+        "quoteAsset": "USDT",
+        "marginAsset": "USDT",
+        "onboardDate": 1569398400000,
+        "deliveryDate": 4133404800000,
+    }
+
+
+def htx_linear(i: int) -> dict:
+    return {
+        "contract_code": f"COIN{i}-USDT-240628",
+        "pair": f"COIN{i}-USDT",
+        "business_type": "futures",
+        "contract_status": 1,
+        "create_date": "20240101",
+        "delivery_date": "20240628",
+        "contract_size": 0.001,
+        "price_tick": 0.1,
+    }
+
+
+def gateio_futures(i: int) -> dict:
+    return {
+        "name": f"COIN{i}_USDT_20240628",
+        "settle": "USDT",
+        "in_delisting": False,
+        "expire_time": 1719561600,
+        "quanto_multiplier": "0.0001",
+    }
+
+
+def loop_spec(spec) -> dict:
+    """
+    The spec as an uncompiled dict, recomputing shared values inside every field that needs them
+    """
+
+    def bind(field, args):
+        return lambda x: field(x, *[spec.shared[arg](x) for arg in args])
+
+    loop = {}
+    for key, value in spec.items():
+        args = list(inspect.signature(value).parameters)[1:] if callable(value) else []
+        loop[key] = bind(value, args) if args else value
+    return loop
+
+
+def bench(rounds: int) -> None:
+    cases = {
+        "binance spot": (BinanceParser().spot_exchange_info_parser, binance_spot),
+        "binance linear": (BinanceParser().futures_exchange_info_parser("linear"), binance_linear),
+        "htx linear": (HtxParser().linear_exchange_info_parser, htx_linear),
+        "gateio futures": (GateioParser().futures_exchange_info_parser, gateio_futures),
+    }
+    parser = Parser()
+    print(f"{'spec':<18}{'loop':>12}{'compiled':>12}{'speedup':>10}")
+    for name, (spec, make_row) in cases.items():
+        rows = [make_row(i) for i in range(INSTRUMENTS)]
+        loop = loop_spec(spec)
+        assert [parser.get_result_with_parser(row, loop) for row in rows] == [spec.convert(row) for row in rows]
+
+        timings = []
+        for method in [loop, spec]:
+            start = time.perf_counter()
+            for _ in range(rounds):
+                for row in rows:
+                    parser.get_result_with_parser(row, method)
+            timings.append((time.perf_counter() - start) / rounds * 1000)
+        print(f"{name:<18}{timings[0]:>10.2f}ms{timings[1]:>10.2f}ms{timings[0] / timings[1]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=10, help="parses of the payload per spec")
+    args = parser.parse_args()
+
+    bench(args.rounds)
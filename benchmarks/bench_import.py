@@ -0,0 +1,66 @@
+"""
+Measure how long importing each exchange adaptor takes in a fresh interpreter, and fail when one goes over budget.
+
+    python3 benchmarks/bench_import.py                 # every exchange, 400 ms budget
+    python3 benchmarks/bench_import.py --budget 250 binance okx
+
+Each import runs in its own process, so nothing is cached between rounds. The time includes importing aiohttp and
+numpy, which every adaptor needs, and excludes the interpreter's own startup.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+from cex_adaptors import EXCHANGES
+
+# printed by the child process: import time in seconds, then the heavy modules it imported anyway
+SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import cex_adaptors
+cex_adaptors.get_exchange_class({name!r})
+print(time.perf_counter() - start)
+print(",".join(module for module in {lazy!r} if module in sys.modules))
+"""
+
+# modules no adaptor should import until they are used
+LAZY_MODULES = ["pandas"]
+
+
+def measure(name: str) -> tuple:
+    output = subprocess.run(
+        [sys.executable, "-c", SCRIPT.format(name=name, lazy=LAZY_MODULES)],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.splitlines()
+    return float(output[0]) * 1000, [module for module in output[1].split(",") if module]
+
+
+def bench(names: list, rounds: int, budget: float) -> bool:
+    passed = True
+    print(f"{'exchange':<10}{'median':>10}{'max':>10}  eager imports")
+    for name in names:
+        timings, eager = [], []
+        for _ in range(rounds):
+            elapsed, eager = measure(name)
+            timings.append(elapsed)
+        median = statistics.median(timings)
+        ok = median <= budget and not eager
+        passed = passed and ok
+        print(
+            f"{name:<10}{median:>8.1f}ms{max(timings):>8.1f}ms  {', '.join(eager) or '-'}"
+            f"{'' if ok else '  OVER BUDGET'}"
+        )
+    return passed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("exchanges", nargs="*", default=list(EXCHANGES), help="exchanges to import, default all")
+    parser.add_argument("--rounds", type=int, default=5, help="fresh processes per exchange")
+    parser.add_argument("--budget", type=float, default=400, help="median import time allowed per exchange in ms")
+    args = parser.parse_args()
+
+    sys.exit(0 if bench(args.exchanges, args.rounds, args.budget) else 1)
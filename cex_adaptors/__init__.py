@@ -0,0 +1,41 @@
+from importlib import import_module
+
+# exchange name -> (module, class), each module is imported the first time its exchange is asked for
+EXCHANGES = {
+    "binance": ("binance", "Binance"),
+    "okx": ("okx", "Okx"),
+    "bybit": ("bybit", "Bybit"),
+    "gateio": ("gateio", "Gateio"),
+    "htx": ("htx", "Htx"),
+    "kucoin": ("kucoin", "Kucoin"),
+    "bitget": ("bitget", "Bitget"),
+    "woo": ("woo", "WOO"),
+}
+
+__all__ = ["EXCHANGES", "get_exchange_class", "get_exchange"] + [name for _, name in EXCHANGES.values()]
+
+
+def get_exchange_class(name: str) -> type:
+    """
+    :param name: exchange name, a key of `EXCHANGES`, e.g. "binance"
+    :return: the adaptor class, importing its module on first use
+    """
+    if name not in EXCHANGES:
+        raise ValueError(f"Invalid exchange: {name}, expected one of {list(EXCHANGES)}")
+    module, cls = EXCHANGES[name]
+    return getattr(import_module(f".{module}", __name__), cls)
+
+
+def get_exchange(name: str, *args, **kwargs):
+    """
+    Create the adaptor of an exchange by name, e.g. `get_exchange("okx")`, with the arguments of its class
+    """
+    return get_exchange_class(name)(*args, **kwargs)
+
+
+def __getattr__(attr: str):
+    # `from cex_adaptors import Binance` imports only the Binance adaptor
+    for name, (_, cls) in EXCHANGES.items():
+        if cls == attr:
+            return get_exchange_class(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {attr!r}")
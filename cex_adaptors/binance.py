@@ -1,47 +1,63 @@
-import tracemalloc
-from typing import Literal, Optional
+import asyncio
+from typing import Literal, Optional, Union
 
+import aiohttp
+
+from .candles import CandleFrame
+from .exchange_info import ExchangeInfo
+from .exchange_info_refresher import ExchangeInfoMixin
 from .exchanges.binance import BinanceInverse, BinanceLinear, BinanceSpot
+from .exchanges.cache import ResponseCache
+from .exchanges.retry import RetryPolicy
+from .orderbook import OrderBook
+from .pagination import HistoryMixin, PageAccumulator, fetch_windows, plan_windows
 from .parsers.binance import BinanceParser
-
-tracemalloc.start()
+from .utils import gather_bounded, get_depth_limit
 
 
-class Binance(object):
+class Binance(ExchangeInfoMixin, HistoryMixin):
     name = "binance"
-
-    def __init__(self, api_key: str = None, api_secret: str = None):
-        self.spot = BinanceSpot(api_key=api_key, api_secret=api_secret)
-        self.linear = BinanceLinear()
-        self.inverse = BinanceInverse()
+    # candlesticks and funding rates per request
+    CANDLESTICK_LIMIT = 1000
+    FUNDING_RATE_LIMIT = 1000
+
+    def __init__(
+        self,
+        api_key: str = None,
+        api_secret: str = None,
+        session: aiohttp.ClientSession = None,
+        retry_policy: RetryPolicy = None,
+        cache: ResponseCache = None,
+    ):
+        self.spot = BinanceSpot(
+            api_key=api_key, api_secret=api_secret, session=session, retry_policy=retry_policy, cache=cache
+        )
+        self.linear = BinanceLinear(session=session, retry_policy=retry_policy, cache=cache)
+        self.inverse = BinanceInverse(session=session, retry_policy=retry_policy, cache=cache)
         self.parser = BinanceParser()
 
-        self.exchange_info = {}
+        self.exchange_info = ExchangeInfo()
+
+    async def warm_up(self, connections: int = 1):
+        await asyncio.gather(
+            self.spot.warm_up(connections), self.linear.warm_up(connections), self.inverse.warm_up(connections)
+        )
 
     async def close(self):
+        await self._stop_exchange_info_tasks()
         await self.spot.close()
         await self.linear.close()
         await self.inverse.close()
 
-    async def sync_exchange_info(self) -> None:
-        self.exchange_info = await self.get_exchange_info()
-
     async def get_exchange_info(self, market_type: Optional[Literal["spot", "margin", "futures", "perp"]] = None):
-        spot = self.parser.parse_exchange_info(
-            await self.spot._get_exchange_info(), self.parser.spot_exchange_info_parser
-        )
-        linear = self.parser.parse_exchange_info(
-            await self.linear._get_exchange_info(), self.parser.futures_exchange_info_parser("linear")
-        )
-        inverse = self.parser.parse_exchange_info(
-            await self.inverse._get_exchange_info(), self.parser.futures_exchange_info_parser("inverse")
-        )
-        self.exchange_info = {**spot, **linear, **inverse}
-        return (
-            self.exchange_info
-            if not market_type
-            else self.parser.query_dict(self.exchange_info, {f"is_{market_type}": True})
+        spot_info, linear_info, inverse_info = await gather_bounded(
+            self.spot._get_exchange_info(), self.linear._get_exchange_info(), self.inverse._get_exchange_info()
         )
+        spot = self.parser.parse_exchange_info(spot_info, self.parser.spot_exchange_info_parser)
+        linear = self.parser.parse_exchange_info(linear_info, self.parser.futures_exchange_info_parser("linear"))
+        inverse = self.parser.parse_exchange_info(inverse_info, self.parser.futures_exchange_info_parser("inverse"))
+        exchange_info = ExchangeInfo.merge(spot, linear, inverse)
+        return exchange_info if not market_type else exchange_info.filter(market_type)
 
     async def get_ticker(self, instrument_id: str):
         _symbol = self.exchange_info[instrument_id]["raw_data"]["symbol"]
@@ -60,13 +76,14 @@ class Binance(object):
 
         tickers = [(self.spot, "spot"), (self.linear, "linear"), (self.inverse, "inverse")]
 
-        for exchange, _market_type in tickers:
-            parsed_tickers = self.parser.parse_tickers(await exchange._get_tickers(), _market_type, self.exchange_info)
+        responses = await gather_bounded(*[exchange._get_tickers() for exchange, _ in tickers])
+        for (_, _market_type), response in zip(tickers, responses):
+            parsed_tickers = self.parser.parse_tickers(response, _market_type, self.exchange_info)
             results.update(parsed_tickers)
 
         if market_type:
-            ids = list(self.parser.query_dict(self.exchange_info, {f"is_{market_type}": True}).keys())
-            return self.parser.query_dict_by_keys(results, ids)
+            ids = self.exchange_info.get_ids(market_type)
+            return {k: v for k, v in results.items() if k in ids}
         else:
             return results
 
@@ -99,15 +116,22 @@ class Binance(object):
         }
 
     async def get_history_candlesticks(
-        self, instrument_id: str, interval: str, start: int = None, end: int = None, num: int = 500
-    ) -> list:
+        self,
+        instrument_id: str,
+        interval: str,
+        start: int = None,
+        end: int = None,
+        num: int = 500,
+        as_array: bool = False,
+    ) -> Union[list, CandleFrame]:
         if instrument_id not in self.exchange_info:
             raise ValueError(f"{instrument_id} not found in {self.name} exchange info")
 
         info = self.exchange_info[instrument_id]
+        parse = self.parser.parse_candle_frame if as_array else self.parser.parse_candlesticks
         _symbol = info["raw_data"]["symbol"]
         _interval = self.parser.get_interval(interval)
-        limit = 1000
+        limit = self.CANDLESTICK_LIMIT
         market_type = self.parser.get_market_type(info)
 
         params = {
@@ -124,44 +148,45 @@ class Binance(object):
 
         query_end = None
 
-        results = []
+        results = PageAccumulator()
         if start and end:
+            windows = plan_windows(start, end, interval, limit)
+            if windows:
+
+                async def fetch(window_start: int, window_end: int):
+                    response = await method_map[market_type](**params, endTime=window_end)
+                    return parse(response, info, market_type, interval)
+
+                return (await fetch_windows(fetch, windows)).get_results(start, end)
+
             query_end = end
             while True:
                 params["endTime"] = query_end
-                result = self.parser.parse_candlesticks(
-                    await method_map[market_type](**params), info, market_type, interval
-                )
-                results.extend(result)
-
-                # exclude the datas with same timestamp
-                results = list({v["timestamp"]: v for v in results}.values())
+                result = parse(await method_map[market_type](**params), info, market_type, interval)
+                results.add(result)
 
-                query_end = min([v["timestamp"] for v in result]) - 1
-                if len(result) < limit or query_end <= start:
+                if len(result) < limit:
+                    break
+                query_end = results.page_start - 1
+                if query_end <= start:
                     break
                 continue
-            return sorted(
-                [v for v in results if end >= v["timestamp"] >= start], key=lambda x: x["timestamp"], reverse=False
-            )
+            return results.get_results(start, end)
 
         elif num:
             while True:
                 params.update({"endTime": query_end} if query_end else {})
-                result = self.parser.parse_candlesticks(
-                    await method_map[market_type](**params), info, market_type, interval
-                )
+                result = parse(await method_map[market_type](**params), info, market_type, interval)
 
-                results.extend(result)
-                results = list({v["timestamp"]: v for v in results}.values())
+                results.add(result)
 
                 if len(result) < limit or len(results) >= num:
                     break
 
-                query_end = min([v["timestamp"] for v in result]) - 1
+                query_end = results.page_start - 1
                 continue
 
-            return sorted(results, key=lambda x: x["timestamp"], reverse=False)[-num:]
+            return results.get_results(num=num)
 
     async def get_current_funding_rate(self, instrument_id: str) -> dict:
         if instrument_id not in self.exchange_info:
@@ -188,7 +213,7 @@ class Binance(object):
 
         info = self.exchange_info[instrument_id]
         market_type = self.parser.get_market_type(info)
-        limit = 1000
+        limit = self.FUNDING_RATE_LIMIT
         symbol = info["raw_data"]["symbol"]
 
         method_map = {
@@ -201,7 +226,7 @@ class Binance(object):
             "limit": limit,
         }
 
-        results = []
+        results = PageAccumulator()
         query_end = None
         if start and end:
             query_start = start - 1
@@ -209,36 +234,30 @@ class Binance(object):
             while True:
                 params.update({"startTime": query_start, "endTime": query_end})
                 result = self.parser.parse_history_funding_rate(await method_map[market_type](**params), info)
-                results.extend(result)
-                results = list({v["timestamp"]: v for v in results}.values())
+                results.add(result)
 
                 if len(result) < limit:
                     break
 
-                query_start = max([v["timestamp"] for v in result]) - 1
+                query_start = results.page_end - 1
 
-                if query_start < end:
+                if query_start >= end:
                     break
 
                 continue
-            return sorted(
-                [v for v in results if end >= v["timestamp"] >= start], key=lambda x: x["timestamp"], reverse=False
-            )
+            return results.get_results(start, end)
 
         elif num:
             while True:
                 params.update({"endTime": query_end} if query_end else {})
                 result = self.parser.parse_history_funding_rate(await method_map[market_type](**params), info)
-                results.extend(result)
-
-                # exclude the datas with same timestamp
-                results = list({v["timestamp"]: v for v in results}.values())
+                results.add(result)
 
                 if len(result) < limit or len(results) >= num:
                     break
-                query_end = min([v["timestamp"] for v in result]) + 1
+                query_end = results.page_start + 1
                 continue
-            return sorted(results, key=lambda x: x["timestamp"], reverse=False)[-num:]
+            return results.get_results(num=num)
         else:
             raise ValueError("(start, end) or num must be provided")
 
@@ -304,7 +323,9 @@ class Binance(object):
     ):
         return NotImplemented
 
-    async def get_orderbook(self, instrument_id: str, depth: int = None) -> dict:
+    async def get_orderbook(
+        self, instrument_id: str, depth: int = None, as_array: bool = False
+    ) -> Union[dict, OrderBook]:
         if instrument_id not in self.exchange_info:
             raise ValueError(f"{instrument_id} not found in exchange info")
 
@@ -318,13 +339,16 @@ class Binance(object):
         }
 
         limit_map = {
-            "spot": 5000,
-            "linear": 1000,
-            "inverse": 1000,
+            "spot": [5, 10, 20, 50, 100, 500, 1000, 5000],
+            "linear": [5, 10, 20, 50, 100, 500, 1000],
+            "inverse": [5, 10, 20, 50, 100, 500, 1000],
         }
 
-        params = {"symbol": symbol, "limit": limit_map[market_type]}
-        return self.parser.parse_orderbook(await method_map[market_type](**params), info, market_type, depth=depth)
+        limits = limit_map[market_type]
+        params = {"symbol": symbol, "limit": get_depth_limit(depth, limits) or limits[-1]}
+        return self.parser.parse_orderbook(
+            await method_map[market_type](**params), info, market_type, depth=depth, as_array=as_array
+        )
 
     # Private function
     async def get_spot_account_info(self) -> dict:
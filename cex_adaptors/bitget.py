@@ -1,93 +1,84 @@
+from typing import Union
+
+import aiohttp
+
+from .candles import CandleFrame
+from .exchange_info import ExchangeInfo
+from .exchange_info_refresher import ExchangeInfoMixin
 from .exchanges.bitget import BitgetUnified
+from .exchanges.cache import ResponseCache
+from .exchanges.retry import RetryPolicy
+from .orderbook import OrderBook
+from .pagination import HistoryMixin, PageAccumulator, fetch_windows, plan_windows
 from .parsers.bitget import BitgetParser
-from .utils import query_dict
+from .utils import gather_bounded, get_depth_limit
 
 
-class Bitget(BitgetUnified):
+class Bitget(ExchangeInfoMixin, HistoryMixin, BitgetUnified):
     name = "bitget"
-
-    def __init__(self) -> None:
-        super().__init__()
+    # candlesticks and funding rates per request
+    CANDLESTICK_LIMIT = 300
+    FUNDING_RATE_LIMIT = None
+
+    def __init__(
+        self, session: aiohttp.ClientSession = None, retry_policy: RetryPolicy = None, cache: ResponseCache = None
+    ) -> None:
+        super().__init__(session=session, retry_policy=retry_policy, cache=cache)
         self.parser = BitgetParser()
-        self.exchange_info = {}
+        self.exchange_info = ExchangeInfo()
+
+    @property
+    def _derivative_product_types(self) -> list:
+        return ["COIN-FUTURES"] + [f"{settle}-FUTURES" for settle in self.parser.LINEAR_FUTURES_SETTLE]
 
-    async def sync_exchange_info(self):
-        self.exchange_info = await self.get_exchange_info()
+    async def _get_derivatives(self, method, parse) -> dict:
+        derivative = {}
+        for response in await gather_bounded(
+            *[method(product_type) for product_type in self._derivative_product_types]
+        ):
+            derivative.update(parse(response))
+        return derivative
 
     async def get_exchange_info(self, market_type: str = None):
+        def parse_derivative(response):
+            return self.parser.parse_exchange_info(response, self.parser.derivative_exchange_info_parser)
+
         if market_type:
             if market_type == "spot":
                 return self.parser.parse_exchange_info(
                     await self._get_spot_exchange_info(), self.parser.spot_exchange_info_parser
                 )
             else:
-                derivative = {}
-                inverse = self.parser.parse_exchange_info(
-                    await self._get_derivative_exchange_info("COIN-FUTURES"),
-                    self.parser.derivative_exchange_info_parser,
-                )
-                derivative.update(inverse)
+                derivative = await self._get_derivatives(self._get_derivative_exchange_info, parse_derivative)
 
-                for settle in self.parser.LINEAR_FUTURES_SETTLE:
-                    sub_linear = self.parser.parse_exchange_info(
-                        await self._get_derivative_exchange_info(f"{settle}-FUTURES"),
-                        self.parser.derivative_exchange_info_parser,
-                    )
-                    derivative.update(sub_linear)
-
-                instrument_id = list(query_dict(self.exchange_info, f"is_{market_type} == True").keys())
+                instrument_id = self.exchange_info.get_ids(market_type)
                 return {k: v for k, v in derivative.items() if k in instrument_id}
         else:
-            spot = self.parser.parse_exchange_info(
-                await self._get_spot_exchange_info(), self.parser.spot_exchange_info_parser
-            )
-
-            inverse = self.parser.parse_exchange_info(
-                await self._get_derivative_exchange_info("COIN-FUTURES"),
-                self.parser.derivative_exchange_info_parser,
+            spot_info, derivative = await gather_bounded(
+                self._get_spot_exchange_info(),
+                self._get_derivatives(self._get_derivative_exchange_info, parse_derivative),
             )
-
-            linear_futures = {}
-            for settle in self.parser.LINEAR_FUTURES_SETTLE:
-                sub_linear = self.parser.parse_exchange_info(
-                    await self._get_derivative_exchange_info(f"{settle}-FUTURES"),
-                    self.parser.derivative_exchange_info_parser,
-                )
-                linear_futures.update(sub_linear)
-
-            return {**spot, **inverse, **linear_futures}
+            spot = self.parser.parse_exchange_info(spot_info, self.parser.spot_exchange_info_parser)
+            return ExchangeInfo.merge(spot, derivative)
 
     async def get_tickers(self, market_type: str = None):
+        def parse_derivative(response):
+            return self.parser.parse_tickers(response, self.exchange_info, "derivative")
+
         if market_type:
             if market_type == "spot":
                 return self.parser.parse_tickers(await self._get_spot_tickers(), self.exchange_info, "spot")
             else:
-                derivative = {}
-                inverse = self.parser.parse_tickers(
-                    await self._get_derivative_tickers("COIN-FUTURES"), self.exchange_info, "derivative"
-                )
-                derivative.update(inverse)
+                derivative = await self._get_derivatives(self._get_derivative_tickers, parse_derivative)
 
-                for settle in self.parser.LINEAR_FUTURES_SETTLE:
-                    sub_linear = self.parser.parse_tickers(
-                        await self._get_derivative_tickers(f"{settle}-FUTURES"), self.exchange_info, "derivative"
-                    )
-                    derivative.update(sub_linear)
-
-                instrument_id = list(query_dict(self.exchange_info, f"is_{market_type} == True").keys())
+                instrument_id = self.exchange_info.get_ids(market_type)
                 return {k: v for k, v in derivative.items() if k in instrument_id}
         else:
-            spot = self.parser.parse_tickers(await self._get_spot_tickers(), self.exchange_info, "spot")
-            inverse = self.parser.parse_tickers(
-                await self._get_derivative_tickers("COIN-FUTURES"), self.exchange_info, "derivative"
+            spot_tickers, derivative = await gather_bounded(
+                self._get_spot_tickers(), self._get_derivatives(self._get_derivative_tickers, parse_derivative)
             )
-            linear_futures = {}
-            for settle in self.parser.LINEAR_FUTURES_SETTLE:
-                sub_linear = self.parser.parse_tickers(
-                    await self._get_derivative_tickers(f"{settle}-FUTURES"), self.exchange_info, "derivative"
-                )
-                linear_futures.update(sub_linear)
-            return {**spot, **inverse, **linear_futures}
+            spot = self.parser.parse_tickers(spot_tickers, self.exchange_info, "spot")
+            return {**spot, **derivative}
 
     async def get_ticker(self, instrument_id: str) -> dict:
         if instrument_id not in self.exchange_info:
@@ -143,14 +134,16 @@ class Bitget(BitgetUnified):
             await self._get_derivative_mark_index_price(_symbol, product_type), info, "mark"
         )
 
-    async def get_orderbook(self, instrument_id: str, depth: int = None) -> dict:
+    async def get_orderbook(
+        self, instrument_id: str, depth: int = None, as_array: bool = False
+    ) -> Union[dict, OrderBook]:
         if instrument_id not in self.exchange_info:
             raise f"{instrument_id} not found in {self.name} exchange info"
 
         info = self.exchange_info[instrument_id]
         _symbol = info["raw_data"]["symbol"]
         _market_type = self.parser.get_market_type(info)
-        limit = "max"
+        limit = get_depth_limit(depth, [1, 5, 15, 50]) or "max"
         params = {
             "symbol": _symbol,
             "limit": limit,
@@ -162,13 +155,9 @@ class Bitget(BitgetUnified):
             "spot": self._get_spot_merge_depth,
             "derivative": self._get_derivative_merge_market_depth,
         }
-        orderbook = self.parser.parse_orderbook(await method_map[_market_type](**params), info)
-
-        if depth:
-            orderbook["asks"] = sorted(orderbook["asks"], key=lambda x: x["price"], reverse=False)[:depth]
-            orderbook["bids"] = sorted(orderbook["bids"], key=lambda x: x["price"], reverse=True)[:depth]
-
-        return orderbook
+        return self.parser.parse_orderbook(
+            await method_map[_market_type](**params), info, depth=depth, as_array=as_array
+        )
 
     async def get_current_candlestick(self, instrument_id: str, interval: str) -> dict:
         if instrument_id not in self.exchange_info:
@@ -201,16 +190,23 @@ class Bitget(BitgetUnified):
         }
 
     async def get_history_candlesticks(
-        self, instrument_id: str, interval: str, start: int = None, end: int = None, num: int = None
-    ) -> list:
+        self,
+        instrument_id: str,
+        interval: str,
+        start: int = None,
+        end: int = None,
+        num: int = None,
+        as_array: bool = False,
+    ) -> Union[list, CandleFrame]:
         if instrument_id not in self.exchange_info:
             raise ValueError(f"{instrument_id} not found in {self.name} exchange info")
 
         info = self.exchange_info[instrument_id]
+        parse = self.parser.parse_candle_frame if as_array else self.parser.parse_candlesticks
         market_type = self.parser.get_market_type(info)
         _symbol = info["raw_data"]["symbol"]
         _interval = self.parser.get_interval(interval, market_type)
-        limit = 300
+        limit = self.CANDLESTICK_LIMIT
 
         method_map = {
             "spot": self._get_spot_candlesticks,
@@ -225,51 +221,48 @@ class Bitget(BitgetUnified):
         if market_type == "derivative":
             params.update({"productType": self.parser.get_product_type(self.exchange_info[instrument_id])})
 
-        results = []
+        results = PageAccumulator()
         query_end = None
         if start and end:
+            windows = plan_windows(start, end, interval, limit)
+            if windows:
+
+                async def fetch(window_start: int, window_end: int):
+                    response = await method_map[market_type](**params, endTime=window_end + 1)
+                    return parse(response, info, market_type, interval)
+
+                return (await fetch_windows(fetch, windows)).get_results(start, end)
+
             query_end = end
             while True:
                 params.update({"endTime": query_end})
-                result = self.parser.parse_candlesticks(
-                    await method_map[market_type](**params), info, market_type, interval
-                )
-                results.extend(result)
-
-                # exclude data with same timestamp
-                results = list({v["timestamp"]: v for v in results}.values())
+                result = parse(await method_map[market_type](**params), info, market_type, interval)
+                results.add(result)
 
                 if not result or len(result) < limit:
                     break
 
-                query_end = min([v["timestamp"] for v in result]) + 1
+                query_end = results.page_start + 1
 
                 if query_end < start:
                     break
 
-            return sorted(
-                [i for i in results if start <= i["timestamp"] <= end], key=lambda x: x["timestamp"], reverse=False
-            )
+            return results.get_results(start, end)
         elif num:
             while True:
                 params.update({"endTime": query_end})
 
-                result = self.parser.parse_candlesticks(
-                    await method_map[market_type](**params), info, market_type, interval
-                )
-                results.extend(result)
-
-                # exclude data with same timestamp
-                results = list({v["timestamp"]: v for v in results}.values())
+                result = parse(await method_map[market_type](**params), info, market_type, interval)
+                results.add(result)
 
                 if not result or len(result) < limit:
                     break
 
-                query_end = min([v["timestamp"] for v in result]) + 1
+                query_end = results.page_start + 1
 
                 if len(results) >= num:
                     break
-            return sorted(results, key=lambda x: x["timestamp"], reverse=False)[-num:]
+            return results.get_results(num=num)
 
         else:
             raise ValueError("(start, end) or num must be provided")
@@ -301,42 +294,35 @@ class Bitget(BitgetUnified):
         page = 1
         params = {"symbol": _symbol, "productType": _product_type, "pageSize": limit, "pageNo": page}
 
-        results = []
+        results = PageAccumulator()
         if start and end:
             while True:
                 params.update({"pageNo": page})
                 result = self.parser.parse_history_funding_rate(
                     await self._get_derivative_history_funding_rate(**params), info
                 )
-                results.extend(result)
-
-                # exclude data with same timestamp
-                results = list({v["timestamp"]: v for v in results}.values())
+                results.add(result)
 
                 if len(result) < limit:
                     break
-                min_timestamp = min([i["timestamp"] for i in result])
+                min_timestamp = results.page_start
                 if min_timestamp < start:
                     break
+                page += 1
 
-            return sorted(
-                [i for i in results if start <= i["timestamp"] <= end], key=lambda x: x["timestamp"], reverse=False
-            )
+            return results.get_results(start, end)
         elif num:
             while True:
                 params.update({"pageNo": page})
                 result = self.parser.parse_history_funding_rate(
                     await self._get_derivative_history_funding_rate(**params), info
                 )
-                results.extend(result)
-
-                # exclude data with same timestamp
-                results = list({v["timestamp"]: v for v in results}.values())
+                results.add(result)
 
                 if len(result) < limit or len(results) > num:
                     break
                 page += 1
                 continue
-            return sorted(results, key=lambda x: x["timestamp"], reverse=False)[-num:]
+            return results.get_results(num=num)
         else:
             raise ValueError("(start, end) or num must be provided")
@@ -1,32 +1,41 @@
-from typing import Literal, Optional
+from typing import Literal, Optional, Union
 
+import aiohttp
+
+from .candles import CandleFrame
+from .exchange_info import ExchangeInfo
+from .exchange_info_refresher import ExchangeInfoMixin
 from .exchanges.bybit import BybitUnified
+from .exchanges.cache import ResponseCache
+from .exchanges.retry import RetryPolicy
+from .orderbook import OrderBook
+from .pagination import HistoryMixin, PageAccumulator, fetch_windows, plan_windows
 from .parsers.bybit import BybitParser
+from .utils import gather_bounded, get_depth_limit
 
 
-class Bybit(BybitUnified):
+class Bybit(ExchangeInfoMixin, HistoryMixin, BybitUnified):
     name = "bybit"
-
-    def __init__(self):
-        super().__init__()
+    # candlesticks and funding rates per request
+    CANDLESTICK_LIMIT = 1000
+    FUNDING_RATE_LIMIT = 200
+
+    def __init__(
+        self, session: aiohttp.ClientSession = None, retry_policy: RetryPolicy = None, cache: ResponseCache = None
+    ):
+        super().__init__(session=session, retry_policy=retry_policy, cache=cache)
         self.parser = BybitParser()
-        self.exchange_info = {}
-
-    async def sync_exchange_info(self):
-        self.exchange_info = await self.get_exchange_info()
+        self.exchange_info = ExchangeInfo()
 
     async def get_exchange_info(self, market_type: str = None):
-        spot = self.parser.parse_exchange_info(
-            await self._get_exchange_info("spot"), self.parser.spot_exchange_info_parser
-        )
-        linear = self.parser.parse_exchange_info(
-            await self._get_exchange_info("linear"), self.parser.perp_futures_exchange_info_parser
-        )
-        inverse = self.parser.parse_exchange_info(
-            await self._get_exchange_info("inverse"), self.parser.perp_futures_exchange_info_parser
+        spot_info, linear_info, inverse_info = await gather_bounded(
+            *[self._get_exchange_info(category) for category in ["spot", "linear", "inverse"]]
         )
+        spot = self.parser.parse_exchange_info(spot_info, self.parser.spot_exchange_info_parser)
+        linear = self.parser.parse_exchange_info(linear_info, self.parser.perp_futures_exchange_info_parser)
+        inverse = self.parser.parse_exchange_info(inverse_info, self.parser.perp_futures_exchange_info_parser)
 
-        return {**spot, **linear, **inverse}
+        return ExchangeInfo.merge(spot, linear, inverse)
 
     async def get_tickers(self, market_type: Optional[Literal["spot", "margin", "futures", "perp"]] = None):
 
@@ -34,15 +43,14 @@ class Bybit(BybitUnified):
 
         tickers = ["spot", "linear", "inverse"]
 
-        for _market_type in tickers:
-            parsed_tickers = self.parser.parse_tickers(
-                await self._get_tickers(_market_type), _market_type, self.exchange_info
-            )
+        responses = await gather_bounded(*[self._get_tickers(_market_type) for _market_type in tickers])
+        for _market_type, response in zip(tickers, responses):
+            parsed_tickers = self.parser.parse_tickers(response, _market_type, self.exchange_info)
             results.update(parsed_tickers)
 
         if market_type:
-            ids = list(self.parser.query_dict(self.exchange_info, {f"is_{market_type}": True}).keys())
-            return self.parser.query_dict_by_keys(results, ids)
+            ids = self.exchange_info.get_ids(market_type)
+            return {k: v for k, v in results.items() if k in ids}
         else:
             return results
 
@@ -78,54 +86,63 @@ class Bybit(BybitUnified):
         }
 
     async def get_history_candlesticks(
-        self, instrument_id: str, interval: str, start: int = None, end: int = None, num: int = 30
-    ) -> list:
+        self,
+        instrument_id: str,
+        interval: str,
+        start: int = None,
+        end: int = None,
+        num: int = 30,
+        as_array: bool = False,
+    ) -> Union[list, CandleFrame]:
 
         info = self.exchange_info[instrument_id]
+        parse = self.parser.parse_candle_frame if as_array else self.parser.parse_candlesticks
         _category = self.parser.get_category(info)
         _symbol = info["raw_data"]["symbol"]
         _interval = self.parser.get_interval(interval)
-        limit = 1000
+        limit = self.CANDLESTICK_LIMIT
 
         params = {"symbol": _symbol, "interval": _interval, "limit": limit, "category": _category}
 
-        results = []
+        results = PageAccumulator()
         query_end = None
         if start and end:
+            windows = plan_windows(start, end, interval, limit)
+            if windows:
+
+                async def fetch(window_start: int, window_end: int):
+                    response = await self._get_klines(**params, end=window_end)
+                    return parse(response, info, _category, interval)
+
+                return (await fetch_windows(fetch, windows)).get_results(start, end)
+
             query_end = end + 1
             while True:
                 params["end"] = query_end
-                klines = self.parser.parse_candlesticks(await self._get_klines(**params), info, _category, interval)
+                klines = parse(await self._get_klines(**params), info, _category, interval)
                 if not klines:
                     break
-                results.extend(klines)
-
-                # exclude data with same timestamp
-                results = list({v["timestamp"]: v for v in results}.values())
+                results.add(klines)
 
-                query_end = min([v["timestamp"] for v in klines]) + 1
+                query_end = results.page_start + 1
                 if len(klines) < limit or query_end <= start:
                     break
                 continue
-            return sorted(
-                [v for v in results if end >= v["timestamp"] >= start], key=lambda x: x["timestamp"], reverse=False
-            )
+            return results.get_results(start, end)
 
         elif num:
             while True:
                 params.update({"end": query_end} if query_end else {})
-                klines = self.parser.parse_candlesticks(await self._get_klines(**params), info, _category, interval)
+                klines = parse(await self._get_klines(**params), info, _category, interval)
 
-                results.extend(klines)
-                # exclude data with same timestamp
-                results = list({v["timestamp"]: v for v in results}.values())
+                results.add(klines)
 
                 if len(klines) < limit or len(results) >= num:
                     break
-                query_end = min([v["timestamp"] for v in klines]) + 1
+                query_end = results.page_start + 1
                 continue
 
-            return sorted(results, key=lambda x: x["timestamp"], reverse=False)[-num:]
+            return results.get_results(num=num)
         else:
             raise ValueError("(start, end) or num must be provided")
 
@@ -150,49 +167,42 @@ class Bybit(BybitUnified):
         info = self.exchange_info[instrument_id]
         _category = self.parser.get_category(info)
         _symbol = info["raw_data"]["symbol"]
-        limit = 200
+        limit = self.FUNDING_RATE_LIMIT
 
         params = {"symbol": _symbol, "limit": limit, "category": _category}
 
-        results = []
+        results = PageAccumulator()
         query_end = None
         if start and end:
             query_end = end + 1
             while True:
                 params["endTime"] = query_end
                 result = self.parser.parse_funding_rate(await self._get_funding_rate_history(**params), info)
-                results.extend(result)
-
-                # exclude data with same timestamp
-                results = list({v["timestamp"]: v for v in results}.values())
+                results.add(result)
 
                 if len(result) < limit:
                     break
 
-                query_end = min([v["timestamp"] for v in result])
+                query_end = results.page_start
 
                 if query_end <= start:
                     break
                 continue
-            return sorted(
-                [v for v in results if end >= v["timestamp"] >= start], key=lambda x: x["timestamp"], reverse=False
-            )
+            return results.get_results(start, end)
 
         elif num:
             while True:
                 params.update({"endTime": query_end} if query_end else {})
                 result = self.parser.parse_funding_rate(await self._get_funding_rate_history(**params), info)
 
-                results.extend(result)
-                # exclude data with same timestamp
-                results = list({v["timestamp"]: v for v in results}.values())
+                results.add(result)
 
                 if len(result) < limit or len(results) >= num:
                     break
 
-                query_end = min([v["timestamp"] for v in result])
+                query_end = results.page_start
                 continue
-            return sorted(results, key=lambda x: x["timestamp"], reverse=False)[-num:]
+            return results.get_results(num=num)
         else:
             raise ValueError("(start, end) or num must be provided")
 
@@ -209,7 +219,9 @@ class Bybit(BybitUnified):
 
         return self.parser.parse_open_interest(await self._get_open_interest(**params), info)
 
-    async def get_orderbook(self, instrument_id: str, depth: int = 100):
+    async def get_orderbook(
+        self, instrument_id: str, depth: int = 100, as_array: bool = False
+    ) -> Union[dict, OrderBook]:
         if instrument_id not in self.exchange_info:
             raise ValueError(f"{instrument_id} not found in exchange info")
 
@@ -222,10 +234,11 @@ class Bybit(BybitUnified):
         info = self.exchange_info[instrument_id]
         _category = self.parser.get_category(info)
         _symbol = info["raw_data"]["symbol"]
-        _depth = min(depth, order_book_depth_map[_category])
+        max_depth = order_book_depth_map[_category]
+        _depth = get_depth_limit(depth, range(1, max_depth + 1)) or max_depth
 
         params = {"category": _category, "symbol": _symbol, "limit": _depth}
-        return self.parser.parse_orderbook(await self._get_orderbook(**params), info)
+        return self.parser.parse_orderbook(await self._get_orderbook(**params), info, depth=depth, as_array=as_array)
 
     async def get_last_price(self, instrument_id: str) -> dict:
         if instrument_id not in self.exchange_info:
@@ -0,0 +1,119 @@
+import numpy as np
+
+
+class CandleFrame(object):
+    """
+    Candlesticks of one instrument as contiguous NumPy columns: int64 `timestamp` and float64 OHLCV. The instrument id,
+    market type and interval are stored once for the whole frame instead of once per candlestick.
+    Missing values are NaN.
+    :param instrument_id: unified instrument id
+    :param market_type: unified market type
+    :param interval: candlestick interval, e.g. "1m"
+    :param columns: column name -> array-like, columns not given are filled with NaN
+    """
+
+    COLUMNS = {
+        "timestamp": np.int64,
+        "open": np.float64,
+        "high": np.float64,
+        "low": np.float64,
+        "close": np.float64,
+        "base_volume": np.float64,
+        "quote_volume": np.float64,
+        "contract_volume": np.float64,
+    }
+
+    def __init__(self, instrument_id: str, market_type: str, interval: str, columns: dict = None):
+        self.instrument_id = instrument_id
+        self.market_type = market_type
+        self.interval = interval
+
+        columns = columns or {}
+        length = len(columns["timestamp"]) if "timestamp" in columns else 0
+        self.columns = {}
+        for name, dtype in self.COLUMNS.items():
+            if name in columns:
+                self.columns[name] = np.ascontiguousarray(columns[name], dtype=dtype)
+            else:
+                self.columns[name] = np.full(length, np.nan if dtype is np.float64 else 0, dtype=dtype)
+            if len(self.columns[name]) != length:
+                raise ValueError(f"Column {name} has {len(self.columns[name])} rows, expected {length}")
+
+    @classmethod
+    def from_rows(cls, rows: list, fields: dict, instrument_id: str, market_type: str, interval: str) -> "CandleFrame":
+        """
+        Fill the columns straight from the exchange's rows, without building a dict per candlestick
+        :param rows: raw candlesticks, lists or dicts
+        :param fields: column name -> index or key of the value in each row, numeric strings are converted
+        """
+        columns = {
+            name: np.array([row[key] for row in rows], dtype=cls.COLUMNS[name]) if rows else []
+            for name, key in fields.items()
+        }
+        columns.setdefault("timestamp", [])
+        return cls(instrument_id, market_type, interval, columns)
+
+    @classmethod
+    def concat(cls, frames: list) -> "CandleFrame":
+        first = frames[0]
+        columns = {name: np.concatenate([frame.columns[name] for frame in frames]) for name in cls.COLUMNS}
+        return cls(first.instrument_id, first.market_type, first.interval, columns)
+
+    def __len__(self) -> int:
+        return len(self.columns["timestamp"])
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        columns = self.__dict__.get("columns", {})
+        if name in columns:
+            return columns[name]
+        raise AttributeError(f"{self.__class__.__name__} has no attribute {name}")
+
+    def __getitem__(self, key):
+        """
+        A column by name, or a new frame of the selected rows for a slice, mask or index array
+        """
+        if isinstance(key, str):
+            return self.columns[key]
+        return CandleFrame(
+            self.instrument_id,
+            self.market_type,
+            self.interval,
+            {name: column[key] for name, column in self.columns.items()},
+        )
+
+    def __repr__(self) -> str:
+        return f"CandleFrame({self.instrument_id}, {self.interval}, {len(self)} rows)"
+
+    def between(self, start: int, end: int) -> "CandleFrame":
+        return self[(self.timestamp >= start) & (self.timestamp <= end)]
+
+    def tail(self, num: int) -> "CandleFrame":
+        return self[-num:]
+
+    def to_pandas(self):
+        """
+        DataFrame sharing the column arrays, no data is copied
+        """
+        import pandas as pd
+
+        df = pd.DataFrame(self.columns, copy=False)
+        df.attrs.update(
+            {"instrument_id": self.instrument_id, "market_type": self.market_type, "interval": self.interval}
+        )
+        return df
+
+    def to_records(self) -> list:
+        """
+        Candlesticks in the list of dicts format of `parse_candlesticks`, without `raw_data`
+        """
+        columns = {name: column.tolist() for name, column in self.columns.items()}
+        return [
+            {
+                "timestamp": columns["timestamp"][i],
+                "instrument_id": self.instrument_id,
+                "market_type": self.market_type,
+                "interval": self.interval,
+                **{name: columns[name][i] for name in list(self.COLUMNS)[1:]},
+            }
+            for i in range(len(self))
+        ]
@@ -0,0 +1,52 @@
+class ExchangeError(Exception):
+    """
+    Base class of every error raised while talking to an exchange
+    """
+
+
+class NetworkError(ExchangeError):
+    """
+    The request never got a response: connection refused or reset, DNS failure, timeout
+    """
+
+
+class DecodeError(ExchangeError):
+    """
+    The exchange answered 200 with a body that is not valid JSON
+    """
+
+
+class HTTPError(ExchangeError):
+    """
+    The exchange answered with a non-200 status
+    :param status: HTTP status code
+    :param reason: HTTP reason phrase
+    :param body: raw response body
+    :param headers: response headers
+    :param url: requested url
+    """
+
+    def __init__(self, status: int, reason: str, body: str, headers: dict = None, url: str = None):
+        super().__init__(f"Error {status} {reason} {body}")
+        self.status = status
+        self.reason = reason
+        self.body = body
+        self.headers = headers or {}
+        self.url = url
+
+
+class RateLimitError(HTTPError):
+    """
+    The request exceeded the exchange rate limit (429, or 418 once Binance starts banning the IP)
+    :param retry_after: seconds the exchange asked to wait, None when not given
+    """
+
+    def __init__(self, *args, retry_after: float = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.retry_after = retry_after
+
+
+class ServerError(HTTPError):
+    """
+    The exchange failed to handle the request (5xx)
+    """
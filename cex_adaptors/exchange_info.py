@@ -0,0 +1,229 @@
+import itertools
+
+from .raw_data import LazyRawData
+
+# versions are unique across instances, so a version alone identifies the instrument set it was taken from
+_versions = itertools.count(1)
+
+
+class ExchangeInfoDelta(object):
+    """
+    Instruments changed by `ExchangeInfo.apply`
+    :param added: instrument id -> info of the new instruments
+    :param removed: instrument id -> last info of the instruments gone
+    :param changed: instrument id -> new info of the instruments whose info changed
+    """
+
+    def __init__(self, added: dict = None, removed: dict = None, changed: dict = None):
+        self.added = added or {}
+        self.removed = removed or {}
+        self.changed = changed or {}
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def __repr__(self) -> str:
+        return f"ExchangeInfoDelta(added={len(self.added)}, removed={len(self.removed)}, changed={len(self.changed)})"
+
+
+class ExchangeInfo(dict):
+    """
+    Instrument id -> instrument info, indexed for O(1) lookups and set based filtering.
+    Indexes are built once when the instruments are loaded and kept up to date on every change, which also bumps
+    `version` so structures derived from the instruments know when to rebuild.
+    :param infos: instrument id -> info as returned by the parsers
+    """
+
+    MARKET_TYPES = ["spot", "margin", "futures", "perp", "linear", "inverse"]
+    CURRENCY_KEYS = ["base", "quote", "settle"]
+    # keys holding the exchange's own symbol in `raw_data`, depending on the exchange and market
+    RAW_SYMBOL_KEYS = ["symbol", "instId", "id", "name", "sc", "contract_code"]
+
+    def __init__(self, infos: dict = None):
+        super().__init__()
+        self.version = next(_versions)
+        self._market_types = {market_type: set() for market_type in self.MARKET_TYPES}
+        self._currencies = {key: {} for key in self.CURRENCY_KEYS}
+        self._raw_symbols = {}
+        self._derived = {}
+        self._derived_version = None
+        self.update(infos or {})
+
+    @classmethod
+    def of(cls, infos: dict) -> "ExchangeInfo":
+        """
+        Return `infos` itself when already indexed, otherwise an indexed copy
+        """
+        return infos if isinstance(infos, cls) else cls(infos)
+
+    @classmethod
+    def merge(cls, *infos: dict) -> "ExchangeInfo":
+        """
+        Instruments of all `infos`, later ones winning on duplicate ids, e.g. the spot and derivative instruments
+        parsed separately. Indexes of `ExchangeInfo` parts are merged instead of rebuilt
+        """
+        merged = cls()
+        for part in infos:
+            merged.update(part)
+        return merged
+
+    @staticmethod
+    def _get_raw_symbols(info: dict) -> dict:
+        raw_data = info.get("raw_data")
+        if isinstance(raw_data, LazyRawData):
+            # the symbols are kept decoded, no need to decode the whole payload
+            return raw_data.fields
+        return raw_data if isinstance(raw_data, dict) else None
+
+    def _index(self, instrument_id: str, info: dict) -> None:
+        for market_type, ids in self._market_types.items():
+            if info.get(f"is_{market_type}"):
+                ids.add(instrument_id)
+        for key, index in self._currencies.items():
+            index.setdefault(info.get(key), set()).add(instrument_id)
+        raw_data = self._get_raw_symbols(info)
+        if raw_data:
+            for key in self.RAW_SYMBOL_KEYS:
+                if isinstance(raw_data.get(key), str):
+                    self._raw_symbols.setdefault(raw_data[key], set()).add(instrument_id)
+
+    def _unindex(self, instrument_id: str, info: dict) -> None:
+        for ids in self._market_types.values():
+            ids.discard(instrument_id)
+        for key, index in self._currencies.items():
+            index.get(info.get(key), set()).discard(instrument_id)
+        raw_data = self._get_raw_symbols(info)
+        if raw_data:
+            for key in self.RAW_SYMBOL_KEYS:
+                if isinstance(raw_data.get(key), str):
+                    self._raw_symbols.get(raw_data[key], set()).discard(instrument_id)
+
+    def __setitem__(self, instrument_id: str, info: dict) -> None:
+        if instrument_id in self:
+            self._unindex(instrument_id, self[instrument_id])
+        super().__setitem__(instrument_id, info)
+        self._index(instrument_id, info)
+        self.version = next(_versions)
+
+    def __delitem__(self, instrument_id: str) -> None:
+        self._unindex(instrument_id, self[instrument_id])
+        super().__delitem__(instrument_id)
+        self.version = next(_versions)
+
+    def update(self, *args, **kwargs) -> None:
+        if len(args) == 1 and not kwargs and isinstance(args[0], ExchangeInfo) and self.keys().isdisjoint(args[0]):
+            self._merge_indexed(args[0])
+            return
+        for instrument_id, info in dict(*args, **kwargs).items():
+            self[instrument_id] = info
+
+    def _merge_indexed(self, other: "ExchangeInfo") -> None:
+        # none of the instruments of `other` is here yet, so its indexes can be added to ours as they are
+        super().update(other)
+        for market_type, ids in other._market_types.items():
+            self._market_types[market_type] |= ids
+        for key, index in other._currencies.items():
+            for value, ids in index.items():
+                self._currencies[key].setdefault(value, set()).update(ids)
+        for raw_symbol, ids in other._raw_symbols.items():
+            self._raw_symbols.setdefault(raw_symbol, set()).update(ids)
+        self.version = next(_versions)
+
+    def setdefault(self, instrument_id: str, info: dict = None):
+        if instrument_id not in self:
+            self[instrument_id] = info
+        return self[instrument_id]
+
+    def pop(self, instrument_id: str, *default):
+        if instrument_id not in self:
+            return super().pop(instrument_id, *default)
+        info = self[instrument_id]
+        del self[instrument_id]
+        return info
+
+    def popitem(self):
+        instrument_id = next(reversed(self))
+        return instrument_id, self.pop(instrument_id)
+
+    def clear(self) -> None:
+        super().clear()
+        self._market_types = {market_type: set() for market_type in self.MARKET_TYPES}
+        self._currencies = {key: {} for key in self.CURRENCY_KEYS}
+        self._raw_symbols = {}
+        self.version = next(_versions)
+
+    def apply(self, infos: dict) -> ExchangeInfoDelta:
+        """
+        Make this instance hold `infos`, a complete and newer instrument list, by adding, removing and replacing only
+        the instruments that differ. Indexes are updated for those instruments alone and references to this instance
+        stay valid.
+        """
+        delta = ExchangeInfoDelta()
+        for instrument_id in [k for k in self if k not in infos]:
+            delta.removed[instrument_id] = self.pop(instrument_id)
+        for instrument_id, info in infos.items():
+            if instrument_id not in self:
+                delta.added[instrument_id] = info
+            elif self[instrument_id] != info:
+                delta.changed[instrument_id] = info
+            else:
+                continue
+            self[instrument_id] = info
+        return delta
+
+    def copy(self) -> "ExchangeInfo":
+        return ExchangeInfo(self)
+
+    def __reduce__(self):
+        # rebuild the indexes on unpickling instead of storing them
+        return self.__class__, (dict(self),)
+
+    def get_ids(self, market_type=None, base: str = None, quote: str = None, settle: str = None) -> set:
+        """
+        Ids of the instruments matching every given criterion
+        :param market_type: "spot", "margin", "futures", "perp", "linear", "inverse", or a list of them for
+            instruments of any of those types
+        :param base: base currency
+        :param quote: quote currency
+        :param settle: settle currency
+        """
+        if market_type is None:
+            ids = set(self)
+        elif isinstance(market_type, str):
+            ids = set(self._market_types[market_type])
+        else:
+            ids = set().union(*[self._market_types[t] for t in market_type])
+
+        for key, value in zip(self.CURRENCY_KEYS, [base, quote, settle]):
+            if value is not None:
+                ids &= self._currencies[key].get(value, set())
+        return ids
+
+    def filter(self, market_type=None, base: str = None, quote: str = None, settle: str = None) -> dict:
+        """
+        Instruments matching every given criterion, see `get_ids`
+        """
+        ids = self.get_ids(market_type, base=base, quote=quote, settle=settle)
+        return {k: v for k, v in self.items() if k in ids}
+
+    def get_ids_by_raw_symbol(self, raw_symbol: str, market_type=None) -> set:
+        """
+        Ids of the instruments listed under the exchange's own symbol, e.g. "BTCUSDT" on Binance is both a
+        spot and a perpetual market
+        """
+        ids = self._raw_symbols.get(raw_symbol, set())
+        return ids & self.get_ids(market_type) if market_type else set(ids)
+
+    def get_derived(self, key, build):
+        """
+        Structure derived from the instruments, e.g. a raw symbol -> id map, built once per `version` so repeated
+        lookups cost nothing until the instruments change. The result is shared, callers must not modify it.
+        :param key: hashable name of the structure
+        :param build: callable building the structure from this instance
+        """
+        if self._derived_version != self.version:
+            self._derived = {}
+            self._derived_version = self.version
+        if key not in self._derived:
+            self._derived[key] = build(self)
+        return self._derived[key]
@@ -0,0 +1,99 @@
+import asyncio
+import os
+import pickle
+import time
+
+from .exchange_info import ExchangeInfo, ExchangeInfoDelta
+
+# bumped whenever the parsed exchange info changes shape, so caches written by older versions are ignored
+CACHE_FORMAT = 1
+# seconds a cached exchange info is fresh, older ones are used while a fresh one downloads in the background
+EXCHANGE_INFO_TTL = 60 * 60
+
+
+def get_cache_file(cache_path: str, exchange: str) -> str:
+    return os.path.join(cache_path, f"{exchange}.exchange_info")
+
+
+def save_exchange_info(cache_path: str, exchange: str, infos: dict) -> None:
+    """
+    Write the exchange info to `cache_path`, one file per exchange. The file is replaced atomically, so processes
+    reading it never see a partial write.
+    :param cache_path: directory of the cache, created if missing
+    """
+    os.makedirs(cache_path, exist_ok=True)
+    path = get_cache_file(cache_path, exchange)
+    data = {"format": CACHE_FORMAT, "exchange": exchange, "saved_at": time.time(), "infos": dict(infos)}
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, path)
+
+
+def load_exchange_info(cache_path: str, exchange: str, ttl: float = EXCHANGE_INFO_TTL) -> tuple:
+    """
+    Read the exchange info cached by `save_exchange_info`. Missing or unreadable files, files written by another
+    cache format or for another exchange, and empty instrument lists are all misses.
+    The cache is pickled, only point `cache_path` at a directory no one else can write to.
+    :return: (ExchangeInfo, "fresh" | "stale"), or (None, None) on a miss
+    """
+    try:
+        with open(get_cache_file(cache_path, exchange), "rb") as f:
+            data = pickle.load(f)
+    except Exception:
+        # missing, truncated by a crash or written by an incompatible version of the package
+        return None, None
+
+    if (
+        not isinstance(data, dict)
+        or data.get("format") != CACHE_FORMAT
+        or data.get("exchange") != exchange
+        or not isinstance(data.get("infos"), dict)
+        or not data["infos"]
+    ):
+        return None, None
+
+    state = "fresh" if time.time() - data["saved_at"] < ttl else "stale"
+    return ExchangeInfo(data["infos"]), state
+
+
+async def sync_cached_exchange_info(exchange, cache_path: str, ttl: float = EXCHANGE_INFO_TTL) -> None:
+    """
+    Set `exchange.exchange_info` from the cache in `cache_path` when it has one, so restarts need no request.
+    A stale cache is used as is while a fresh exchange info downloads in the background, replaces it and is saved.
+    Without a cache the exchange info is downloaded and saved before returning.
+    The background download is kept in `exchange.exchange_info_refresh`, None when there is none.
+    :param exchange: facade with a `name`, `get_exchange_info` and `exchange_info`
+    """
+    infos, state = load_exchange_info(cache_path, exchange.name, ttl)
+    exchange.exchange_info_refresh = None
+    if infos is None:
+        await refresh_exchange_info(exchange, cache_path)
+        return
+
+    exchange.exchange_info = infos
+    if state == "stale":
+        exchange.exchange_info_refresh = asyncio.ensure_future(_refresh_in_background(exchange, cache_path))
+
+
+async def refresh_exchange_info(exchange, cache_path: str = None) -> ExchangeInfoDelta:
+    """
+    Download the exchange info and apply it to `exchange.exchange_info` in place, then save it to the cache if
+    `cache_path` is given
+    :return: the instruments added, removed and changed
+    """
+    infos = await exchange.get_exchange_info()
+    if not isinstance(exchange.exchange_info, ExchangeInfo):
+        exchange.exchange_info = ExchangeInfo(exchange.exchange_info)
+    delta = exchange.exchange_info.apply(infos)
+    if cache_path:
+        save_exchange_info(cache_path, exchange.name, exchange.exchange_info)
+    return delta
+
+
+async def _refresh_in_background(exchange, cache_path: str) -> None:
+    try:
+        await refresh_exchange_info(exchange, cache_path)
+    except Exception:
+        # nobody awaits a background refresh, the stale exchange info stays in use and the next sync retries
+        pass
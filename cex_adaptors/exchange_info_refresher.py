@@ -0,0 +1,135 @@
+import asyncio
+
+from .exchange_info import ExchangeInfo, ExchangeInfoDelta
+from .exchange_info_cache import (
+    EXCHANGE_INFO_TTL,
+    refresh_exchange_info,
+    sync_cached_exchange_info,
+)
+
+# seconds between two downloads of the instrument lists
+REFRESH_INTERVAL = 5 * 60
+
+
+class ExchangeInfoRefresher(object):
+    """
+    Background task keeping `exchange.exchange_info` up to date. Every `interval` seconds the instrument lists are
+    downloaded again and only the instruments added, removed or changed are applied to the live exchange info, so
+    new listings can be traded without a resync. Listeners receive each non-empty `ExchangeInfoDelta`, and one that
+    raises is skipped: `last_error` only records failed downloads.
+    :param exchange: facade with `get_exchange_info` and an `ExchangeInfo` as `exchange_info`
+    :param interval: seconds between two refreshes
+    :param cache_path: directory of the exchange info cache to keep up to date, see `sync_cached_exchange_info`
+    """
+
+    def __init__(self, exchange, interval: float = REFRESH_INTERVAL, cache_path: str = None):
+        self.exchange = exchange
+        self.interval = interval
+        self.cache_path = cache_path
+        self.listeners = []
+        self.task = None
+        # error of the last refresh, None once one succeeds
+        self.last_error = None
+
+    def subscribe(self, listener) -> None:
+        """
+        :param listener: function or coroutine function called with every non-empty `ExchangeInfoDelta`
+        """
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener) -> None:
+        self.listeners.remove(listener)
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def start(self) -> "ExchangeInfoRefresher":
+        if not self.running:
+            self.task = asyncio.ensure_future(self._run())
+        return self
+
+    async def stop(self) -> None:
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+    async def refresh(self) -> ExchangeInfoDelta:
+        """
+        Refresh once now and notify the listeners if anything changed
+        """
+        delta = await refresh_exchange_info(self.exchange, self.cache_path)
+        if delta:
+            for listener in list(self.listeners):
+                try:
+                    result = listener(delta)
+                    if asyncio.iscoroutine(result):
+                        await result
+                except Exception:
+                    # the delta is applied already, a failing listener must not keep it from the others
+                    pass
+        return delta
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh()
+                self.last_error = None
+            except Exception as e:
+                # the current instruments stay in use until the next refresh succeeds
+                self.last_error = e
+
+
+class ExchangeInfoMixin(object):
+    """
+    Exchange info syncing of the exchange adaptors, built on their own `get_exchange_info`
+    """
+
+    async def sync_exchange_info(self, cache_path: str = None, cache_ttl: float = EXCHANGE_INFO_TTL) -> None:
+        """
+        :param cache_path: directory of the exchange info cache, see `sync_cached_exchange_info`
+        :param cache_ttl: seconds a cached exchange info is used without downloading it again
+        """
+        if cache_path:
+            return await sync_cached_exchange_info(self, cache_path, cache_ttl)
+        self.exchange_info = ExchangeInfo.of(await self.get_exchange_info())
+
+    def start_exchange_info_refresher(
+        self, interval: float = REFRESH_INTERVAL, listener=None, cache_path: str = None
+    ) -> ExchangeInfoRefresher:
+        """
+        Keep `exchange_info` up to date in the background, see `ExchangeInfoRefresher`. `close` stops it
+        :param listener: called with the `ExchangeInfoDelta` of every refresh that changed something
+        """
+        refresher = ExchangeInfoRefresher(self, interval, cache_path)
+        if listener:
+            refresher.subscribe(listener)
+        self.exchange_info_refreshers = getattr(self, "exchange_info_refreshers", []) + [refresher]
+        return refresher.start()
+
+    async def close(self):
+        await self._stop_exchange_info_tasks()
+        await super().close()
+
+    async def _stop_exchange_info_tasks(self) -> None:
+        """
+        Stop the refreshers and the background download of `sync_exchange_info`, they use the sessions `close` ends
+        """
+        for refresher in getattr(self, "exchange_info_refreshers", []):
+            await refresher.stop()
+        self.exchange_info_refreshers = []
+
+        task = getattr(self, "exchange_info_refresh", None)
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self.exchange_info_refresh = None
@@ -1,17 +1,164 @@
-import json
+import asyncio
+import hashlib
+import re
+import time
 
 import aiohttp
+from yarl import URL
 
+from ..exceptions import (
+    DecodeError,
+    HTTPError,
+    NetworkError,
+    RateLimitError,
+    ServerError,
+)
 from .auth import BinanceAuth, OkxAuth
+from .cache import ResponseCache
+from .decoder import Decoder, get_default_decoder
+from .rate_limit import get_rate_limiter
+from .retry import RetryPolicy, parse_retry_after
+from .session import session_registry, warm_up
 
 
 class BaseClient(object):
     name = None
 
-    def __init__(self) -> None:
-        self._session = aiohttp.ClientSession()
+    # bucket name -> (capacity, period in seconds). "default" is charged by every request unless the endpoint
+    # says otherwise, "endpoint" gives each endpoint a bucket of its own, any other name is referenced explicitly
+    RATE_LIMITS = {}
+    # endpoint path -> weight, callable(params) -> weight, or {bucket name: weight}.
+    # Paths may contain `{}` placeholders for path parameters, e.g. "/api/v1/contracts/{}"
+    ENDPOINT_WEIGHTS = {}
+    # bucket name ("endpoint" for the bucket of the requested endpoint) -> response headers carrying its budget:
+    # "used" or "remaining", optionally "limit", "reset" (epoch or remaining milliseconds) and "period" in seconds
+    RATE_LIMIT_HEADERS = {}
 
-    async def _request(self, method: str, url: str, **kwargs):
+    # JSON backend of this client, None follows `decoder.set_default_decoder`
+    decoder: Decoder = None
+    # share one request between concurrent identical public GETs
+    coalesce: bool = True
+    # endpoint path -> seconds a public response stays fresh when the client has a cache, or callable(response)
+    # returning them for data valid until a known time, e.g. the next funding. Other endpoints are never cached
+    CACHE_TTLS = {}
+    # endpoint paths whose response bodies are hashed: a body identical to the last one of the same URL returns the
+    # object decoded then, so parsers can skip payloads they already parsed, see `ParserSpec.convert_rows`
+    HASHED_ENDPOINTS = set()
+
+    _endpoint_patterns = {}
+
+    def __init__(
+        self, session: aiohttp.ClientSession = None, retry_policy: RetryPolicy = None, cache: ResponseCache = None
+    ) -> None:
+        # injected sessions belong to the caller, otherwise a shared one is taken from the registry on first use
+        self._session = session
+        self._registry = None if session else session_registry
+        self._rate_limiter = None
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.cache = cache
+        self._in_flight = {}
+        self._revalidating = {}
+        # url -> (body hash, decoded body) of the last response of a hashed endpoint
+        self._payloads = {}
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or (self._registry and self._session.closed):
+            self._session = self._registry.acquire()
+        return self._session
+
+    async def _request(self, method: str, url: str, idempotent: bool = None, **kwargs):
+        """
+        :param idempotent: whether the request may be sent twice, GET requests are by default
+        """
+        if method not in ["GET", "POST"]:
+            raise ValueError(f"Invalid method: {method}")
+
+        if idempotent is None:
+            idempotent = method == "GET"
+
+        if method == "GET" and "auth_data" not in kwargs:
+            return await self._get_public(url, idempotent, **kwargs)
+        return await self._send_with_retry(method, url, idempotent, **kwargs)
+
+    async def _get_public(self, url: str, idempotent: bool, **kwargs):
+        """
+        Public responses may be shared with other callers through the cache or request coalescing,
+        so callers must not mutate them
+        """
+        params = kwargs.get("params") or {}
+        key = (url, tuple(sorted((k, str(v)) for k, v in params.items())))
+        endpoint = self._match_endpoint(URL(url).path, self.CACHE_TTLS) if self.cache is not None else None
+        if endpoint is None:
+            return await self._fetch(key, url, idempotent, **kwargs)
+
+        response, state = self.cache.get(key)
+        if state == "stale" and key not in self._revalidating:
+            task = asyncio.ensure_future(self._revalidate(key, endpoint, url, idempotent, **kwargs))
+            self._revalidating[key] = task
+            task.add_done_callback(lambda _: self._revalidating.pop(key, None))
+        if state is not None:
+            return response
+
+        response = await self._fetch(key, url, idempotent, **kwargs)
+        self._store(key, endpoint, response)
+        return response
+
+    async def _revalidate(self, key: tuple, endpoint: str, url: str, idempotent: bool, **kwargs) -> None:
+        try:
+            self._store(key, endpoint, await self._fetch(key, url, idempotent, **kwargs))
+        except Exception:
+            # nobody awaits a revalidation, the stale response keeps being served until it expires and the next miss
+            # surfaces the error
+            pass
+
+    def _store(self, key: tuple, endpoint: str, response) -> None:
+        ttl = self.CACHE_TTLS[endpoint]
+        if callable(ttl):
+            # data valid until a known time must not outlive it
+            self.cache.set(key, response, ttl(response), stale=0)
+        else:
+            self.cache.set(key, response, ttl)
+
+    async def _fetch(self, key: tuple, url: str, idempotent: bool, **kwargs):
+        """
+        Concurrent calls with the same key await a single request and receive the same response object
+        """
+        if not self.coalesce:
+            return await self._send_with_retry("GET", url, idempotent, **kwargs)
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._send_with_retry("GET", url, idempotent, **kwargs))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._on_coalesced_done(key, task))
+        # one caller being cancelled must not cancel the request the others are waiting for
+        return await asyncio.shield(task)
+
+    def _on_coalesced_done(self, key: tuple, task: asyncio.Future) -> None:
+        self._in_flight.pop(key, None)
+        # mark the error as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    async def _send_with_retry(self, method: str, url: str, idempotent: bool, **kwargs):
+        weights = self._get_request_weights(URL(url).path, kwargs.get("params") or {}) if self.RATE_LIMITS else {}
+        attempt = 0
+        while True:
+            try:
+                # signatures carry a timestamp, so every attempt is signed again
+                return await self._send_limited(method, url, weights, **self._sign(method, url, dict(kwargs)))
+            except (HTTPError, NetworkError) as e:
+                if not self.retry_policy.should_retry(e, attempt, idempotent):
+                    raise
+                delay = self.retry_policy.get_delay(e, attempt)
+                if isinstance(e, RateLimitError):
+                    # keep concurrent requests from running into the same limit meanwhile
+                    self.rate_limiter.pause(delay)
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    def _sign(self, method: str, url: str, kwargs: dict) -> dict:
         if "auth_data" in kwargs:
             # Private endpoint request
             auth_data = kwargs.pop("auth_data")
@@ -27,27 +174,162 @@ class BaseClient(object):
             elif self.name == "binance":
                 auth = BinanceAuth(**auth_data)
                 headers = auth.get_private_header()
-                kwargs["params"] = auth.update_params(kwargs.get("params", {}))
+                kwargs["params"] = auth.update_params(dict(kwargs.get("params", {})))
                 kwargs["headers"] = headers
+        return kwargs
+
+    async def _send_limited(self, method: str, url: str, weights: dict, **kwargs):
+        await self.rate_limiter.acquire(weights)
+        try:
+            semaphore = self._registry.get_host_semaphore(URL(url).host) if self._registry else None
+            if semaphore:
+                async with semaphore:
+                    return await self._send(method, url, weights=weights, **kwargs)
+            return await self._send(method, url, weights=weights, **kwargs)
+        finally:
+            self.rate_limiter.release(weights)
 
-        if method == "GET":
-            async with self._session.get(url, **kwargs) as response:
-                return await self._handle_response(response)
-        elif method == "POST":
-            async with self._session.post(url, **kwargs) as response:
-                return await self._handle_response(response)
+    @property
+    def rate_limiter(self):
+        if self._rate_limiter is None:
+            owner = next(c for c in type(self).__mro__ if "RATE_LIMITS" in vars(c))
+            self._rate_limiter = get_rate_limiter(f"{owner.__module__}.{owner.__qualname__}", self.RATE_LIMITS)
+        return self._rate_limiter
+
+    @classmethod
+    def _match_endpoint(cls, path: str, table: dict):
+        """
+        Find the key of `table` describing `path`, either an exact path or a `{}` template
+        """
+        if path in table:
+            return path
+
+        key = (id(table), path)
+        if key not in cls._endpoint_patterns:
+            cls._endpoint_patterns[key] = next(
+                (
+                    template
+                    for template in table
+                    if "{}" in template
+                    and re.fullmatch("[^/]+".join(re.escape(part) for part in template.split("{}")), path)
+                ),
+                None,
+            )
+        return cls._endpoint_patterns[key]
+
+    def _get_request_weights(self, path: str, params: dict) -> dict:
+        endpoint = self._match_endpoint(path, self.ENDPOINT_WEIGHTS)
+        weight = self.ENDPOINT_WEIGHTS[endpoint] if endpoint else 1
+
+        if isinstance(weight, dict):
+            weights = weight
         else:
-            raise ValueError(f"Invalid method: {method}")
+            weights = {"default": weight}
+            bucket = self._get_endpoint_bucket(path)
+            if bucket:
+                weights[bucket] = 1
+
+        return {k: v(params) if callable(v) else v for k, v in weights.items()}
+
+    def _get_endpoint_bucket(self, path: str):
+        bucket = self._match_endpoint(path, self.RATE_LIMITS)
+        if bucket is None:
+            endpoint = self._match_endpoint(path, self.ENDPOINT_WEIGHTS) or path
+            # buckets learned from response headers are charged like declared ones
+            if "endpoint" in self.RATE_LIMITS or endpoint in self.rate_limiter.buckets:
+                bucket = endpoint
+        return bucket
+
+    def _observe_rate_limit_headers(self, response: aiohttp.ClientResponse, weights: dict = None) -> None:
+        """
+        :param weights: weights the answered request was charged, already part of the budget the headers report
+        """
+        headers, path = response.headers, response.url.path
+        weights = weights or {}
+        for bucket, spec in self.RATE_LIMIT_HEADERS.items():
+            if bucket == "endpoint":
+                bucket = self._get_endpoint_bucket(path) or self._match_endpoint(path, self.ENDPOINT_WEIGHTS) or path
+
+            limit = self._parse_header(headers, spec.get("limit"))
+            if "used" in spec:
+                used = self._parse_header(headers, spec["used"])
+                if used is None:
+                    continue
+                limit = limit or self.RATE_LIMITS.get(bucket, (None,))[0]
+                if not limit:
+                    continue
+                remaining = limit - used
+            else:
+                remaining = self._parse_header(headers, spec["remaining"])
+                if remaining is None:
+                    continue
+
+            reset = self._parse_header(headers, spec.get("reset"))
+            if reset is not None:
+                # large values are epoch milliseconds, small ones milliseconds left in the window
+                reset = max(0.0, reset / 1000 - time.time()) if reset > 1e12 else reset / 1000
+
+            self.rate_limiter.observe(
+                bucket,
+                remaining,
+                limit=limit,
+                reset_in=reset,
+                period=spec.get("period", 1),
+                answered=weights.get(bucket, 0),
+            )
+
+    @staticmethod
+    def _parse_header(headers, name: str):
+        if not name or name not in headers:
+            return None
+        try:
+            return float(headers[name])
+        except ValueError:
+            return None
+
+    async def _send(self, method: str, url: str, weights: dict = None, **kwargs):
+        try:
+            async with self.session.request(method, url, **kwargs) as response:
+                return await self._handle_response(response, weights)
+        except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
+            raise NetworkError(f"{method} {url} failed: {e!r}") from e
+
+    async def _handle_response(self, response: aiohttp.ClientResponse, weights: dict = None):
+        if self.RATE_LIMIT_HEADERS:
+            self._observe_rate_limit_headers(response, weights)
 
-    async def _handle_response(self, response: aiohttp.ClientResponse):
         if response.status == 200:
-            try:
-                return await response.json()
-            except Exception as e:
-                print(e)
-                return json.loads(await response.text())
+            return self._decode(await response.read(), response)
         else:
-            raise Exception(f"Error {response.status} {response.reason} {await response.text()}")
+            raise self._get_http_error(response, await response.text())
+
+    def _decode(self, body: bytes, response: aiohttp.ClientResponse):
+        # decode straight from the bytes, skipping the charset detection and text copy of `response.json()`
+        digest = None
+        if self.HASHED_ENDPOINTS and self._match_endpoint(response.url.path, self.HASHED_ENDPOINTS):
+            digest = hashlib.blake2b(body, digest_size=16).digest()
+            payload = self._payloads.get(str(response.url))
+            if payload is not None and payload[0] == digest:
+                return payload[1]
+
+        decoder = self.decoder or get_default_decoder()
+        try:
+            data = decoder(body)
+        except decoder.errors as e:
+            raise DecodeError(f"Invalid JSON from {response.url}: {e} {body[:200]!r}") from e
+        if digest is not None:
+            self._payloads[str(response.url)] = (digest, data)
+        return data
+
+    @staticmethod
+    def _get_http_error(response: aiohttp.ClientResponse, body: str) -> HTTPError:
+        args = (response.status, response.reason, body)
+        kwargs = {"headers": dict(response.headers), "url": str(response.url)}
+        if response.status in (418, 429):
+            return RateLimitError(*args, retry_after=parse_retry_after(response.headers.get("Retry-After")), **kwargs)
+        if response.status >= 500:
+            return ServerError(*args, **kwargs)
+        return HTTPError(*args, **kwargs)
 
     async def _get(self, url: str, **kwargs):
         return await self._request("GET", url, **kwargs)
@@ -55,5 +337,21 @@ class BaseClient(object):
     async def _post(self, url: str, **kwargs):
         return await self._request("POST", url, **kwargs)
 
+    def _get_warm_up_urls(self) -> list:
+        return [url for url in [getattr(self, "BASE_ENDPOINT", None), getattr(self, "BASE_URL", None)] if url]
+
+    async def warm_up(self, connections: int = 1) -> None:
+        """
+        Open connections to the exchange before the first request
+        :param connections: number of connections to open per endpoint
+        """
+        await warm_up(self.session, self._get_warm_up_urls(), connections=connections)
+
     async def close(self):
-        await self._session.close()
+        for task in list(self._revalidating.values()):
+            task.cancel()
+        if self._session is None:
+            return
+        if self._registry:
+            await self._registry.release(self._session)
+            self._session = None
@@ -1,12 +1,76 @@
+import aiohttp
+
 from .base import BaseClient
+from .cache import ResponseCache
+from .retry import RetryPolicy
+
+
+def _get_spot_depth_weight(params: dict) -> int:
+    limit = int(params.get("limit", 100))
+    if limit <= 100:
+        return 5
+    elif limit <= 500:
+        return 25
+    elif limit <= 1000:
+        return 50
+    return 250
+
+
+def _get_futures_depth_weight(params: dict) -> int:
+    limit = int(params.get("limit", 500))
+    if limit <= 50:
+        return 2
+    elif limit <= 100:
+        return 5
+    elif limit <= 500:
+        return 10
+    return 20
+
+
+def _get_futures_klines_weight(params: dict) -> int:
+    limit = int(params.get("limit", 500))
+    if limit < 100:
+        return 1
+    elif limit < 500:
+        return 2
+    elif limit <= 1000:
+        return 5
+    return 10
 
 
 class BinanceSpot(BaseClient):
     BASE_ENDPOINT = "https://api{}.binance.com"
     name = "binance"
 
-    def __init__(self, api_key: str, api_secret: str, api_version: int = 3):
-        super().__init__()
+    RATE_LIMITS = {"default": (6000, 60), "sapi": (12000, 60)}
+    RATE_LIMIT_HEADERS = {
+        "default": {"used": "X-MBX-USED-WEIGHT-1M"},
+        "sapi": {"used": "X-SAPI-USED-IP-WEIGHT-1M"},
+    }
+    CACHE_TTLS = {"/api/v3/exchangeInfo": 600, "/api/v3/ticker/24hr": 1}
+    HASHED_ENDPOINTS = {"/api/v3/exchangeInfo"}
+    ENDPOINT_WEIGHTS = {
+        "/api/v3/exchangeInfo": 20,
+        "/api/v3/ticker/24hr": (lambda params: 2 if "symbol" in params else 80),
+        "/api/v3/klines": 2,
+        "/api/v3/depth": _get_spot_depth_weight,
+        "/api/v3/trades": 25,
+        "/api/v3/account": 20,
+        "/sapi/v1/margin/priceIndex": {"sapi": 10},
+        "/sapi/v1/margin/account": {"sapi": 10},
+        "/sapi/v1/margin/order": {"sapi": 6},
+    }
+
+    def __init__(
+        self,
+        api_key: str,
+        api_secret: str,
+        api_version: int = 3,
+        session: aiohttp.ClientSession = None,
+        retry_policy: RetryPolicy = None,
+        cache: ResponseCache = None,
+    ):
+        super().__init__(session=session, retry_policy=retry_policy, cache=cache)
         self.base_endpoint = self.BASE_ENDPOINT.format(api_version)
 
         self.auth_data = {
@@ -14,6 +78,9 @@ class BinanceSpot(BaseClient):
             "api_secret": api_secret,
         }
 
+    def _get_warm_up_urls(self) -> list:
+        return [self.base_endpoint]
+
     async def _get_exchange_info(self):
         return await self._get(self.base_endpoint + "/api/v3/exchangeInfo")
 
@@ -92,8 +159,26 @@ class BinanceSpot(BaseClient):
 class BinanceLinear(BaseClient):
     BASE_ENDPOINT = "https://fapi.binance.com"
 
-    def __init__(self) -> None:
-        super().__init__()
+    RATE_LIMITS = {"default": (2400, 60)}
+    RATE_LIMIT_HEADERS = {"default": {"used": "X-MBX-USED-WEIGHT-1M"}}
+    # premiumIndex carries the mark price besides the funding rate, so it cannot live until the next funding
+    CACHE_TTLS = {"/fapi/v1/exchangeInfo": 600, "/fapi/v1/ticker/24hr": 1, "/fapi/v1/premiumIndex": 1}
+    HASHED_ENDPOINTS = {"/fapi/v1/exchangeInfo"}
+    ENDPOINT_WEIGHTS = {
+        "/fapi/v1/exchangeInfo": 1,
+        "/fapi/v1/ticker/24hr": (lambda params: 1 if "symbol" in params else 40),
+        "/fapi/v1/klines": _get_futures_klines_weight,
+        "/fapi/v1/fundingRate": 1,
+        "/fapi/v1/premiumIndex": (lambda params: 1 if "symbol" in params else 10),
+        "/fapi/v1/openInterest": 1,
+        "/fapi/v1/openInterestHist": 1,
+        "/fapi/v1/depth": _get_futures_depth_weight,
+    }
+
+    def __init__(
+        self, session: aiohttp.ClientSession = None, retry_policy: RetryPolicy = None, cache: ResponseCache = None
+    ) -> None:
+        super().__init__(session=session, retry_policy=retry_policy, cache=cache)
         self.linear_base_endpoint = self.BASE_ENDPOINT
 
     async def _get_exchange_info(self):
@@ -162,8 +247,25 @@ class BinanceLinear(BaseClient):
 class BinanceInverse(BaseClient):
     BASE_ENDPOINT = "https://dapi.binance.com"
 
-    def __init__(self) -> None:
-        super().__init__()
+    RATE_LIMITS = {"default": (2400, 60)}
+    RATE_LIMIT_HEADERS = {"default": {"used": "X-MBX-USED-WEIGHT-1M"}}
+    CACHE_TTLS = {"/dapi/v1/exchangeInfo": 600, "/dapi/v1/ticker/24hr": 1, "/dapi/v1/premiumIndex": 1}
+    HASHED_ENDPOINTS = {"/dapi/v1/exchangeInfo"}
+    ENDPOINT_WEIGHTS = {
+        "/dapi/v1/exchangeInfo": 1,
+        "/dapi/v1/ticker/24hr": (lambda params: 1 if "symbol" in params else 40),
+        "/dapi/v1/klines": _get_futures_klines_weight,
+        "/dapi/v1/fundingRate": 1,
+        "/dapi/v1/premiumIndex": 10,
+        "/dapi/v1/openInterest": 1,
+        "/dapi/v1/openInterestHist": 1,
+        "/dapi/v1/depth": _get_futures_depth_weight,
+    }
+
+    def __init__(
+        self, session: aiohttp.ClientSession = None, retry_policy: RetryPolicy = None, cache: ResponseCache = None
+    ) -> None:
+        super().__init__(session=session, retry_policy=retry_policy, cache=cache)
         self.inverse_base_endpoint = self.BASE_ENDPOINT
 
     async def _get_exchange_info(self):
@@ -1,11 +1,31 @@
+import aiohttp
+
 from .base import BaseClient
+from .cache import ResponseCache, until_timestamp
+from .retry import RetryPolicy
 
 
 class BitgetUnified(BaseClient):
+    name = "bitget"
     BASE_URL = "https://api.bitget.com"
 
-    def __init__(self) -> None:
-        super().__init__()
+    # public endpoints are limited separately
+    RATE_LIMITS = {"endpoint": (20, 1)}
+    CACHE_TTLS = {
+        "/api/v2/spot/public/symbols": 600,
+        "/api/v2/mix/market/contracts": 600,
+        "/api/v2/spot/market/tickers": 1,
+        "/api/v2/mix/market/tickers": 1,
+        "/api/v2/mix/market/ticker": 1,
+        "/api/v2/mix/market/symbol-price": 1,
+        "/api/v2/mix/market/current-fund-rate": until_timestamp(lambda response: response["data"][0]["nextUpdate"]),
+    }
+    HASHED_ENDPOINTS = {"/api/v2/spot/public/symbols", "/api/v2/mix/market/contracts"}
+
+    def __init__(
+        self, session: aiohttp.ClientSession = None, retry_policy: RetryPolicy = None, cache: ResponseCache = None
+    ) -> None:
+        super().__init__(session=session, retry_policy=retry_policy, cache=cache)
         self.base_endpoint = self.BASE_URL
 
     async def _get_spot_exchange_info(self):
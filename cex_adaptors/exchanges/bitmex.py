@@ -1,8 +1,14 @@
+import aiohttp
+
 from .base import BaseClient
+from .cache import ResponseCache
+from .retry import RetryPolicy
 
 
 class Bitmex(BaseClient):
     name = "bitmex"
 
-    def __init__(self):
-        super().__init__()
+    def __init__(
+        self, session: aiohttp.ClientSession = None, retry_policy: RetryPolicy = None, cache: ResponseCache = None
+    ):
+        super().__init__(session=session, retry_policy=retry_policy, cache=cache)
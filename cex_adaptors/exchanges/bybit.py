@@ -1,12 +1,33 @@
+import aiohttp
+
 from .base import BaseClient
+from .cache import ResponseCache
+from .retry import RetryPolicy
 
 
 class BybitUnified(BaseClient):
     name = "bybit"
     BASE_ENDPOINT = "https://api.bybit.com"
 
-    def __init__(self):
-        super().__init__()
+    RATE_LIMITS = {"default": (600, 5)}
+    # per endpoint limits are only known from the response headers
+    RATE_LIMIT_HEADERS = {
+        "endpoint": {
+            "remaining": "X-Bapi-Limit-Status",
+            "limit": "X-Bapi-Limit",
+            "reset": "X-Bapi-Limit-Reset-Timestamp",
+            "period": 1,
+        }
+    }
+
+    # tickers also carry the mark and index prices and the funding rate
+    CACHE_TTLS = {"/v5/market/instruments-info": 600, "/v5/market/tickers": 1}
+    HASHED_ENDPOINTS = {"/v5/market/instruments-info"}
+
+    def __init__(
+        self, session: aiohttp.ClientSession = None, retry_policy: RetryPolicy = None, cache: ResponseCache = None
+    ):
+        super().__init__(session=session, retry_policy=retry_policy, cache=cache)
         self.base_endpoint = self.BASE_ENDPOINT
 
     async def _get_exchange_info(self, category: str) -> dict:
@@ -0,0 +1,90 @@
+import time
+from collections import OrderedDict
+
+
+class ResponseCache(object):
+    """
+    Size bounded LRU cache of public responses.
+    Entries are fresh for their TTL, then stale for `stale_ratio` times the TTL: stale entries are still served
+    while the client refreshes them in the background (stale-while-revalidate), after that they are dropped.
+    :param maxsize: number of responses kept before the least recently used one is evicted
+    :param stale_ratio: length of the stale window relative to the TTL, 0 disables serving stale responses
+    """
+
+    def __init__(self, maxsize: int = 1024, stale_ratio: float = 1.0):
+        self.maxsize = maxsize
+        self.stale_ratio = stale_ratio
+        self._entries = OrderedDict()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: tuple):
+        """
+        :return: (response, "fresh" | "stale"), or (None, None) on a miss
+        """
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is None or entry[2] <= now:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None, None
+
+        self._entries.move_to_end(key)
+        value, fresh_until, _ = entry
+        if fresh_until > now:
+            self.hits += 1
+            return value, "fresh"
+        self.stale_hits += 1
+        return value, "stale"
+
+    def set(self, key: tuple, value, ttl: float, stale: float = None) -> None:
+        """
+        :param ttl: seconds the response is fresh
+        :param stale: seconds the response may be served stale afterwards, defaults to `stale_ratio * ttl`
+        """
+        if ttl <= 0:
+            return
+        if stale is None:
+            stale = ttl * self.stale_ratio
+        now = time.monotonic()
+        self._entries[key] = (value, now + ttl, now + ttl + stale)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def get_stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+def until_timestamp(get_timestamp, default: float = 1):
+    """
+    TTL lasting until an epoch millisecond timestamp found in the response, e.g. the next funding time
+    :param get_timestamp: callable reading the timestamp from the decoded response
+    :param default: TTL used when the response does not carry the timestamp
+    """
+
+    def ttl(response) -> float:
+        try:
+            timestamp = float(get_timestamp(response))
+        except (KeyError, IndexError, TypeError, ValueError):
+            return default
+        return max(0.0, timestamp / 1000 - time.time())
+
+    return ttl
@@ -0,0 +1,68 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+
+class Decoder(object):
+    """
+    Turn raw response bytes into python objects
+    :param name: backend name
+    :param loads: callable decoding `bytes`
+    :param errors: exceptions raised by `loads` on malformed input
+    """
+
+    def __init__(self, name: str, loads, errors: tuple):
+        self.name = name
+        self.loads = loads
+        self.errors = errors
+
+    def __call__(self, data: bytes):
+        return self.loads(data)
+
+    def __repr__(self) -> str:
+        return f"Decoder({self.name!r})"
+
+
+DECODERS = {"json": Decoder("json", json.loads, (ValueError,))}
+if orjson is not None:
+    DECODERS["orjson"] = Decoder("orjson", orjson.loads, (orjson.JSONDecodeError,))
+if msgspec is not None:
+    DECODERS["msgspec"] = Decoder("msgspec", msgspec.json.Decoder().decode, (msgspec.DecodeError,))
+
+# fastest installed backend first
+_PREFERENCE = ["orjson", "msgspec", "json"]
+
+
+def get_decoder(name: str = "auto") -> Decoder:
+    """
+    :param name: "json", "orjson", "msgspec", or "auto" for the fastest one installed
+    """
+    if name == "auto":
+        return next(DECODERS[n] for n in _PREFERENCE if n in DECODERS)
+    if name not in DECODERS:
+        raise ValueError(f"JSON decoder {name} is not available, installed: {list(DECODERS)}")
+    return DECODERS[name]
+
+
+_default_decoder = get_decoder()
+
+
+def set_default_decoder(name: str) -> Decoder:
+    """
+    Choose the decoder used by every client that does not set one of its own
+    """
+    global _default_decoder
+    _default_decoder = get_decoder(name)
+    return _default_decoder
+
+
+def get_default_decoder() -> Decoder:
+    return _default_decoder
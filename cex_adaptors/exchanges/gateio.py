@@ -1,11 +1,48 @@
+import aiohttp
+
 from .base import BaseClient
+from .cache import ResponseCache
+from .retry import RetryPolicy
 
 
 class GateioUnified(BaseClient):
+    name = "gateio"
     BASE_URL = "https://api.gateio.ws/api/v4"
 
-    def __init__(self) -> None:
-        super().__init__()
+    # public endpoints are limited separately, settle currencies share the limit of their endpoint
+    RATE_LIMITS = {"endpoint": (200, 10)}
+    RATE_LIMIT_HEADERS = {
+        "endpoint": {
+            "remaining": "X-Gate-RateLimit-Requests-Remain",
+            "limit": "X-Gate-RateLimit-Limit",
+            "reset": "X-Gate-RateLimit-Reset-Timestamp",
+            "period": 10,
+        }
+    }
+    CACHE_TTLS = {
+        "/api/v4/spot/currency_pairs": 600,
+        "/api/v4/futures/{}/contracts": 600,
+        "/api/v4/delivery/{}/contracts": 600,
+        "/api/v4/spot/tickers": 1,
+        "/api/v4/futures/{}/tickers": 1,
+        "/api/v4/delivery/{}/tickers": 1,
+    }
+    HASHED_ENDPOINTS = {"/api/v4/spot/currency_pairs", "/api/v4/futures/{}/contracts", "/api/v4/delivery/{}/contracts"}
+    ENDPOINT_WEIGHTS = {
+        "/api/v4/futures/{}/contracts": 1,
+        "/api/v4/futures/{}/tickers": 1,
+        "/api/v4/futures/{}/candlesticks": 1,
+        "/api/v4/futures/{}/funding_rate": 1,
+        "/api/v4/futures/{}/premium_index": 1,
+        "/api/v4/delivery/{}/contracts": 1,
+        "/api/v4/delivery/{}/tickers": 1,
+        "/api/v4/delivery/{}/candlesticks": 1,
+    }
+
+    def __init__(
+        self, session: aiohttp.ClientSession = None, retry_policy: RetryPolicy = None, cache: ResponseCache = None
+    ) -> None:
+        super().__init__(session=session, retry_policy=retry_policy, cache=cache)
         self.base_url = self.BASE_URL
 
     async def _get_currency_pairs(self):
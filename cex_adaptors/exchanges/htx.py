@@ -1,11 +1,25 @@
+import aiohttp
+
 from .base import BaseClient
+from .cache import ResponseCache, until_timestamp
+from .retry import RetryPolicy
 
 
 class HtxSpot(BaseClient):
+    name = "htx"
     BASE_URL = "https://api.huobi.pro"
 
-    def __init__(self):
-        super().__init__()
+    RATE_LIMITS = {"default": (100, 1)}
+    RATE_LIMIT_HEADERS = {
+        "default": {"remaining": "ratelimit-remaining", "limit": "ratelimit-limit", "reset": "ratelimit-reset"}
+    }
+    CACHE_TTLS = {"/v2/settings/common/symbols": 600, "/market/tickers": 1}
+    HASHED_ENDPOINTS = {"/v2/settings/common/symbols"}
+
+    def __init__(
+        self, session: aiohttp.ClientSession = None, retry_policy: RetryPolicy = None, cache: ResponseCache = None
+    ):
+        super().__init__(session=session, retry_policy=retry_policy, cache=cache)
         self.base_endpoint = self.BASE_URL
 
     async def _get_exchange_info(self):
@@ -21,10 +35,49 @@ class HtxSpot(BaseClient):
 
 
 class HtxFutures(BaseClient):
+    name = "htx"
     BASE_URL = "https://api.hbdm.com"
 
-    def __init__(self):
-        super().__init__()
+    # market data has its own, larger limit than the other public endpoints
+    RATE_LIMITS = {"default": (120, 3), "market": (800, 1)}
+    RATE_LIMIT_HEADERS = {
+        "default": {"remaining": "ratelimit-remaining", "limit": "ratelimit-limit", "reset": "ratelimit-reset"}
+    }
+    CACHE_TTLS = {
+        "/linear-swap-api/v1/swap_contract_info": 600,
+        "/api/v1/contract_contract_info": 600,
+        "/swap-api/v1/swap_contract_info": 600,
+        "/v2/linear-swap-ex/market/detail/batch_merged": 1,
+        "/v2/swap-ex/market/detail/batch_merged": 1,
+        "/v2/market/detail/batch_merged": 1,
+        "/linear-swap-api/v1/swap_funding_rate": until_timestamp(lambda response: response["data"]["funding_time"]),
+        "/swap-api/v1/swap_funding_rate": until_timestamp(lambda response: response["data"]["funding_time"]),
+        "/linear-swap-api/v1/swap_index": 1,
+        "/api/v1/contract_index": 1,
+        "/swap-api/v1/swap_index": 1,
+    }
+    HASHED_ENDPOINTS = {
+        "/linear-swap-api/v1/swap_contract_info",
+        "/api/v1/contract_contract_info",
+        "/swap-api/v1/swap_contract_info",
+    }
+    ENDPOINT_WEIGHTS = {
+        "/v2/linear-swap-ex/market/detail/batch_merged": {"market": 1},
+        "/v2/swap-ex/market/detail/batch_merged": {"market": 1},
+        "/v2/market/detail/batch_merged": {"market": 1},
+        "/linear-swap-ex/market/history/kline": {"market": 1},
+        "/swap-ex/market/history/kline": {"market": 1},
+        "/market/history/kline": {"market": 1},
+        "/linear-swap-ex/market/detail/merged": {"market": 1},
+        "/index/market/history/linear_swap_mark_price_kline": {"market": 1},
+        "/index/market/history/mark_price_kline": {"market": 1},
+        "/index/market/history/swap_mark_price_kline": {"market": 1},
+    }
+
+    def __init__(
+        self, session: aiohttp.ClientSession = None, retry_policy: RetryPolicy = None, cache: ResponseCache = None
+    ):
+        super().__init__(session=session, retry_policy=retry_policy, cache=cache)
         self.base_endpoint = self.BASE_URL
 
     async def _get_linear_contract_info(self):
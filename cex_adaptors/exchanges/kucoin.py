@@ -1,11 +1,43 @@
+import aiohttp
+
 from .base import BaseClient
+from .cache import ResponseCache, until_timestamp
+from .retry import RetryPolicy
 
 
 class KucoinSpot(BaseClient):
+    name = "kucoin"
     BASE_ENDPOINT = "https://api.kucoin.com"
 
-    def __init__(self) -> None:
-        super().__init__()
+    # public resource pool
+    RATE_LIMITS = {"default": (2000, 30)}
+    RATE_LIMIT_HEADERS = {
+        "default": {"remaining": "gw-ratelimit-remaining", "limit": "gw-ratelimit-limit", "reset": "gw-ratelimit-reset"}
+    }
+    CACHE_TTLS = {
+        "/api/v3/currencies": 600,
+        "/api/v2/symbols": 600,
+        "/api/v1/market/allTickers": 1,
+        "/api/v1/market/stats": 1,
+        "/api/v1/mark-price/{}/current": 1,
+    }
+    HASHED_ENDPOINTS = {"/api/v3/currencies", "/api/v2/symbols"}
+    ENDPOINT_WEIGHTS = {
+        "/api/v3/currencies": 3,
+        "/api/v2/symbols": 4,
+        "/api/v1/market/allTickers": 15,
+        "/api/v1/market/stats": 15,
+        "/api/v1/market/candles": 3,
+        "/api/v1/mark-price/{}/current": 2,
+        "/api/v1/market/orderbook/level2_20": 2,
+        "/api/v1/market/orderbook/level2_100": 4,
+        "/api/v3/market/orderbook/level2": 3,
+    }
+
+    def __init__(
+        self, session: aiohttp.ClientSession = None, retry_policy: RetryPolicy = None, cache: ResponseCache = None
+    ) -> None:
+        super().__init__(session=session, retry_policy=retry_policy, cache=cache)
         self.spot_base_endpoint = self.BASE_ENDPOINT
 
     async def _get_currency_list(self):
@@ -52,10 +84,42 @@ class KucoinSpot(BaseClient):
 
 
 class KucoinFutures(BaseClient):
+    name = "kucoin"
     BASE_ENDPOINT = "https://api-futures.kucoin.com"
 
-    def __init__(self) -> None:
-        super().__init__()
+    # public resource pool
+    RATE_LIMITS = {"default": (2000, 30)}
+    RATE_LIMIT_HEADERS = {
+        "default": {"remaining": "gw-ratelimit-remaining", "limit": "gw-ratelimit-limit", "reset": "gw-ratelimit-reset"}
+    }
+    CACHE_TTLS = {
+        "/api/v1/contracts/active": 600,
+        "/api/v1/contracts/{}": 600,
+        "/api/v1/ticker": 1,
+        "/api/v1/mark-price/{}/current": 1,
+        "/api/v1/funding-rate/{}/current": until_timestamp(
+            lambda response: response["data"]["timePoint"] + response["data"]["granularity"]
+        ),
+    }
+    HASHED_ENDPOINTS = {"/api/v1/contracts/active"}
+    ENDPOINT_WEIGHTS = {
+        "/api/v1/contracts/active": 3,
+        "/api/v1/ticker": 2,
+        "/api/v1/contracts/{}": 3,
+        "/api/v1/kline/query": 3,
+        "/api/v1/mark-price/{}/current": 3,
+        "/api/v1/level2/depth20": 5,
+        "/api/v1/level2/depth100": 10,
+        "/api/v1/level2/snapshot": 3,
+        "/api/v1/funding-rate/{}/current": 2,
+        "/api/v1/contract/funding-rates": 5,
+        "/api/v1/funding-history": 5,
+    }
+
+    def __init__(
+        self, session: aiohttp.ClientSession = None, retry_policy: RetryPolicy = None, cache: ResponseCache = None
+    ) -> None:
+        super().__init__(session=session, retry_policy=retry_policy, cache=cache)
         self.futures_base_endpoint = self.BASE_ENDPOINT
 
     async def _get_symbol_list(self):
@@ -1,10 +1,45 @@
+import aiohttp
+
 from .base import BaseClient
+from .cache import ResponseCache, until_timestamp
+from .retry import RetryPolicy
 
 
 class OkxUnified(BaseClient):
     name = "okx"
     BASE_ENDPOINT = "https://www.okx.com"
 
+    # OKX limits every endpoint separately, (requests, seconds). Its responses carry no rate limit headers,
+    # so these static buckets are the only budget
+    RATE_LIMITS = {
+        "/api/v5/public/instruments": (20, 2),
+        "/api/v5/market/tickers": (20, 2),
+        "/api/v5/market/ticker": (20, 2),
+        "/api/v5/market/candles": (40, 2),
+        "/api/v5/public/funding-rate": (20, 2),
+        "/api/v5/public/funding-rate-history": (10, 2),
+        "/api/v5/market/index-tickers": (20, 2),
+        "/api/v5/public/mark-price": (10, 2),
+        "/api/v5/public/open-interest": (20, 2),
+        "/api/v5/market/books": (40, 2),
+        "/api/v5/account/balance": (10, 2),
+        "/api/v5/account/positions": (10, 2),
+        "/api/v5/account/config": (5, 2),
+        "/api/v5/trade/order": (60, 2),
+        "/api/v5/trade/cancel-order": (60, 2),
+        "/api/v5/trade/orders-pending": (60, 2),
+        "/api/v5/trade/orders-history": (40, 2),
+    }
+    CACHE_TTLS = {
+        "/api/v5/public/instruments": 600,
+        "/api/v5/market/tickers": 1,
+        "/api/v5/market/ticker": 1,
+        "/api/v5/public/funding-rate": until_timestamp(lambda response: response["data"][0]["fundingTime"]),
+        "/api/v5/market/index-tickers": 1,
+        "/api/v5/public/mark-price": 1,
+    }
+    HASHED_ENDPOINTS = {"/api/v5/public/instruments"}
+
     def __init__(
         self,
         api_key: str,
@@ -13,8 +48,11 @@ class OkxUnified(BaseClient):
         use_server_time: bool = False,
         debug: bool = False,
         flag: str = "1",
+        session: aiohttp.ClientSession = None,
+        retry_policy: RetryPolicy = None,
+        cache: ResponseCache = None,
     ):
-        super().__init__()
+        super().__init__(session=session, retry_policy=retry_policy, cache=cache)
         self.api_key = api_key
         self.api_secret = api_secret
         self.passphrase = passphrase
@@ -126,6 +164,8 @@ class OkxUnified(BaseClient):
             self.BASE_ENDPOINT + "/api/v5/trade/cancel-order",
             auth_data=self.auth_data,
             params={"instId": instId, "ordId": ordId},
+            # cancelling an order twice leaves it cancelled
+            idempotent=True,
         )
 
     async def _get_opended_orders(
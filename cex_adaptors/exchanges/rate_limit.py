@@ -0,0 +1,175 @@
+import asyncio
+import time
+
+
+class TokenBucket(object):
+    """
+    Weighted token bucket refilled continuously at `capacity / period` tokens per second.
+    Callers reserve their weight up front and sleep until the reservation is covered, so waiting never blocks
+    the event loop and requests are released in the order they arrived.
+    """
+
+    def __init__(self, capacity: float, period: float):
+        self.capacity = float(capacity)
+        self.period = float(period)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+        # weight of requests sent but not answered yet, and the last budget reported by the exchange
+        self.in_flight = 0.0
+        self.observed = None
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.period
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, weight: float) -> float:
+        """
+        Take `weight` tokens, possibly going into debt
+        :return: seconds to wait until the reservation is covered
+        """
+        self._refill()
+        self.tokens -= min(weight, self.capacity)
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self, weight: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + min(weight, self.capacity))
+
+    def sync(self, remaining: float, limit: float = None, reset_in: float = None, answered: float = 0) -> None:
+        """
+        Align the bucket with the budget reported by the exchange. The server view wins in both directions:
+        requests speed up when other consumers left more budget than we assumed and slow down when they used it.
+        :param remaining: weight the exchange still accepts in the current window
+        :param limit: total weight of the window, replaces the declared capacity
+        :param reset_in: seconds until the exchange resets the window
+        :param answered: weight of the request whose response reported the budget, still counted in flight
+        """
+        self._refill()
+        if limit:
+            self.capacity = float(limit)
+
+        # requests queued on this bucket or already on the wire are not part of the reported budget yet
+        pending = max(0.0, -self.tokens) + max(0.0, self.in_flight - answered)
+        tokens = remaining - pending
+        if remaining <= 0 and reset_in:
+            # nothing left, hold everything back until the window resets
+            tokens = min(tokens, -reset_in * self.rate - pending)
+        self.tokens = min(self.capacity, tokens)
+
+        self.observed = {"remaining": remaining, "limit": limit, "reset_in": reset_in, "timestamp": time.time()}
+
+
+class RateLimiter(object):
+    """
+    Group of named token buckets shared by every client of one exchange API
+    :param limits: bucket name -> (capacity, period in seconds)
+    """
+
+    def __init__(self, limits: dict):
+        self.limits = limits
+        self.buckets = {}
+
+    def get_bucket(self, name: str) -> TokenBucket:
+        if name not in self.buckets:
+            if name in self.limits:
+                capacity, period = self.limits[name]
+            elif name.startswith("/") and "endpoint" in self.limits:
+                # each endpoint gets its own bucket with the shared per-endpoint limit
+                capacity, period = self.limits["endpoint"]
+            else:
+                return None
+            self.buckets[name] = TokenBucket(capacity, period)
+        return self.buckets[name]
+
+    async def acquire(self, weights: dict) -> None:
+        """
+        Wait until every bucket in `weights` (bucket name -> weight) can serve the request.
+        Every acquire must be paired with a `release` once the response arrived
+        """
+        reserved = []
+        delay = 0.0
+        for name, weight in weights.items():
+            bucket = self.get_bucket(name)
+            if bucket is None or not weight:
+                continue
+            delay = max(delay, bucket.reserve(weight))
+            reserved.append((bucket, weight))
+
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                for bucket, weight in reserved:
+                    bucket.refund(weight)
+                raise
+
+        for bucket, weight in reserved:
+            bucket.in_flight += weight
+
+    def release(self, weights: dict) -> None:
+        for name, weight in weights.items():
+            bucket = self.buckets.get(name)
+            if bucket is not None and weight:
+                bucket.in_flight = max(0.0, bucket.in_flight - weight)
+
+    def observe(
+        self,
+        name: str,
+        remaining: float,
+        limit: float = None,
+        reset_in: float = None,
+        period: float = 1,
+        answered: float = 0,
+    ):
+        """
+        Feed a budget reported by the exchange into bucket `name`, creating it when the exchange reveals a limit
+        that was not declared
+        :param answered: weight the reporting request reserved on `name`, already included in `remaining`
+        """
+        bucket = self.get_bucket(name)
+        if bucket is None:
+            if not limit:
+                return
+            bucket = self.buckets[name] = TokenBucket(limit, period)
+        bucket.sync(remaining, limit=limit, reset_in=reset_in, answered=answered)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Hold back every request for `seconds`, used when the exchange reports the limit was exceeded
+        """
+        for bucket in self.buckets.values():
+            bucket._refill()
+            bucket.tokens = min(bucket.tokens, -seconds * bucket.rate)
+
+    def get_budget(self) -> dict:
+        """
+        Snapshot of every bucket, for monitoring how close the process runs to the exchange limits
+        """
+        budget = {}
+        for name, bucket in self.buckets.items():
+            bucket._refill()
+            budget[name] = {
+                "tokens": bucket.tokens,
+                "capacity": bucket.capacity,
+                "rate": bucket.rate,
+                "in_flight": bucket.in_flight,
+                "observed": bucket.observed,
+            }
+        return budget
+
+
+_rate_limiters = {}
+
+
+def get_rate_limiter(key: str, limits: dict) -> RateLimiter:
+    """
+    Return the process-wide limiter for `key`, so every client hitting the same API shares one budget
+    """
+    if key not in _rate_limiters:
+        _rate_limiters[key] = RateLimiter(limits)
+    return _rate_limiters[key]
@@ -0,0 +1,78 @@
+import email.utils
+import random
+import time
+
+from ..exceptions import ExchangeError, HTTPError, NetworkError, RateLimitError
+
+
+class RetryPolicy(object):
+    """
+    Decide whether a failed request is sent again and how long to wait before doing so.
+    Delays grow exponentially with "full jitter" so concurrent clients do not retry in lockstep, and a
+    `Retry-After` given by the exchange always wins over the computed backoff.
+    :param max_retries: retries after the first attempt, 0 disables retrying
+    :param backoff: delay of the first retry in seconds, doubled on every further retry
+    :param max_backoff: upper bound of the computed delay in seconds
+    :param jitter: randomise delays between 0 and the computed backoff
+    :param statuses: HTTP statuses worth retrying
+    :param retry_post: retry POST requests too. POSTs may have been executed before failing, so they are only
+        retried when this is set or the call is marked idempotent (e.g. orders carrying a client order id)
+    :param max_retry_after: give up instead of waiting when the exchange asks for a longer pause, in seconds
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 30,
+        jitter: bool = True,
+        statuses: tuple = (418, 429, 500, 502, 503, 504),
+        retry_post: bool = False,
+        max_retry_after: float = 120,
+    ):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.statuses = set(statuses)
+        self.retry_post = retry_post
+        self.max_retry_after = max_retry_after
+
+    def should_retry(self, error: ExchangeError, attempt: int, idempotent: bool) -> bool:
+        """
+        :param error: error raised by the last attempt
+        :param attempt: number of retries already made
+        :param idempotent: whether sending the request twice is harmless
+        """
+        if attempt >= self.max_retries or not (idempotent or self.retry_post):
+            return False
+        if isinstance(error, RateLimitError) and (error.retry_after or 0) > self.max_retry_after:
+            return False
+        if isinstance(error, HTTPError):
+            return error.status in self.statuses
+        return isinstance(error, NetworkError)
+
+    def get_delay(self, error: ExchangeError, attempt: int) -> float:
+        delay = min(self.max_backoff, self.backoff * 2**attempt)
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        if isinstance(error, RateLimitError) and error.retry_after is not None:
+            delay = max(delay, error.retry_after)
+        return delay
+
+
+def parse_retry_after(value: str):
+    """
+    Parse a `Retry-After` header, given either in seconds or as an HTTP date
+    :return: seconds to wait, None when the header is missing or malformed
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
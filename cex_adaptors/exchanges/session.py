@@ -0,0 +1,132 @@
+import asyncio
+
+import aiohttp
+
+
+class SessionConfig(object):
+    """
+    Connection pool settings shared by every client that uses the registry
+    :param limit: total number of simultaneous connections
+    :param limit_per_host: simultaneous connections to a single host, 0 means no limit
+    :param host_limits: per host overrides of `limit_per_host`, e.g. {"api.binance.com": 20}
+    :param keepalive_timeout: seconds an idle connection is kept open for reuse
+    :param ttl_dns_cache: seconds a resolved DNS record is cached, None caches forever
+    :param timeout: total timeout of a single request in seconds
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        host_limits: dict = None,
+        keepalive_timeout: float = 30,
+        ttl_dns_cache: int = 300,
+        timeout: float = 30,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.host_limits = host_limits or {}
+        self.keepalive_timeout = keepalive_timeout
+        self.ttl_dns_cache = ttl_dns_cache
+        self.timeout = timeout
+
+    def create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.ttl_dns_cache,
+            use_dns_cache=True,
+        )
+        return aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout))
+
+    def get_host_semaphore(self, host: str):
+        if host not in self.host_limits:
+            return None
+        return asyncio.Semaphore(self.host_limits[host])
+
+
+class SessionRegistry(object):
+    """
+    Process-wide registry handing out one shared `aiohttp.ClientSession` per event loop, so every exchange
+    client reuses the same connection pool, DNS cache and TLS sessions.
+    Sessions are reference counted and closed once the last client releases them. Entries of event loops that were
+    closed without releasing them are dropped when a session or semaphore is next looked up.
+    """
+
+    def __init__(self, config: SessionConfig = None):
+        self.config = config or SessionConfig()
+        self._sessions = {}
+        self._refs = {}
+        self._host_semaphores = {}
+
+    def configure(self, config: SessionConfig = None, **kwargs) -> None:
+        """
+        Replace the pool settings, only sessions created afterwards are affected
+        """
+        self.config = config or SessionConfig(**kwargs)
+
+    def acquire(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        self._evict_closed_loops()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = self.config.create_session()
+            self._sessions[loop] = session
+            self._refs[loop] = 0
+        self._refs[loop] += 1
+        return session
+
+    async def release(self, session: aiohttp.ClientSession) -> None:
+        for loop, _session in list(self._sessions.items()):
+            if _session is not session:
+                continue
+            self._refs[loop] -= 1
+            if self._refs[loop] <= 0:
+                del self._sessions[loop]
+                del self._refs[loop]
+                self._host_semaphores.pop(loop, None)
+                await session.close()
+            return
+
+    def get_host_semaphore(self, host: str):
+        loop = asyncio.get_running_loop()
+        self._evict_closed_loops()
+        semaphores = self._host_semaphores.setdefault(loop, {})
+        if host not in semaphores:
+            semaphores[host] = self.config.get_host_semaphore(host)
+        return semaphores[host]
+
+    def _evict_closed_loops(self) -> None:
+        # sessions bound to a closed loop cannot be used nor closed anymore, only marked closed and forgotten
+        for loop in [loop for loop in set(self._sessions) | set(self._host_semaphores) if loop.is_closed()]:
+            session = self._sessions.pop(loop, None)
+            if session is not None:
+                session.detach()
+            self._refs.pop(loop, None)
+            self._host_semaphores.pop(loop, None)
+
+    async def close(self) -> None:
+        for session in list(self._sessions.values()):
+            await session.close()
+        self._sessions.clear()
+        self._refs.clear()
+        self._host_semaphores.clear()
+
+
+session_registry = SessionRegistry()
+
+
+async def warm_up(session: aiohttp.ClientSession, urls: list, connections: int = 1) -> None:
+    """
+    Pre-connect to the given urls so the first real request skips DNS lookup and TLS handshake
+    :param session: session whose pool keeps the opened connections
+    :param urls: endpoints to connect to
+    :param connections: number of connections to open per url
+    """
+
+    async def _touch(url: str) -> None:
+        async with session.head(url, allow_redirects=False) as response:
+            await response.release()
+
+    await asyncio.gather(*[_touch(url) for url in urls for _ in range(connections)], return_exceptions=True)
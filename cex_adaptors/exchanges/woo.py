@@ -1,12 +1,22 @@
+import aiohttp
+
 from .base import BaseClient
+from .cache import ResponseCache
+from .retry import RetryPolicy
 
 
 class WOOUnified(BaseClient):
     name = "woo"
     BASE_ENDPOINT = "https://api.woo.org"
 
-    def __init__(self):
-        super().__init__()
+    RATE_LIMITS = {"default": (10, 1)}
+
+    CACHE_TTLS = {"/v1/public/info": 600}
+
+    def __init__(
+        self, session: aiohttp.ClientSession = None, retry_policy: RetryPolicy = None, cache: ResponseCache = None
+    ):
+        super().__init__(session=session, retry_policy=retry_policy, cache=cache)
         self.base_endpoint = self.BASE_ENDPOINT
 
     async def _get_available_symbols(self):
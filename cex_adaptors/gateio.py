@@ -1,40 +1,58 @@
+from typing import Union
+
+import aiohttp
+
+from .candles import CandleFrame
+from .exchange_info import ExchangeInfo
+from .exchange_info_refresher import ExchangeInfoMixin
+from .exchanges.cache import ResponseCache
 from .exchanges.gateio import GateioUnified
+from .exchanges.retry import RetryPolicy
+from .pagination import HistoryMixin, PageAccumulator, fetch_windows, plan_windows
 from .parsers.gateio import GateioParser
+from .utils import gather_bounded
 
 
-class Gateio(GateioUnified):
+class Gateio(ExchangeInfoMixin, HistoryMixin, GateioUnified):
     name = "gateio"
+    # candlesticks and funding rates per request
+    CANDLESTICK_LIMIT = 1000
+    FUNDING_RATE_LIMIT = None
 
     PERP_SETTLE = ["btc", "usdt", "usd"]
 
-    def __init__(self):
-        super().__init__()
+    def __init__(
+        self, session: aiohttp.ClientSession = None, retry_policy: RetryPolicy = None, cache: ResponseCache = None
+    ):
+        super().__init__(session=session, retry_policy=retry_policy, cache=cache)
         self.parser = GateioParser()
-        self.exchange_info = {}
-
-    async def sync_exchange_info(self):
-        self.exchange_info = await self.get_exchange_info()
+        self.exchange_info = ExchangeInfo()
 
     async def get_exchange_info(self):
-        spot = self.parser.parse_exchange_info(await self._get_currency_pairs(), self.parser.spot_exchange_info_parser)
+        settle = "usdt"
+        spot_info, futures_info, *perp_infos = await gather_bounded(
+            self._get_currency_pairs(),
+            self._get_futures_info(settle),
+            *[self._get_perp_info(perp_settle) for perp_settle in self.PERP_SETTLE],
+        )
+        spot = self.parser.parse_exchange_info(spot_info, self.parser.spot_exchange_info_parser)
 
-        perps = {}
-        for settle in self.PERP_SETTLE:
+        perps = ExchangeInfo()
+        for perp_settle, perp_info in zip(self.PERP_SETTLE, perp_infos):
             perp = self.parser.parse_exchange_info(
-                await self._get_perp_info(settle),
+                perp_info,
                 self.parser.perp_exchange_info_parser,
-                settle=settle.upper(),
+                settle=perp_settle.upper(),
             )
             perps.update(perp)
 
-        settle = "usdt"
         futures = self.parser.parse_exchange_info(
-            await self._get_futures_info(settle),
+            futures_info,
             self.parser.futures_exchange_info_parser,
             settle=settle.upper(),
         )
 
-        return {**spot, **perps, **futures}
+        return ExchangeInfo.merge(spot, perps, futures)
 
     async def get_tickers(self, market_type: str = None) -> dict:
         if market_type == "spot":
@@ -44,21 +62,25 @@ class Gateio(GateioUnified):
                 await self._get_futures_tickers(settle="usdt"), self.exchange_info, "futures"
             )
         elif market_type == "perp":
-            perps = {}
-            for settle in self.PERP_SETTLE:
-                perp = self.parser.parse_tickers(await self._get_perp_tickers(settle), self.exchange_info, "perp")
-                perps.update(perp)
-            return perps
+            return self._parse_perp_tickers(
+                await gather_bounded(*[self._get_perp_tickers(settle) for settle in self.PERP_SETTLE])
+            )
         else:
-            spot = self.parser.parse_tickers(await self._get_spot_tickers(), self.exchange_info, "spot")
-            futures = self.parser.parse_tickers(
-                await self._get_futures_tickers(settle="usdt"), self.exchange_info, "futures"
+            spot_tickers, futures_tickers, *perp_tickers = await gather_bounded(
+                self._get_spot_tickers(),
+                self._get_futures_tickers(settle="usdt"),
+                *[self._get_perp_tickers(settle) for settle in self.PERP_SETTLE],
             )
-            perps = {}
-            for settle in self.PERP_SETTLE:
-                perp = self.parser.parse_tickers(await self._get_perp_tickers(settle), self.exchange_info, "perp")
-                perps.update(perp)
-            return {**spot, **futures, **perps}
+            spot = self.parser.parse_tickers(spot_tickers, self.exchange_info, "spot")
+            futures = self.parser.parse_tickers(futures_tickers, self.exchange_info, "futures")
+            return {**spot, **futures, **self._parse_perp_tickers(perp_tickers)}
+
+    def _parse_perp_tickers(self, responses: list) -> dict:
+        perps = {}
+        for response in responses:
+            perp = self.parser.parse_tickers(response, self.exchange_info, "perp")
+            perps.update(perp)
+        return perps
 
     async def get_ticker(self, instrument_id: str) -> dict:
         if instrument_id not in self.exchange_info:
@@ -109,12 +131,19 @@ class Gateio(GateioUnified):
         }
 
     async def get_history_candlesticks(
-        self, instrument_id: str, interval: str, start: int = None, end: int = None, num: int = None
-    ) -> list:
+        self,
+        instrument_id: str,
+        interval: str,
+        start: int = None,
+        end: int = None,
+        num: int = None,
+        as_array: bool = False,
+    ) -> Union[list, CandleFrame]:
         if instrument_id not in self.exchange_info:
             raise ValueError(f"{instrument_id} not found in exchange_info")
 
         info = self.exchange_info[instrument_id]
+        parse = self.parser.parse_candle_frame if as_array else self.parser.parse_candlesticks
         market_type = self.parser.get_market_type(info)
         _interval = self.parser.get_interval(interval)
         limit_map = {"spot": 1000, "futures": 2000, "perp": 2000}
@@ -141,21 +170,32 @@ class Gateio(GateioUnified):
         if market_type in ["futures", "perp"]:
             params["settle"] = info["settle"].lower()
 
-        results = []
+        results = PageAccumulator()
         query_end = None
         if start and end:
+            windows = plan_windows(start, end, interval, limit_map[market_type])
+            if windows:
+                # a time range cannot be combined with a limit, the range itself is kept within one page
+                range_params = {k: v for k, v in params.items() if k != "limit"}
+
+                async def fetch(window_start: int, window_end: int):
+                    response = await method_map[market_type](
+                        **range_params, start=window_start // 1000, end=window_end // 1000
+                    )
+                    return parse(response, info, market_type, interval)
+
+                return (await fetch_windows(fetch, windows)).get_results(start, end)
+
             query_end = str(int(str(end)[:10]) + 1)
             while True:
                 params.update({"end": query_end})
-                result = self.parser.parse_candlesticks(
-                    await method_map[market_type](**params), info, market_type, interval
-                )
-                results.extend(result)
+                result = parse(await method_map[market_type](**params), info, market_type, interval)
+                results.add(result)
 
                 if len(result) < limit_map[market_type]:
                     break
 
-                query_end = min([v["timestamp"] for v in result])
+                query_end = results.page_start
 
                 if query_end < start:
                     break
@@ -163,24 +203,20 @@ class Gateio(GateioUnified):
                 query_end = str(int(str(query_end)[:10]) + 1)
                 continue
 
-            return sorted(
-                [v for v in results if start <= v["timestamp"] <= end], key=lambda x: x["timestamp"], reverse=False
-            )
+            return results.get_results(start, end)
 
         elif num:
             while True:
                 params.update({"end": query_end} if query_end else {})
-                result = self.parser.parse_candlesticks(
-                    await method_map[market_type](**params), info, market_type, interval
-                )
-                results.extend(result)
+                result = parse(await method_map[market_type](**params), info, market_type, interval)
+                results.add(result)
 
                 if len(result) < limit_map[market_type] or len(results) >= num:
                     break
-                query_end = str(int(str(min([v["timestamp"] for v in result]))[:10]) + 1)
+                query_end = str(int(str(results.page_start)[:10]) + 1)
 
                 continue
-            return sorted(results, key=lambda x: x["timestamp"], reverse=False)[-num:]
+            return results.get_results(num=num)
         else:
             raise ValueError("(start, end) or num must be provided")
 
@@ -212,14 +248,15 @@ class Gateio(GateioUnified):
 
         params = {"contract": info["raw_data"]["name"], "settle": info["settle"].lower(), "limit": 1000}
 
-        results = self.parser.parse_history_funding_rate(await self._get_futures_funding_rate_history(**params), info)
+        results = PageAccumulator()
+        results.add(
+            self.parser.parse_history_funding_rate(await self._get_futures_funding_rate_history(**params), info)
+        )
 
         if start and end:
-            return sorted(
-                [v for v in results if start <= v["timestamp"] <= end], key=lambda x: x["timestamp"], reverse=False
-            )
+            return results.get_results(start, end)
         elif num:
-            return sorted(results, key=lambda x: x["timestamp"], reverse=False)[-num:]
+            return results.get_results(num=num)
         else:
             raise ValueError("(start, end) or num must be provided")
 
@@ -1,39 +1,68 @@
+import asyncio
+from typing import Union
+
+import aiohttp
+
+from .candles import CandleFrame
+from .exchange_info import ExchangeInfo
+from .exchange_info_refresher import ExchangeInfoMixin
+from .exchanges.cache import ResponseCache
 from .exchanges.htx import HtxFutures, HtxSpot
+from .exchanges.retry import RetryPolicy
+from .pagination import HistoryMixin, PageAccumulator, fetch_windows, plan_windows
 from .parsers.htx import HtxParser
-from .utils import query_dict
+from .utils import gather_bounded
 
 
-class Htx(object):
+class Htx(ExchangeInfoMixin, HistoryMixin):
     name = "htx"
-
-    def __init__(self):
-        self.spot = HtxSpot()
-        self.futures = HtxFutures()
+    # candlesticks and funding rates per request
+    CANDLESTICK_LIMIT = 2000
+    FUNDING_RATE_LIMIT = None
+
+    def __init__(
+        self, session: aiohttp.ClientSession = None, retry_policy: RetryPolicy = None, cache: ResponseCache = None
+    ):
+        self.spot = HtxSpot(session=session, retry_policy=retry_policy, cache=cache)
+        self.futures = HtxFutures(session=session, retry_policy=retry_policy, cache=cache)
         self.parser = HtxParser()
-        self.exchange_info = {}
+        self.exchange_info = ExchangeInfo()
+
+    async def warm_up(self, connections: int = 1):
+        await asyncio.gather(self.spot.warm_up(connections), self.futures.warm_up(connections))
 
     async def close(self):
+        await self._stop_exchange_info_tasks()
         await self.spot.close()
         await self.futures.close()
 
-    async def sync_exchange_info(self):
-        self.exchange_info = await self.get_exchange_info()
-
     async def get_exchange_info(self, market_type: str = None):
-        spot = self.parser.parse_exchange_info(
-            await self.spot._get_exchange_info(), self.parser.spot_exchange_info_parser
-        )
-        linear = self.parser.parse_exchange_info(
-            await self.futures._get_linear_contract_info(), self.parser.linear_exchange_info_parser
+        spot_info, linear_info, inverse_futures_info, inverse_perp_info = await gather_bounded(
+            self.spot._get_exchange_info(),
+            self.futures._get_linear_contract_info(),
+            self.futures._get_inverse_futures_info(),
+            self.futures._get_inverse_perp_info(),
         )
+        spot = self.parser.parse_exchange_info(spot_info, self.parser.spot_exchange_info_parser)
+        linear = self.parser.parse_exchange_info(linear_info, self.parser.linear_exchange_info_parser)
         inverse_futures = self.parser.parse_exchange_info(
-            await self.futures._get_inverse_futures_info(), self.parser.inverse_futures_exchange_info_parser
-        )
-        inverse_perp = self.parser.parse_exchange_info(
-            await self.futures._get_inverse_perp_info(), self.parser.inverse_perp_exchange_info_parser
+            inverse_futures_info, self.parser.inverse_futures_exchange_info_parser
         )
+        inverse_perp = self.parser.parse_exchange_info(inverse_perp_info, self.parser.inverse_perp_exchange_info_parser)
 
-        return {**spot, **linear, **inverse_futures, **inverse_perp}
+        return ExchangeInfo.merge(spot, linear, inverse_futures, inverse_perp)
+
+    async def _get_derivative_tickers(self) -> dict:
+        linear, inverse_perp, inverse_futures = await gather_bounded(
+            self.futures._get_linear_contract_tickers(),
+            self.futures._get_inverse_perp_tickers(),
+            self.futures._get_inverse_futures_tickers(),
+        )
+        return {
+            **self.parser.parse_tickers(linear, self.exchange_info, "linear"),
+            **self.parser.parse_tickers(inverse_perp, self.exchange_info, "inverse_perp"),
+            **self.parser.parse_tickers(inverse_futures, self.exchange_info, "inverse_futures"),
+        }
 
     async def get_tickers(self, market_type: str = None):
         # get_all tickers then filter by market_type
@@ -41,33 +70,14 @@ class Htx(object):
             if market_type == "spot":
                 return self.parser.parse_tickers(await self.spot._get_tickers(), self.exchange_info, "spot")
             else:
-                linear = self.parser.parse_tickers(
-                    await self.futures._get_linear_contract_tickers(), self.exchange_info, "linear"
-                )
-                inverse_perp = self.parser.parse_tickers(
-                    await self.futures._get_inverse_perp_tickers(), self.exchange_info, "inverse_perp"
-                )
-
-                inverse_futures = self.parser.parse_tickers(
-                    await self.futures._get_inverse_futures_tickers(), self.exchange_info, "inverse_futures"
-                )
-                results = {**linear, **inverse_perp, **inverse_futures}
-
-                instrument_id = list(query_dict(self.exchange_info, f"is_{market_type} == True").keys())
+                results = await self._get_derivative_tickers()
+
+                instrument_id = self.exchange_info.get_ids(market_type)
                 return {k: v for k, v in results.items() if k in instrument_id}
         else:
-            spot = self.parser.parse_tickers(await self.spot._get_tickers(), self.exchange_info, "spot")
-
-            linear = self.parser.parse_tickers(
-                await self.futures._get_linear_contract_tickers(), self.exchange_info, "linear"
-            )
-            inverse_perp = self.parser.parse_tickers(
-                await self.futures._get_inverse_perp_tickers(), self.exchange_info, "inverse_perp"
-            )
-            inverse_futures = self.parser.parse_tickers(
-                await self.futures._get_inverse_futures_tickers(), self.exchange_info, "inverse_futures"
-            )
-            return {**spot, **linear, **inverse_perp, **inverse_futures}
+            spot_tickers, derivative = await gather_bounded(self.spot._get_tickers(), self._get_derivative_tickers())
+            spot = self.parser.parse_tickers(spot_tickers, self.exchange_info, "spot")
+            return {**spot, **derivative}
 
     async def get_ticker(self, instrument_id: str) -> dict:
         # HTX do not support get_ticker endpoint, can only get one ticker from get_tickers
@@ -114,12 +124,19 @@ class Htx(object):
         }
 
     async def get_history_candlesticks(
-        self, instrument_id: str, interval: str, start: int = None, end: int = None, num: int = None
-    ) -> list:
+        self,
+        instrument_id: str,
+        interval: str,
+        start: int = None,
+        end: int = None,
+        num: int = None,
+        as_array: bool = False,
+    ) -> Union[list, CandleFrame]:
         if instrument_id not in self.exchange_info:
             raise ValueError(f"{instrument_id} not in {self.name} exchange info")
 
         info = self.exchange_info[instrument_id]
+        parse = self.parser.parse_candle_frame if as_array else self.parser.parse_candlesticks
         market_type = self.parser.get_market_type(info)
         _interval = self.parser.get_interval(interval, market_type)
 
@@ -151,47 +168,49 @@ class Htx(object):
             "period": _interval,
             "limit": limit_map[market_type],
         }
-        results = []
+        results = PageAccumulator()
         query_end = None
         if start and end and market_type != "spot":
+            windows = plan_windows(start, end, interval, limit_map[market_type])
+            if windows:
+
+                async def fetch(window_start: int, window_end: int):
+                    response = await method_map[market_type](
+                        **params, start=str(window_start)[:10], end=str(window_end)[:10]
+                    )
+                    return parse(response, info, market_type, interval)
+
+                return (await fetch_windows(fetch, windows)).get_results(start, end)
+
             query_end = end
             while True:
                 params["end"] = str(query_end)[:10]
-                result = self.parser.parse_candlesticks(
-                    await method_map[market_type](**params), info, market_type, interval
-                )
-                results.extend(result)
-
-                # exclude datas with same timestamp
-                results = list({v["timestamp"]: v for v in results}.values())
+                result = parse(await method_map[market_type](**params), info, market_type, interval)
+                results.add(result)
 
-                temp_end = str(min([v["timestamp"] for v in result]))[:10]
+                temp_end = str(results.page_start)[:10]
                 if len(result) < limit_map[market_type] or temp_end == query_end:
                     break
 
                 query_end = temp_end  # get the earliest timestamp in 10 digits
                 if query_end <= start:
                     break
-            return sorted(
-                [v for v in results if start <= v["timestamp"] <= end], key=lambda x: x["timestamp"], reverse=False
-            )
+            return results.get_results(start, end)
 
         elif num:
             while True:
                 params.update({"end": query_end} if query_end else {})
-                result = self.parser.parse_candlesticks(
-                    await method_map[market_type](**params), info, market_type, interval
-                )
-                results.extend(result)
+                result = parse(await method_map[market_type](**params), info, market_type, interval)
+                results.add(result)
 
-                temp_end = str(min([v["timestamp"] for v in result]))[:10]
+                temp_end = str(results.page_start)[:10]
                 if len(result) < limit_map[market_type] or temp_end == query_end:
                     break
 
                 query_end = temp_end  # get the earliest timestamp in 10 digits
                 if len(results) >= num:
                     break
-            return sorted(results, key=lambda x: x["timestamp"], reverse=False)[-num:]
+            return results.get_results(num=num)
 
         else:
             raise ValueError("(start, end) or num must be provided")
@@ -229,44 +248,36 @@ class Htx(object):
         index = 1
         params = {"contract_code": info["raw_data"]["contract_code"], "page_size": limit}
 
-        results = []
+        results = PageAccumulator()
         if start and end:
             while True:
                 params.update({"page_index": index})
                 result = self.parser.parse_history_funding_rate(await method_map[market_type](**params), info)
-                results.extend(result)
-
-                # exclude data with same timestamp
-                results = list({v["timestamp"]: v for v in results}.values())
+                results.add(result)
 
                 if len(result) < limit:
                     break
 
-                query_start = min([v["timestamp"] for v in result])
+                query_start = results.page_start
                 if query_start <= start:
                     break
                 index += 1
                 continue
 
-            return sorted(
-                [v for v in results if start <= v["timestamp"] <= end], key=lambda x: x["timestamp"], reverse=False
-            )
+            return results.get_results(start, end)
 
         elif num:
             while True:
                 params.update({"page_index": index})
                 result = self.parser.parse_history_funding_rate(await method_map[market_type](**params), info)
-                results.extend(result)
-
-                # exclude data with same timestamp
-                results = list({v["timestamp"]: v for v in results}.values())
+                results.add(result)
 
                 if len(result) < limit or len(results) > num:
                     break
 
                 index += 1
                 continue
-            return sorted(results, key=lambda x: x["timestamp"], reverse=False)[-num:]
+            return results.get_results(num=num)
         else:
             raise ValueError("(start, end) or num must be provided")
 
@@ -1,66 +1,70 @@
 import asyncio
-import time
+from typing import Union
 
+import aiohttp
+
+from .candles import CandleFrame
+from .exchange_info import ExchangeInfo
+from .exchange_info_refresher import ExchangeInfoMixin
+from .exchanges.cache import ResponseCache
 from .exchanges.kucoin import KucoinFutures, KucoinSpot
+from .exchanges.retry import RetryPolicy
+from .orderbook import OrderBook
+from .pagination import HistoryMixin, PageAccumulator, fetch_windows, plan_windows
 from .parsers.kucoin import KucoinParser
-from .utils import query_dict
+from .utils import gather_bounded, get_depth_limit
 
 
-class Kucoin(object):
+class Kucoin(ExchangeInfoMixin, HistoryMixin):
     name = "kucoin"
-
-    def __init__(self):
-        self.spot = KucoinSpot()
-        self.futures = KucoinFutures()
+    # candlesticks and funding rates per request
+    CANDLESTICK_LIMIT = 100
+    FUNDING_RATE_LIMIT = 100
+
+    def __init__(
+        self, session: aiohttp.ClientSession = None, retry_policy: RetryPolicy = None, cache: ResponseCache = None
+    ):
+        self.spot = KucoinSpot(session=session, retry_policy=retry_policy, cache=cache)
+        self.futures = KucoinFutures(session=session, retry_policy=retry_policy, cache=cache)
         self.parser = KucoinParser()
 
-        self.exchange_info = {}
+        self.exchange_info = ExchangeInfo()
+
+    async def warm_up(self, connections: int = 1):
+        await asyncio.gather(self.spot.warm_up(connections), self.futures.warm_up(connections))
 
     async def close(self):
+        await self._stop_exchange_info_tasks()
         await self.spot.close()
         await self.futures.close()
 
-    async def sync_exchange_info(self):
-        self.exchange_info = await self.get_exchange_info()
-
     async def get_exchange_info(self) -> dict:
-        spot = self.parser.parse_exchange_info(
-            await self.spot._get_symbol_list(), self.parser.spot_exchange_info_parser
-        )
-        futures = self.parser.parse_exchange_info(
-            await self.futures._get_symbol_list(), self.parser.futures_exchange_info_parser
-        )
+        spot_info, futures_info = await gather_bounded(self.spot._get_symbol_list(), self.futures._get_symbol_list())
+        spot = self.parser.parse_exchange_info(spot_info, self.parser.spot_exchange_info_parser)
+        futures = self.parser.parse_exchange_info(futures_info, self.parser.futures_exchange_info_parser)
 
-        return {**spot, **futures}
+        return ExchangeInfo.merge(spot, futures)
 
     async def get_tickers(self, market_type: str = None) -> dict:
         async def _get_derivative_tickers():
-            ids = list(query_dict(self.exchange_info, "is_futures == True or is_perp == True").keys())
-            num_batch = 30
-            results = {}
-            for i in range(0, len(ids), num_batch):
-                tasks = []
-                for instrument_id in ids[i : i + num_batch]:
-                    _symbol = self.exchange_info[instrument_id]["raw_data"]["symbol"]
-                    tasks.append(self.futures._get_symbol_detail(_symbol))
-                raw_tickers = await asyncio.gather(*tasks)
-                # rest for 5 sec for every 5 requests to avoid rate limit
-                if i % 5 == 0:
-                    time.sleep(3)
-                parsed_tickers = self.parser.parse_derivative_tickers(raw_tickers, self.exchange_info)
-                results.update(parsed_tickers)
-            return results
+            ids = self.exchange_info.get_ids(["futures", "perp"])
+            # requests queue on the client's rate limiter instead of being fired in sleeping batches
+            raw_tickers = await gather_bounded(
+                *[self.futures._get_symbol_detail(self.exchange_info[i]["raw_data"]["symbol"]) for i in ids]
+            )
+            return self.parser.parse_derivative_tickers(raw_tickers, self.exchange_info)
 
         if market_type == "spot":
             return self.parser.parse_spot_tickers(await self.spot._get_tickers(), self.exchange_info)
         else:
-
-            spot_tickers = self.parser.parse_spot_tickers(await self.spot._get_tickers(), self.exchange_info)
-            derivative_tickers = await _get_derivative_tickers()
+            raw_spot_tickers, derivative_tickers = await gather_bounded(
+                self.spot._get_tickers(), _get_derivative_tickers()
+            )
+            spot_tickers = self.parser.parse_spot_tickers(raw_spot_tickers, self.exchange_info)
             tickers = {**spot_tickers, **derivative_tickers}
 
             if market_type:
-                ids = list(query_dict(self.exchange_info, f"is_{market_type} == True").keys())
+                ids = self.exchange_info.get_ids(market_type)
                 return {k: v for k, v in tickers.items() if k in ids}
             else:
                 return tickers
@@ -120,7 +124,9 @@ class Kucoin(object):
 
         return self.parser.parse_index_price(await self.futures._get_current_mark_price(_symbol), info)
 
-    async def get_orderbook(self, instrument_id: str, depth: int = None):
+    async def get_orderbook(
+        self, instrument_id: str, depth: int = None, as_array: bool = False
+    ) -> Union[dict, OrderBook]:
         if instrument_id not in self.exchange_info:
             raise ValueError(f"{instrument_id} is not found in {self.name} exchange info.")
 
@@ -128,18 +134,15 @@ class Kucoin(object):
         market_type = "spot" if info["is_spot"] else "derivative"
         _symbol = info["raw_data"]["symbol"]
         method_map = {
-            "spot": self.spot._get_full_orderbook,
-            "derivative": self.futures._get_full_orderbook,
+            "spot": (self.spot._get_part_orderbook, self.spot._get_full_orderbook),
+            "derivative": (self.futures._get_part_orderbook, self.futures._get_full_orderbook),
         }
 
-        results = self.parser.parse_orderbook(await method_map[market_type](_symbol), info, market_type)
-
-        results["bids"] = sorted(results["bids"], key=lambda x: x["price"], reverse=True)
-        results["asks"] = sorted(results["asks"], key=lambda x: x["price"])
-        if depth:
-            results["bids"] = results["bids"][:depth]
-            results["asks"] = results["asks"][:depth]
-        return results
+        # the partial books only come in 20 and 100 levels, deeper requests need the full book
+        part, full = method_map[market_type]
+        limit = get_depth_limit(depth, [20, 100])
+        response = await (part(_symbol, limit) if limit else full(_symbol))
+        return self.parser.parse_orderbook(response, info, market_type, depth=depth, as_array=as_array)
 
     async def get_current_candlestick(self, instrument_id: str, interval: str) -> dict:
         if instrument_id not in self.exchange_info:
@@ -167,9 +170,16 @@ class Kucoin(object):
         }
 
     async def get_history_candlesticks(
-        self, instrument_id: str, interval: str, start: int = None, end: int = None, num: int = None
-    ) -> list:
+        self,
+        instrument_id: str,
+        interval: str,
+        start: int = None,
+        end: int = None,
+        num: int = None,
+        as_array: bool = False,
+    ) -> Union[list, CandleFrame]:
         info = self.exchange_info[instrument_id]
+        parse = self.parser.parse_candle_frame if as_array else self.parser.parse_history_candlesticks
         market_type = "spot" if info["is_spot"] else "derivative"
         _symbol = info["raw_data"]["symbol"]
         _interval = self.parser.get_interval(interval, market_type)
@@ -187,56 +197,53 @@ class Kucoin(object):
             "granularity" if market_type == "derivative" else "type": _interval,
         }
 
-        results = []
+        results = PageAccumulator()
         query_end = None
         if start and end:
+            windows = plan_windows(start, end, interval, limit_map[market_type])
+            if windows:
+
+                async def fetch(window_start: int, window_end: int):
+                    response = await method_map[market_type](
+                        **params,
+                        start=self.parser.parse_kucoin_timestamp(window_start, market_type),
+                        end=self.parser.parse_kucoin_timestamp(window_end, market_type) + 1,
+                    )
+                    return parse(response, info, market_type, interval)
+
+                return (await fetch_windows(fetch, windows)).get_results(start, end)
+
             query_end = self.parser.parse_kucoin_timestamp(end, market_type) + 1
             while True:
                 params.update({"end": query_end})
-                klines = self.parser.parse_history_candlesticks(
-                    await method_map[market_type](**params), info, market_type, interval
-                )
+                klines = parse(await method_map[market_type](**params), info, market_type, interval)
 
-                results.extend(klines)
-
-                # exclude same timestamp
-                results = list({v["timestamp"]: v for v in results}.values())
+                results.add(klines)
 
                 if len(klines) < limit_map[market_type]:
                     break
 
-                query_end = min([v["timestamp"] for v in results])
+                query_end = results.start
                 if query_end < start:
                     break
 
-                query_end = self.parser.parse_kucoin_timestamp(min([v["timestamp"] for v in results]), market_type) + 1
+                query_end = self.parser.parse_kucoin_timestamp(results.start, market_type) + 1
                 continue
-            return sorted(
-                [v for v in results if start <= v["timestamp"] <= end], key=lambda x: x["timestamp"], reverse=False
-            )
+            return results.get_results(start, end)
 
         elif num:
             while True:
                 params.update({"end": query_end} if query_end else {})
-                klines = self.parser.parse_history_candlesticks(
-                    await method_map[market_type](**params), info, market_type, interval
-                )
-
-                results.extend(klines)
+                klines = parse(await method_map[market_type](**params), info, market_type, interval)
 
-                # exclude same timestamp
-                results = list({v["timestamp"]: v for v in results}.values())
+                results.add(klines)
 
                 if len(results) >= num or len(klines) < limit_map[market_type]:
                     break
 
-                query_end = (
-                    int(min(v["timestamp"] for v in klines) / 1000)
-                    if market_type == "spot"
-                    else min(v["timestamp"] for v in klines)
-                ) + 1
+                query_end = (int(results.page_start / 1000) if market_type == "spot" else results.page_start) + 1
                 continue
-            return sorted(results, key=lambda x: x["timestamp"], reverse=False)[-num:]
+            return results.get_results(num=num)
 
         else:
             raise ValueError("Invalid parameters. (start, end) or (end, num) or (num) must be provided.")
@@ -265,7 +272,7 @@ class Kucoin(object):
 
         params = {"symbol": _symbol}
 
-        results = []
+        results = PageAccumulator()
         query_end = end if end else self.parser.get_timestamp()
         query_start = start if start else query_end - 10 * 365 * 24 * 60 * 60 * 1000
         implied_limit = 100
@@ -275,40 +282,32 @@ class Kucoin(object):
                 result = self.parser.parse_history_funding_rate(
                     await self.futures._get_public_funding_history(**params), info
                 )
-                results.extend(result)
-
-                # exclude data with same timestamp
-                results = list({v["timestamp"]: v for v in results}.values())
+                results.add(result)
 
                 if len(result) < implied_limit:
                     break
 
-                query_end = min([v["timestamp"] for v in result])
+                query_end = results.page_start
 
-                if min([v["timestamp"] for v in results]) < start:
+                if results.start < start:
                     break
                 continue
 
-            return sorted(
-                [v for v in results if start <= v["timestamp"] <= end], key=lambda x: x["timestamp"], reverse=False
-            )
+            return results.get_results(start, end)
         elif num:
             while True:
                 params.update({"to": query_end, "_from": query_start})
                 result = self.parser.parse_history_funding_rate(
                     await self.futures._get_public_funding_history(**params), info
                 )
-                results.extend(result)
-
-                # exclude data with same timestamp
-                results = list({v["timestamp"]: v for v in results}.values())
+                results.add(result)
 
                 if len(result) < implied_limit or len(results) >= num:
                     break
 
-                query_end = min([v["timestamp"] for v in results])
+                query_end = results.start
                 continue
-            return sorted(results, key=lambda x: x["timestamp"], reverse=False)[-num:]
+            return results.get_results(num=num)
 
         else:
             raise ValueError("(start, end) or num must be provided")
@@ -1,24 +1,49 @@
-import tracemalloc
+from typing import Union
 
+import aiohttp
+
+from .candles import CandleFrame
+from .exchange_info import ExchangeInfo
+from .exchange_info_refresher import ExchangeInfoMixin
+from .exchanges.cache import ResponseCache
 from .exchanges.okx import OkxUnified
+from .exchanges.retry import RetryPolicy
+from .orderbook import OrderBook
+from .pagination import HistoryMixin, PageAccumulator, fetch_windows, plan_windows
 from .parsers.okx import OkxParser
-
-tracemalloc.start()
+from .utils import gather_bounded, get_depth_limit
 
 
-class Okx(OkxUnified):
+class Okx(ExchangeInfoMixin, HistoryMixin, OkxUnified):
     name = "okx"
+    # candlesticks and funding rates per request
+    CANDLESTICK_LIMIT = 300
+    FUNDING_RATE_LIMIT = 100
     market_type_map = {"spot": "SPOT", "margin": "MARGIN", "futures": "FUTURES", "perp": "SWAP"}
     _market_type_map = {"SPOT": "spot", "MARGIN": "margin", "FUTURES": "futures", "SWAP": "perp"}
 
-    def __init__(self, api_key: str = None, api_secret: str = None, passphrase: str = None, flag: str = "1"):
-        super().__init__(api_key=api_key, api_secret=api_secret, passphrase=passphrase, flag=flag)
+    def __init__(
+        self,
+        api_key: str = None,
+        api_secret: str = None,
+        passphrase: str = None,
+        flag: str = "1",
+        session: aiohttp.ClientSession = None,
+        retry_policy: RetryPolicy = None,
+        cache: ResponseCache = None,
+    ):
+        super().__init__(
+            api_key=api_key,
+            api_secret=api_secret,
+            passphrase=passphrase,
+            flag=flag,
+            session=session,
+            retry_policy=retry_policy,
+            cache=cache,
+        )
 
         self.parser = OkxParser()
-        self.exchange_info = {}
-
-    async def sync_exchange_info(self):
-        self.exchange_info = await self.get_exchange_info()
+        self.exchange_info = ExchangeInfo()
 
     async def get_exchange_info(self, market_type: str = None):
         if market_type:
@@ -32,19 +57,16 @@ class Okx(OkxUnified):
             )
 
         else:
-            spot = self.parser.parse_exchange_info(
-                await self._get_exchange_info("SPOT"), self.parser.spot_margin_exchange_info_parser
+            spot_info, margin_info, futures_info, perp_info = await gather_bounded(
+                *[self._get_exchange_info(inst_type) for inst_type in ["SPOT", "MARGIN", "FUTURES", "SWAP"]]
             )
-            margin = self.parser.parse_exchange_info(
-                await self._get_exchange_info("MARGIN"), self.parser.spot_margin_exchange_info_parser
+            spot = self.parser.parse_exchange_info(spot_info, self.parser.spot_margin_exchange_info_parser)
+            margin = self.parser.parse_exchange_info(margin_info, self.parser.spot_margin_exchange_info_parser)
+            futures = self.parser.parse_exchange_info(futures_info, self.parser.futures_perp_exchange_info_parser)
+            perp = self.parser.parse_exchange_info(perp_info, self.parser.futures_perp_exchange_info_parser)
+            exchange_info = ExchangeInfo.merge(
+                self.parser.combine_spot_margin_exchange_info(spot, margin), futures, perp
             )
-            futures = self.parser.parse_exchange_info(
-                await self._get_exchange_info("FUTURES"), self.parser.futures_perp_exchange_info_parser
-            )
-            perp = self.parser.parse_exchange_info(
-                await self._get_exchange_info("SWAP"), self.parser.futures_perp_exchange_info_parser
-            )
-            exchange_info = {**self.parser.combine_spot_margin_exchange_info(spot, margin), **futures, **perp}
         return exchange_info
 
     async def get_tickers(self, market_type: str = None) -> dict:
@@ -57,11 +79,12 @@ class Okx(OkxUnified):
             return self.parser.parse_tickers(await self._get_tickers("SWAP"), "perp", self.exchange_info)
         else:
             results = {}
-            for market_type in ["spot", "futures", "perp"]:
-                _market_type = self.market_type_map[market_type]
-                parsed_tickers = self.parser.parse_tickers(
-                    await self._get_tickers(_market_type), market_type, self.exchange_info
-                )
+            market_types = ["spot", "futures", "perp"]
+            responses = await gather_bounded(
+                *[self._get_tickers(self.market_type_map[market_type]) for market_type in market_types]
+            )
+            for market_type, response in zip(market_types, responses):
+                parsed_tickers = self.parser.parse_tickers(response, market_type, self.exchange_info)
                 results.update(parsed_tickers)
 
             return results
@@ -88,51 +111,59 @@ class Okx(OkxUnified):
         return {instrument_id: self.parser.parse_candlesticks(await self._get_klines(**params), info, interval)}
 
     async def get_history_candlesticks(
-        self, instrument_id: str, interval: str, start: int = None, end: int = None, num: int = None
-    ) -> list:
+        self,
+        instrument_id: str,
+        interval: str,
+        start: int = None,
+        end: int = None,
+        num: int = None,
+        as_array: bool = False,
+    ) -> Union[list, CandleFrame]:
         info = self.exchange_info[instrument_id]
+        parse = self.parser.parse_candle_frame if as_array else self.parser.parse_candlesticks
         _instrument_id = info["raw_data"]["instId"]
         _interval = self.parser.get_interval(interval)
-        limit = 300
+        limit = self.CANDLESTICK_LIMIT
 
         params = {"instId": _instrument_id, "bar": _interval, "limit": limit}
 
-        results = []
+        results = PageAccumulator()
         if start and end:
+            windows = plan_windows(start, end, interval, limit)
+            if windows:
+
+                async def fetch(window_start: int, window_end: int):
+                    # "after" returns the candlesticks strictly before it
+                    return parse(await self._get_klines(**params, after=window_end + 1), info, interval)
+
+                return (await fetch_windows(fetch, windows)).get_results(start, end)
+
             query_end = end + 1
             while True:
                 params.update({"after": query_end})
-                datas = self.parser.parse_candlesticks(await self._get_klines(**params), info, interval)
-                results.extend(datas)
-
-                # exclude same timestamp datas
-                results = list({v["timestamp"]: v for v in results}.values())
+                datas = parse(await self._get_klines(**params), info, interval)
+                results.add(datas)
 
                 if not datas or len(datas) < limit:
                     break
-                query_end = min([v["timestamp"] for v in datas]) + 1
+                query_end = results.page_start + 1
                 if query_end < start:
                     break
-            results = sorted(
-                [v for v in results if start <= v["timestamp"] <= end], key=lambda x: x["timestamp"], reverse=False
-            )
+            results = results.get_results(start, end)
         elif num:
             query_end = end
             while True:
                 params.update({"after": query_end} if query_end else {})
-                datas = self.parser.parse_candlesticks(await self._get_klines(**params), info, interval)
-                results.extend(datas)
-
-                # exclude same timestamp datas
-                results = list({v["timestamp"]: v for v in results}.values())
+                datas = parse(await self._get_klines(**params), info, interval)
+                results.add(datas)
 
                 if not datas or len(datas) < limit:
                     break
 
-                query_end = min([v["timestamp"] for v in datas])
+                query_end = results.page_start
                 continue
 
-            results = sorted(results, key=lambda x: x["timestamp"], reverse=False)[-num:]
+            results = results.get_results(num=num)
         else:
             raise Exception("invalid params")
 
@@ -146,9 +177,9 @@ class Okx(OkxUnified):
 
         info = self.exchange_info[instrument_id]
         _instrument_id = info["raw_data"]["instId"]
-        limit = 100
+        limit = self.FUNDING_RATE_LIMIT
         params = {"instId": _instrument_id, "limit": limit}
-        results = []
+        results = PageAccumulator()
         query_end = None
 
         if start and end:
@@ -159,15 +190,15 @@ class Okx(OkxUnified):
                     await self._get_history_funding_rate(**params),
                     info,
                 )
-                results.extend(result)
+                results.add(result)
                 if not result or len(result) < limit:
                     break
-                query_end = min([v["timestamp"] for v in result])
+                query_end = results.page_start
 
                 if query_end < start:
                     break
                 continue
-            return [v for v in results if start <= v["timestamp"] <= end]
+            return results.get_results(start, end)
 
         elif num:
             while True:
@@ -176,17 +207,14 @@ class Okx(OkxUnified):
                     await self._get_history_funding_rate(**params),
                     info,
                 )
-                results.extend(result)
-
-                # exclude same timestamp
-                results = list({v["timestamp"]: v for v in results}.values())
+                results.add(result)
 
                 if not result or len(result) < limit or len(results) >= num:
                     break
 
-                query_end = min([v["timestamp"] for v in result])
+                query_end = results.page_start
                 continue
-            return sorted(results, key=lambda x: x["timestamp"], reverse=False)[-num:]
+            return results.get_results(num=num)
 
         else:
             raise Exception("(start, end) or num must be provided")
@@ -243,12 +271,18 @@ class Okx(OkxUnified):
         else:
             raise Exception("instrument_id or market must be provided")
 
-    async def get_orderbook(self, instrument_id: str, depth: int = 20):
+    async def get_orderbook(
+        self, instrument_id: str, depth: int = 20, as_array: bool = False
+    ) -> Union[dict, OrderBook]:
         if instrument_id not in self.exchange_info:
             raise Exception(f"{instrument_id} not found in exchange_info")
         info = self.exchange_info[instrument_id]
         _instrument_id = info["raw_data"]["instId"]
-        return self.parser.parse_orderbook(await self._get_orderbook(_instrument_id, str(depth)), info)
+        # books serves any size up to 400 levels
+        sz = get_depth_limit(depth, range(1, 401)) or 400
+        return self.parser.parse_orderbook(
+            await self._get_orderbook(_instrument_id, str(sz)), info, depth=depth, as_array=as_array
+        )
 
     # Private endpoint
 
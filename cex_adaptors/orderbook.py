@@ -0,0 +1,157 @@
+import numpy as np
+
+from .records import OrderBookLevel
+
+
+class OrderBook(object):
+    """
+    Order book snapshot with each side stored as an (N, 2) float64 array of [price, volume] rows, asks sorted by
+    ascending price and bids by descending price, so the best level of each side is row 0.
+    Empty sides are (0, 2) arrays and queries on them return NaN.
+    :param instrument_id: unified instrument id
+    :param timestamp: snapshot time in milliseconds
+    :param asks: [price, volume] rows, already sorted
+    :param bids: [price, volume] rows, already sorted
+    :param ask_orders: number of orders at each ask level, if the exchange gives it
+    :param bid_orders: number of orders at each bid level, if the exchange gives it
+    """
+
+    SIDES = ["asks", "bids"]
+
+    def __init__(
+        self,
+        instrument_id: str,
+        timestamp: int,
+        asks,
+        bids,
+        ask_orders=None,
+        bid_orders=None,
+        raw_data=None,
+    ):
+        self.instrument_id = instrument_id
+        self.timestamp = timestamp
+        self.asks = np.asarray(asks, dtype=np.float64).reshape(-1, 2)
+        self.bids = np.asarray(bids, dtype=np.float64).reshape(-1, 2)
+        self.ask_orders = None if ask_orders is None else np.asarray(ask_orders, dtype=np.int64)
+        self.bid_orders = None if bid_orders is None else np.asarray(bid_orders, dtype=np.int64)
+        self.raw_data = raw_data
+
+    @classmethod
+    def from_levels(
+        cls,
+        asks: list,
+        bids: list,
+        instrument_id: str,
+        timestamp: int,
+        depth: int = None,
+        order_number: int = None,
+        raw_data=None,
+    ) -> "OrderBook":
+        """
+        Build the book straight from the exchange's levels. Only the prices of a side are read to check it is sorted,
+        then the side is sorted if the exchange did not already sort it and cut to `depth` before the [price, volume]
+        rows and order numbers of the levels kept are built.
+        :param asks: raw levels, [price, volume, ...] lists of numbers or numeric strings
+        :param bids: raw levels, [price, volume, ...] lists of numbers or numeric strings
+        :param depth: levels kept per side, all of them if not given
+        :param order_number: index of the number of orders in each level, if the exchange gives it
+        """
+        sides = {}
+        for side, levels, sign in [("asks", asks, 1), ("bids", bids, -1)]:
+            prices = cls._to_array([level[0] for level in levels], np.float64)
+            if len(prices) > 1 and np.any(np.diff(prices) * sign < 0):
+                levels = [levels[i] for i in np.argsort(prices * sign, kind="stable")[:depth]]
+            elif depth:
+                levels = levels[:depth]
+            rows = cls._to_array([level[:2] for level in levels], np.float64).reshape(-1, 2)
+            orders = (
+                None if order_number is None else cls._to_array([level[order_number] for level in levels], np.int64)
+            )
+            sides[side] = (rows, orders)
+
+        return cls(
+            instrument_id,
+            timestamp,
+            sides["asks"][0],
+            sides["bids"][0],
+            ask_orders=sides["asks"][1],
+            bid_orders=sides["bids"][1],
+            raw_data=raw_data,
+        )
+
+    @staticmethod
+    def _to_array(values: list, dtype) -> np.ndarray:
+        return np.array(values, dtype=np.float64).astype(dtype) if values else np.empty(0, dtype=dtype)
+
+    def __repr__(self) -> str:
+        return f"OrderBook({self.instrument_id}, {len(self.asks)} asks, {len(self.bids)} bids)"
+
+    def truncate(self, depth: int) -> "OrderBook":
+        return OrderBook(
+            self.instrument_id,
+            self.timestamp,
+            self.asks[:depth],
+            self.bids[:depth],
+            ask_orders=None if self.ask_orders is None else self.ask_orders[:depth],
+            bid_orders=None if self.bid_orders is None else self.bid_orders[:depth],
+            raw_data=self.raw_data,
+        )
+
+    @property
+    def best_ask(self) -> float:
+        return float(self.asks[0, 0]) if len(self.asks) else np.nan
+
+    @property
+    def best_bid(self) -> float:
+        return float(self.bids[0, 0]) if len(self.bids) else np.nan
+
+    @property
+    def mid(self) -> float:
+        return (self.best_ask + self.best_bid) / 2
+
+    @property
+    def spread(self) -> float:
+        return self.best_ask - self.best_bid
+
+    def get_side(self, side: str) -> np.ndarray:
+        if side not in self.SIDES:
+            raise ValueError(f"Invalid side: {side}, expected one of {self.SIDES}")
+        return self.asks if side == "asks" else self.bids
+
+    def cumulative_depth(self, side: str, quote: bool = False) -> np.ndarray:
+        """
+        Volume available up to and including each level of the side
+        :param quote: sum price * volume instead of volume
+        """
+        levels = self.get_side(side)
+        return np.cumsum(levels[:, 0] * levels[:, 1] if quote else levels[:, 1])
+
+    def vwap(self, size: float, side: str) -> float:
+        """
+        Average price of filling `size` against the side, "asks" for a buy and "bids" for a sell.
+        NaN if the side does not hold enough volume.
+        """
+        levels = self.get_side(side)
+        volumes = np.cumsum(levels[:, 1])
+        if size <= 0 or not len(volumes) or volumes[-1] < size:
+            return np.nan
+
+        last = int(np.searchsorted(volumes, size))
+        filled = levels[: last + 1, 1].copy()
+        filled[-1] -= volumes[last] - size
+        return float(np.dot(levels[: last + 1, 0], filled) / size)
+
+    def to_dict(self) -> dict:
+        """
+        The book in the dict of `OrderBookLevel` lists format of `parse_orderbook`
+        """
+        result = {"timestamp": self.timestamp, "instrument_id": self.instrument_id}
+        for side, orders in [("asks", self.ask_orders), ("bids", self.bid_orders)]:
+            levels = self.get_side(side).tolist()
+            orders = [None] * len(levels) if orders is None else orders.tolist()
+            result[side] = [
+                OrderBookLevel(price=price, volume=volume, order_number=order_number)
+                for (price, volume), order_number in zip(levels, orders)
+            ]
+        result["raw_data"] = self.raw_data
+        return result
@@ -0,0 +1,374 @@
+import asyncio
+import contextvars
+import heapq
+from collections import deque
+from collections.abc import Mapping
+from itertools import islice
+from typing import AsyncIterator, Callable, Iterable, Union
+
+import numpy as np
+
+from .candles import CandleFrame
+from .utils import FANOUT_LIMIT, gather_bounded
+
+# unified interval unit -> milliseconds, months have no fixed length and are never planned
+INTERVAL_UNITS = {"m": 60 * 1000, "h": 60 * 60 * 1000, "d": 24 * 60 * 60 * 1000, "w": 7 * 24 * 60 * 60 * 1000}
+
+# requests of `fetch_windows` wait for this semaphore when set, see `iter_history_candlesticks_many`
+_request_slots = contextvars.ContextVar("request_slots", default=None)
+
+
+class PageAccumulator(object):
+    """
+    Collects the pages of a paginated history download in linear time.
+    Each page is deduplicated against the rows already collected when it is added, keeping the first row seen for a
+    timestamp, and the boundaries of the last page and of everything collected are tracked as pages come in.
+    Pages are merged once at the end, by concatenating them when they do not overlap instead of sorting every row.
+    :param key: field the rows are ordered and deduplicated by
+    """
+
+    def __init__(self, key: str = "timestamp"):
+        self.key = key
+        self.pages = []
+        self.keys = set()
+        # empty frame returned when only empty CandleFrame pages came in
+        self.empty_frame = None
+        # first and last key of the last page added, and of all pages
+        self.page_start = None
+        self.page_end = None
+        self.start = None
+        self.end = None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, page) -> int:
+        """
+        :param page: rows as parsed, a list of dicts or records, a single row or a CandleFrame
+        :return: number of new rows, `page_start` and `page_end` are None for an empty page
+        """
+        self.page_start = self.page_end = None
+        if isinstance(page, CandleFrame):
+            self.empty_frame = page[:0]
+            page = self._add_frame(page)
+        else:
+            page = self._add_rows([page] if isinstance(page, Mapping) else page)
+
+        if not len(page):
+            return 0
+        self.pages.append(page)
+        self.start = self.page_start if self.start is None else min(self.start, self.page_start)
+        self.end = self.page_end if self.end is None else max(self.end, self.page_end)
+        return len(page)
+
+    def _add_rows(self, rows: list) -> list:
+        key = self.key
+        if any(rows[i][key] > rows[i + 1][key] for i in range(len(rows) - 1)):
+            # most exchanges send the newest row first, sorting a reversed page is linear
+            rows = sorted(rows, key=lambda x: x[key])
+        if rows:
+            self.page_start, self.page_end = rows[0][key], rows[-1][key]
+
+        keys = self.keys
+        new = []
+        for row in rows:
+            if row[key] not in keys:
+                keys.add(row[key])
+                new.append(row)
+        return new
+
+    def _add_frame(self, frame: CandleFrame) -> CandleFrame:
+        timestamps = frame.timestamp
+        if len(timestamps) > 1 and np.any(np.diff(timestamps) < 0):
+            frame = frame[np.argsort(timestamps, kind="stable")]
+            timestamps = frame.timestamp
+        if len(timestamps):
+            self.page_start, self.page_end = int(timestamps[0]), int(timestamps[-1])
+
+        keys = self.keys
+        new = np.ones(len(timestamps), dtype=bool)
+        for i, timestamp in enumerate(timestamps.tolist()):
+            if timestamp in keys:
+                new[i] = False
+            else:
+                keys.add(timestamp)
+        return frame if new.all() else frame[new]
+
+    def get_results(self, start: int = None, end: int = None, num: int = None):
+        """
+        All rows sorted by key, limited to [start, end] and then to the last `num`
+        :return: a list, or a CandleFrame if the pages were CandleFrames
+        """
+        if not self.pages and self.empty_frame is not None:
+            return self.empty_frame
+
+        pages = sorted(self.pages, key=self._get_page_start)
+        in_order = all(self._get_page_end(a) < self._get_page_start(b) for a, b in zip(pages, pages[1:]))
+
+        if pages and isinstance(pages[0], CandleFrame):
+            results = CandleFrame.concat(pages)
+            if not in_order:
+                results = results[np.argsort(results.timestamp, kind="stable")]
+            if start is not None and end is not None:
+                results = results.between(start, end)
+            return results.tail(num) if num else results
+
+        if in_order:
+            results = [row for page in pages for row in page]
+        else:
+            results = list(heapq.merge(*pages, key=lambda x: x[self.key]))
+        if start is not None and end is not None:
+            results = [v for v in results if start <= v[self.key] <= end]
+        return results[-num:] if num else results
+
+    def _get_page_start(self, page):
+        return page.timestamp[0] if isinstance(page, CandleFrame) else page[0][self.key]
+
+    def _get_page_end(self, page):
+        return page.timestamp[-1] if isinstance(page, CandleFrame) else page[-1][self.key]
+
+
+def get_interval_ms(interval: str) -> int:
+    """
+    :param interval: unified interval, e.g. "15m", "4h", "1d"
+    :return: length of the interval in milliseconds, None if it has no fixed length
+    """
+    count, unit = interval[:-1], interval[-1:]
+    if unit not in INTERVAL_UNITS or not count.isdigit():
+        return None
+    return int(count) * INTERVAL_UNITS[unit]
+
+
+def plan_windows(start: int, end: int, interval: str, limit: int) -> list:
+    """
+    Split [start, end] into consecutive windows holding at most `limit` candlesticks each, so every window is one
+    page of `limit` candlesticks ending at the window's end. Windows start at the open time of a candlestick, so the
+    page ending at the window's end reaches back to the window's start
+    :return: (window start, window end) pairs in chronological order, empty if the interval has no fixed length
+    """
+    step = get_interval_ms(interval)
+    if not step:
+        return []
+    size = step * limit
+    first = -(-start // step) * step
+    return [(window_start, min(window_start + size - 1, end)) for window_start in range(first, end + 1, size)]
+
+
+def plan_funding_windows(start: int, end: int, limit: int) -> list:
+    """
+    Split [start, end] into consecutive windows of `limit` hours, each holding at most `limit` funding rates as they
+    are paid at most hourly. Funding times can be a few milliseconds past the hour, so the first window starts at
+    `start` itself rather than at the next hour
+    """
+    if start > end:
+        return []
+    windows = plan_windows(start, end, "1h", limit)
+    return [(start, windows[0][1] if windows else end)] + windows[1:]
+
+
+async def fetch_windows(fetch, windows: list, results: PageAccumulator = None) -> PageAccumulator:
+    """
+    Download the windows concurrently, at most `utils.FANOUT_LIMIT` at a time, each request still going through the
+    client's rate limiter. Inside `iter_history_candlesticks_many` requests also wait for the slots it shares between
+    instruments. A window whose page does not reach back to its start, e.g. because the exchange serves fewer rows per
+    page than planned, keeps paging backwards on its own.
+    :param fetch: coroutine function taking the earliest and the latest timestamp wanted in milliseconds and returning
+        the parsed page of the newest rows up to the latest one. Exchanges paging by end time ignore the earliest
+    :param windows: (window start, window end) pairs, see `plan_windows`
+    :return: `results`, or a new accumulator, holding every page
+    """
+
+    slots = _request_slots.get()
+
+    async def fetch_window(window_start: int, window_end: int) -> list:
+        pages = []
+        window = PageAccumulator()
+        query_end = window_end
+        while True:
+            if slots is None:
+                page = await fetch(window_start, query_end)
+            else:
+                async with slots:
+                    page = await fetch(window_start, query_end)
+            pages.append(page)
+            if not window.add(page) or window.page_start <= window_start:
+                return pages
+            query_end = window.page_start - 1
+
+    results = PageAccumulator() if results is None else results
+    for pages in await gather_bounded(*[fetch_window(*window) for window in windows]):
+        for page in pages:
+            results.add(page)
+    return results
+
+
+async def iter_windows(fetch, windows: list, prefetch: int = FANOUT_LIMIT):
+    """
+    Yield the result of each window in the order of the windows, as soon as it and every window before it are
+    downloaded. At most `prefetch` windows are downloaded ahead of the one being consumed, so memory stays bounded
+    however long the range is. Empty results are skipped.
+    :param fetch: coroutine function taking the window start and end in milliseconds and returning its sorted rows
+    :param windows: (window start, window end) pairs in chronological order, see `plan_windows`
+    """
+    pending = deque()
+    try:
+        for window in windows:
+            pending.append(asyncio.ensure_future(fetch(*window)))
+            if len(pending) < prefetch:
+                continue
+            result = await pending.popleft()
+            if len(result):
+                yield result
+
+        while pending:
+            result = await pending.popleft()
+            if len(result):
+                yield result
+    finally:
+        # the consumer stopped early or a window failed, the windows downloaded ahead are not wanted anymore
+        for task in pending:
+            task.cancel()
+
+
+async def iter_completed(fetch, keys: list, limit: int = FANOUT_LIMIT, progress=None, return_exceptions: bool = False):
+    """
+    Run `fetch` for every key, at most `limit` at a time, and yield (key, result) pairs as they complete. The next key
+    starts as soon as one completes, before its result is yielded.
+    If one fails the others are cancelled before its error is raised, unless `return_exceptions` is set, in which case
+    the error is yielded as its result.
+    :param fetch: coroutine function taking a key
+    :param progress: called with (key, number of completed keys, number of keys) as each key completes
+    """
+    keys = list(keys)
+    queue = iter(keys)
+    done = 0
+
+    async def run(key):
+        try:
+            return key, await fetch(key)
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            return key, e
+
+    pending = {asyncio.ensure_future(run(key)) for key in islice(queue, limit)}
+    try:
+        while pending:
+            finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                key, result = task.result()
+                pending.update(asyncio.ensure_future(run(key)) for key in islice(queue, 1))
+                done += 1
+                if progress:
+                    progress(key, done, len(keys))
+                yield key, result
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+class HistoryMixin(object):
+    """
+    History downloads of the exchange adaptors, built on their own `get_history_candlesticks` and
+    `get_history_funding_rate`
+    """
+
+    # candlesticks the exchange returns per request
+    CANDLESTICK_LIMIT = 1000
+    # funding rates the exchange returns per request, None when it only pages them from the newest one
+    FUNDING_RATE_LIMIT = None
+
+    async def iter_history_candlesticks(
+        self, instrument_id: str, interval: str, start: int, end: int = None, as_array: bool = False, limit: int = None
+    ) -> AsyncIterator[Union[list, CandleFrame]]:
+        """
+        Yield the candlesticks from `start` to `end` (now if not given) in chronological order, `limit` at a time
+        :param limit: candlesticks per chunk, `CANDLESTICK_LIMIT` by default
+        """
+        end = end or self.parser.get_timestamp()
+        windows = plan_windows(start, end, interval, limit or self.CANDLESTICK_LIMIT) or [(start, end)]
+
+        async def fetch(window_start: int, window_end: int):
+            return await self.get_history_candlesticks(
+                instrument_id, interval, window_start, window_end, as_array=as_array
+            )
+
+        async for candlesticks in iter_windows(fetch, windows):
+            yield candlesticks
+
+    async def iter_history_candlesticks_many(
+        self,
+        instrument_ids: Iterable[str],
+        interval: str,
+        start: int,
+        end: int,
+        as_array: bool = False,
+        concurrency: int = FANOUT_LIMIT,
+        progress: Callable[[str, int, int], None] = None,
+        return_exceptions: bool = False,
+    ) -> AsyncIterator[tuple]:
+        """
+        Download the candlesticks of many instruments and yield (instrument_id, candlesticks) pairs as each instrument
+        completes
+        :param concurrency: requests in flight at once across all instruments, the windows of one instrument included
+        :param progress: called with (instrument_id, number of completed instruments, number of instruments)
+        :param return_exceptions: yield an instrument's error as its result instead of stopping the download
+        """
+        slots = asyncio.Semaphore(concurrency)
+
+        async def fetch(instrument_id: str):
+            # each instrument runs in its own task, so the slots reach its windows without leaking to the caller
+            _request_slots.set(slots)
+            return await self.get_history_candlesticks(instrument_id, interval, start, end, as_array=as_array)
+
+        async for instrument_id, candlesticks in iter_completed(
+            fetch, instrument_ids, concurrency, progress, return_exceptions
+        ):
+            yield instrument_id, candlesticks
+
+    async def get_history_candlesticks_many(
+        self,
+        instrument_ids: Iterable[str],
+        interval: str,
+        start: int,
+        end: int,
+        as_array: bool = False,
+        concurrency: int = FANOUT_LIMIT,
+        progress: Callable[[str, int, int], None] = None,
+        return_exceptions: bool = False,
+    ) -> dict:
+        """
+        Candlesticks of many instruments by instrument id, in the order of `instrument_ids`, see
+        `iter_history_candlesticks_many`
+        """
+        instrument_ids = list(instrument_ids)
+        results = {}
+        async for instrument_id, candlesticks in self.iter_history_candlesticks_many(
+            instrument_ids, interval, start, end, as_array, concurrency, progress, return_exceptions
+        ):
+            results[instrument_id] = candlesticks
+        return {instrument_id: results[instrument_id] for instrument_id in instrument_ids}
+
+    async def iter_history_funding_rate(
+        self, instrument_id: str, start: int, end: int = None, limit: int = None
+    ) -> AsyncIterator[list]:
+        """
+        Yield the funding rates from `start` to `end` (now if not given) in chronological order, in windows of
+        `limit` hours. Exchanges without a `FUNDING_RATE_LIMIT` page funding rates from the newest one only, so
+        theirs come in a single chunk
+        :param limit: hours per window, `FUNDING_RATE_LIMIT` by default
+        """
+        end = end or self.parser.get_timestamp()
+        if self.FUNDING_RATE_LIMIT is None:
+            funding_rates = await self.get_history_funding_rate(instrument_id, start, end)
+            if funding_rates:
+                yield funding_rates
+            return
+
+        async def fetch(window_start: int, window_end: int):
+            return await self.get_history_funding_rate(instrument_id, window_start, window_end)
+
+        async for funding_rates in iter_windows(
+            fetch, plan_funding_windows(start, end, limit or self.FUNDING_RATE_LIMIT)
+        ):
+            yield funding_rates
@@ -1,6 +1,97 @@
+import hashlib
+import inspect
+from collections import OrderedDict, deque
 from datetime import datetime, timedelta
 
-from ..utils import query_dict
+from ..candles import CandleFrame
+from ..exchange_info import ExchangeInfo
+from ..orderbook import OrderBook
+from ..raw_data import apply_raw_data_policy, encode, get_raw_data_policy
+
+
+class ParserSpec(dict):
+    """
+    Parser spec (result key -> constant, or callable of the raw data) compiled once into a single function building
+    the whole result in one dict display, instead of checking and calling every field through a loop.
+    Values needed by several fields are declared in `shared` and computed once per row: a field callable taking
+    parameters besides the raw data receives the shared values of the same names, e.g. `lambda x, pair: pair["base"]`.
+    :param spec: result key -> constant or callable of the raw data
+    :param shared: name -> callable of the raw data
+    """
+
+    # calls of `convert_rows` whose results are remembered, one spec may serve several payloads, e.g. spot and margin
+    MEMORY = 8
+
+    def __init__(self, spec: dict, shared: dict = None):
+        super().__init__(spec)
+        self.shared = shared or {}
+        self.convert = self._compile()
+        # id(rows) -> (rows, raw_data policy, results), and (raw_data policy, row hash) -> result
+        self._payloads = OrderedDict()
+        self._rows = {}
+        self._seen = deque(maxlen=self.MEMORY)
+
+    def convert_rows(self, rows: list) -> list:
+        """
+        Convert every row, reusing the results of the last `MEMORY` calls. A payload converted before, which clients
+        return as the same object while its bytes do not change (see `BaseClient.HASHED_ENDPOINTS`), is not converted
+        again. Otherwise rows are hashed and only the rows no recent call converted are converted, so a changed
+        instrument list costs as much as the instruments that changed.
+        Every call returns shallow copies, callers may modify them but not the values they share, e.g. `raw_data`.
+        """
+        policy = get_raw_data_policy()
+        key = id(rows)
+        payload = self._payloads.get(key)
+        if payload is not None and payload[0] is rows and payload[1] == policy:
+            self._payloads.move_to_end(key)
+            return [result.copy() for result in payload[2]]
+
+        results = []
+        seen = set()
+        for row in rows:
+            # results depend on the raw_data policy as well as on the row
+            row_key = (policy, hashlib.blake2b(encode(row), digest_size=16).digest())
+            result = self._rows.get(row_key)
+            if result is None:
+                result = self._rows[row_key] = self.convert(row)
+            results.append(result)
+            seen.add(row_key)
+
+        self._seen.append(seen)
+        if len(self._rows) > sum(len(keys) for keys in self._seen):
+            # drop the rows none of the remembered calls converted
+            keep = set().union(*self._seen)
+            self._rows = {row_key: result for row_key, result in self._rows.items() if row_key in keep}
+        self._payloads[key] = (rows, policy, results)
+        while len(self._payloads) > self.MEMORY:
+            self._payloads.popitem(last=False)
+        return [result.copy() for result in results]
+
+    def _compile(self):
+        namespace = {}
+        shared = []
+        fields = []
+        for i, (key, value) in enumerate(self.items()):
+            namespace[f"_field{i}"] = value
+            if not callable(value):
+                fields.append(f"{key!r}: _field{i}")
+                continue
+
+            args = list(inspect.signature(value).parameters)[1:]
+            for arg in args:
+                if arg not in self.shared:
+                    raise ValueError(f"Unknown shared value {arg} in parser spec field {key}")
+                if arg not in shared:
+                    shared.append(arg)
+            fields.append(f"{key!r}: _field{i}({', '.join(['_data'] + args)})")
+
+        lines = ["def convert(_data):"]
+        for name in shared:
+            namespace[f"_shared_{name}"] = self.shared[name]
+            lines.append(f"    {name} = _shared_{name}(_data)")
+        lines.append(f"    return {{{', '.join(fields)}}}")
+        exec("\n".join(lines), namespace)
+        return namespace["convert"]
 
 
 class Parser:
@@ -21,6 +112,8 @@ class Parser:
     INVERSE_TYPES = ["InverseFutures", "InversePerpetual", "inverse"]
     STABLE_CURRENCY = ["USDT", "USDC"]
     FIAT_CURRENCY = ["USD"]
+    # instrument raw data fields the adaptors look instruments up by, kept whatever the raw_data policy
+    RAW_INFO_KEYS = ExchangeInfo.RAW_SYMBOL_KEYS + ["instType", "contract_type"]
 
     @staticmethod
     def parse_str(data: str, method: callable):
@@ -28,7 +121,19 @@ class Parser:
             return None
         return method(data)
 
+    def parse_raw_data(self, data, keep: list = None):
+        """
+        `raw_data` of a parsed result under the current raw_data policy, see `cex_adaptors.raw_data`
+        """
+        return apply_raw_data_policy(data, keep)
+
+    def parse_raw_info(self, data: dict):
+        return apply_raw_data_policy(data, self.RAW_INFO_KEYS)
+
     def get_result_with_parser(self, data: dict, parser: dict) -> dict:
+        if isinstance(parser, ParserSpec):
+            return parser.convert(data)
+
         results = {}
         for key in parser:
             if callable(parser[key]):
@@ -37,6 +142,14 @@ class Parser:
                 results[key] = parser[key]
         return results
 
+    def get_results_with_parser(self, datas: list, parser: dict) -> list:
+        """
+        `get_result_with_parser` of every row, only converting the rows a `ParserSpec` did not convert recently
+        """
+        if isinstance(parser, ParserSpec):
+            return parser.convert_rows(datas)
+        return [self.get_result_with_parser(data, parser) for data in datas]
+
     def parse_timestamp_to_str(self, timestamp: int, _format: str = "%y%m%d") -> str:
         return datetime.fromtimestamp(timestamp / 1000).strftime(_format)
 
@@ -98,18 +211,57 @@ class Parser:
     def parse_is_inverse(self, data: str) -> bool:
         return data in self.INVERSE_TYPES
 
+    def get_candle_frame(self, datas: list, fields: dict, info: dict, interval: str) -> CandleFrame:
+        """
+        :param fields: column name -> index or key of the value in each raw candlestick, see `CandleFrame.from_rows`
+        """
+        return CandleFrame.from_rows(
+            datas, fields, self.parse_unified_id(info), self.parse_unified_market_type(info), interval
+        )
+
+    def build_orderbook(
+        self,
+        data,
+        asks: list,
+        bids: list,
+        info: dict,
+        timestamp: int,
+        depth: int = None,
+        as_array: bool = False,
+        order_number: int = None,
+    ):
+        """
+        Order book as an `OrderBook` if `as_array`, else in the dict format, see `OrderBook.from_levels`
+        :param data: raw order book, kept as `raw_data`
+        """
+        orderbook = OrderBook.from_levels(
+            asks,
+            bids,
+            self.parse_unified_id(info),
+            timestamp,
+            depth=depth,
+            order_number=order_number,
+            raw_data=self.parse_raw_data(data),
+        )
+        return orderbook if as_array else orderbook.to_dict()
+
     @staticmethod
     def adjust_timestamp(timestamp: int, delta: timedelta) -> int:
         return int((datetime.fromtimestamp(timestamp / 1000) + delta).timestamp() * 1000)
 
     @staticmethod
     def get_id_symbol_map(info: dict, market_type: str, key: str = "symbol") -> dict:
+        return ExchangeInfo.of(info).get_derived(
+            ("id_symbol_map", market_type, key), lambda infos: Parser._build_id_symbol_map(infos, market_type, key)
+        )
+
+    @staticmethod
+    def _build_id_symbol_map(info: ExchangeInfo, market_type: str, key: str) -> dict:
+        ids = info.get_ids(market_type)
         if market_type in ["linear", "inverse"]:
-            info = query_dict(info, f"is_{market_type} == True and is_spot == False")
-        else:
-            info = query_dict(info, f"is_{market_type} == True")
+            ids -= info.get_ids("spot")
 
-        return {v["raw_data"][key]: k for k, v in info.items()}
+        return {v["raw_data"][key]: k for k, v in info.items() if k in ids}
 
     @staticmethod
     def parse_str_to_timestamp(_str: str, _format: str = "%Y%m%d") -> int:
@@ -1,61 +1,81 @@
-from .base import Parser
+from functools import cached_property
+from typing import Union
+
+from ..candles import CandleFrame
+from ..exchange_info import ExchangeInfo
+from ..orderbook import OrderBook
+from ..records import Candle, FundingRate, Ticker
+from .base import Parser, ParserSpec
 
 
 class BinanceParser(Parser):
+    def __init__(self):
+        self._futures_exchange_info_parsers = {}
+
     @staticmethod
     def check_response(response: dict):
         return {"code": 200, "status": "success", "data": response}
 
-    @property
-    def spot_exchange_info_parser(self):
-        return {
-            "active": (lambda x: x["status"] == "TRADING"),
-            "is_spot": True,
-            "is_margin": (lambda x: x["isMarginTradingAllowed"]),
-            "is_futures": False,
-            "is_perp": False,
-            "is_linear": True,
-            "is_inverse": False,
-            "symbol": (lambda x: self.parse_unified_symbol(x["baseAsset"], x["quoteAsset"])),
-            "base": (lambda x: str(x["baseAsset"])),
-            "quote": (lambda x: str(x["quoteAsset"])),
-            "settle": (lambda x: str(x["quoteAsset"])),
-            "multiplier": 1,  # spot multiplier default 1
-            "leverage": 1,  # spot leverage default 1
-            "listing_time": None,  # api not support this field
-            "expiration_time": None,  # spot not support this field
-            "contract_size": 1,  # spot contract size default 1
-            "tick_size": None,  # Not yet implemented
-            "min_order_size": None,  # Not yet implemented
-            "max_order_size": None,  # Not yet implemented
-            "raw_data": (lambda x: x),
-        }
-
-    def futures_exchange_info_parser(self, market_type: str):
-        return {
-            "active": (lambda x: (x["status"] if market_type != "inverse" else x["contractStatus"]) == "TRADING"),
-            "is_spot": False,
-            "is_margin": False,
-            "is_futures": (lambda x: self.parse_is_futures(x["contractType"])),
-            "is_perp": (lambda x: self.parse_is_perpetual(x["contractType"])),
-            "is_linear": True if market_type == "linear" else False,
-            "is_inverse": True if market_type == "inverse" else False,
-            "symbol": (lambda x: self.parse_unified_symbol(self.parse_base_currency(x["baseAsset"]), x["quoteAsset"])),
-            "base": (lambda x: self.parse_base_currency(x["baseAsset"])),
-            "quote": (lambda x: x["quoteAsset"]),
-            "settle": (lambda x: x["marginAsset"]),
-            "multiplier": (lambda x: self.parse_multiplier(x["baseAsset"])),
-            "leverage": 1,  # need to find another way to get the leverage data
-            "listing_time": (lambda x: int(x["onboardDate"])),
-            "expiration_time": (lambda x: int(x["deliveryDate"])),
-            "contract_size": (
-                lambda x: 1 if "contractSize" not in x else float(x["contractSize"])
-            ),  # binance only have contract size to inverse perp and futures
-            "tick_size": None,  # not yet implemented
-            "min_order_size": None,  # not yet implemented
-            "max_order_size": None,  # not yet implemented
-            "raw_data": (lambda x: x),
-        }
+    @cached_property
+    def spot_exchange_info_parser(self) -> ParserSpec:
+        return ParserSpec(
+            {
+                "active": (lambda x: x["status"] == "TRADING"),
+                "is_spot": True,
+                "is_margin": (lambda x: x["isMarginTradingAllowed"]),
+                "is_futures": False,
+                "is_perp": False,
+                "is_linear": True,
+                "is_inverse": False,
+                "symbol": (lambda x: self.parse_unified_symbol(x["baseAsset"], x["quoteAsset"])),
+                "base": (lambda x: str(x["baseAsset"])),
+                "quote": (lambda x: str(x["quoteAsset"])),
+                "settle": (lambda x: str(x["quoteAsset"])),
+                "multiplier": 1,  # spot multiplier default 1
+                "leverage": 1,  # spot leverage default 1
+                "listing_time": None,  # api not support this field
+                "expiration_time": None,  # spot not support this field
+                "contract_size": 1,  # spot contract size default 1
+                "tick_size": None,  # Not yet implemented
+                "min_order_size": None,  # Not yet implemented
+                "max_order_size": None,  # Not yet implemented
+                "raw_data": self.parse_raw_info,
+            }
+        )
+
+    def futures_exchange_info_parser(self, market_type: str) -> ParserSpec:
+        if market_type not in self._futures_exchange_info_parsers:
+            self._futures_exchange_info_parsers[market_type] = self._build_futures_exchange_info_parser(market_type)
+        return self._futures_exchange_info_parsers[market_type]
+
+    def _build_futures_exchange_info_parser(self, market_type: str) -> ParserSpec:
+        return ParserSpec(
+            {
+                "active": (lambda x: (x["status"] if market_type != "inverse" else x["contractStatus"]) == "TRADING"),
+                "is_spot": False,
+                "is_margin": False,
+                "is_futures": (lambda x: self.parse_is_futures(x["contractType"])),
+                "is_perp": (lambda x: self.parse_is_perpetual(x["contractType"])),
+                "is_linear": True if market_type == "linear" else False,
+                "is_inverse": True if market_type == "inverse" else False,
+                "symbol": (lambda x, base: self.parse_unified_symbol(base, x["quoteAsset"])),
+                "base": (lambda x, base: base),
+                "quote": (lambda x: x["quoteAsset"]),
+                "settle": (lambda x: x["marginAsset"]),
+                "multiplier": (lambda x: self.parse_multiplier(x["baseAsset"])),
+                "leverage": 1,  # need to find another way to get the leverage data
+                "listing_time": (lambda x: int(x["onboardDate"])),
+                "expiration_time": (lambda x: int(x["deliveryDate"])),
+                "contract_size": (
+                    lambda x: 1 if "contractSize" not in x else float(x["contractSize"])
+                ),  # binance only have contract size to inverse perp and futures
+                "tick_size": None,  # not yet implemented
+                "min_order_size": None,  # not yet implemented
+                "max_order_size": None,  # not yet implemented
+                "raw_data": self.parse_raw_info,
+            },
+            shared={"base": lambda x: self.parse_base_currency(x["baseAsset"])},
+        )
 
     def parse_exchange_info(self, response: dict, parser: dict) -> dict:
         response = self.check_response(response)
@@ -63,15 +83,14 @@ class BinanceParser(Parser):
             return response
 
         datas = response["data"]["symbols"]
-        results = {}
-        for data in datas:
-            result = self.get_result_with_parser(data, parser)
+        results = ExchangeInfo()
+        for result in self.get_results_with_parser(datas, parser):
             id = self.parse_unified_id(result)
             results[id] = result
 
         return results
 
-    def parse_ticker(self, response: dict, info: dict) -> dict:
+    def parse_ticker(self, response: dict, info: dict) -> Ticker:
         if isinstance(response, list):
             response = response[0]
 
@@ -80,25 +99,30 @@ class BinanceParser(Parser):
 
         quote_volume *= info["contract_size"] if info["is_perp"] or info["is_futures"] else 1
 
-        return {
-            "timestamp": self.parse_str(response["closeTime"], int),
-            "instrument_id": self.parse_unified_id(info),
-            "open_time": self.parse_str(response["openTime"], int),
-            "close_time": self.parse_str(response["closeTime"], int),
-            "open": self.parse_str(response["openPrice"], float),
-            "high": self.parse_str(response["highPrice"], float),
-            "low": self.parse_str(response["lowPrice"], float),
-            "last": self.parse_str(response["lastPrice"], float),
-            "base_volume": base_volume,
-            "quote_volume": quote_volume,
-            "price_change": self.parse_str(response["priceChange"], float),
-            "price_change_percent": self.parse_str(response["priceChangePercent"], float) / 100,
-            "raw_data": response,
-        }
+        return Ticker(
+            timestamp=self.parse_str(response["closeTime"], int),
+            instrument_id=self.parse_unified_id(info),
+            open_time=self.parse_str(response["openTime"], int),
+            close_time=self.parse_str(response["closeTime"], int),
+            open=self.parse_str(response["openPrice"], float),
+            high=self.parse_str(response["highPrice"], float),
+            low=self.parse_str(response["lowPrice"], float),
+            last=self.parse_str(response["lastPrice"], float),
+            base_volume=base_volume,
+            quote_volume=quote_volume,
+            price_change=self.parse_str(response["priceChange"], float),
+            price_change_percent=self.parse_str(response["priceChangePercent"], float) / 100,
+            raw_data=self.parse_raw_data(response),
+        )
 
     def get_id_map(self, infos: dict, market_type: str) -> dict:
-        infos = self.query_dict(infos, {f"is_{market_type}": True})
-        return {v["raw_data"]["symbol"]: k for k, v in infos.items()}
+        return ExchangeInfo.of(infos).get_derived(
+            ("id_map", market_type), lambda infos: self._build_id_map(infos, market_type)
+        )
+
+    def _build_id_map(self, infos: ExchangeInfo, market_type: str) -> dict:
+        ids = infos.get_ids(market_type)
+        return {v["raw_data"]["symbol"]: k for k, v in infos.items() if k in ids}
 
     def parse_tickers(self, response: dict, market_type: str, infos: dict) -> dict:
         response = self.check_response(response)
@@ -123,7 +147,7 @@ class BinanceParser(Parser):
             "timestamp": data["updateTime"],
             "account_id": data["uid"],
             "account_type": data["accountType"],
-            "raw_data": data,
+            "raw_data": self.parse_raw_data(data),
         }
 
     def parse_margin_account_info(self, response: dict) -> dict:
@@ -146,7 +170,7 @@ class BinanceParser(Parser):
                 "currency": data["asset"],
                 "balance": self.parse_str(data["netAsset"], float),
                 "available": self.parse_str(data["free"], float),
-                "raw_data": data,
+                "raw_data": self.parse_raw_data(data),
             }
             currency = result["currency"]
             results[currency] = result
@@ -158,14 +182,14 @@ class BinanceParser(Parser):
 
         results = []
         for data in datas:
-            result = {
-                "timestamp": int(round(self.parse_str(data["fundingTime"], int) / 1000)) * 1000,
-                "instrument_id": self.parse_unified_id(info),
-                "market_type": self.parse_unified_market_type(info),
-                "funding_rate": self.parse_str(data["fundingRate"], float),
-                "realized_rate": None,
-                "raw_data": data,
-            }
+            result = FundingRate(
+                timestamp=int(round(self.parse_str(data["fundingTime"], int) / 1000)) * 1000,
+                instrument_id=self.parse_unified_id(info),
+                market_type=self.parse_unified_market_type(info),
+                funding_rate=self.parse_str(data["fundingRate"], float),
+                realized_rate=None,
+                raw_data=self.parse_raw_data(data),
+            )
             results.append(result)
         return results
 
@@ -178,7 +202,7 @@ class BinanceParser(Parser):
             "instrument_id": instrument_id,
             "market_type": self.parse_unified_market_type(info),
             "last_price": self.parse_str(data["last"], float),
-            "raw_data": data,
+            "raw_data": self.parse_raw_data(data),
         }
 
     def parse_index_price(self, response: dict, info: dict, market_type: str) -> dict:
@@ -194,7 +218,7 @@ class BinanceParser(Parser):
                 "instrument_id": self.parse_unified_id(info),
                 "market_type": self.parse_unified_market_type(info),
                 "index_price": self.parse_str(data["price"], float),
-                "raw_data": data,
+                "raw_data": self.parse_raw_data(data),
             }
         else:  # linear, inverse
             return {
@@ -202,7 +226,7 @@ class BinanceParser(Parser):
                 "instrument_id": self.parse_unified_id(info),
                 "market_type": self.parse_unified_market_type(info),
                 "index_price": self.parse_str(data["indexPrice"], float),
-                "raw_data": data,
+                "raw_data": self.parse_raw_data(data),
             }
 
     def parse_mark_price(self, response: dict, info: dict, market_type: str) -> dict:
@@ -217,7 +241,7 @@ class BinanceParser(Parser):
             "instrument_id": self.parse_unified_id(info),
             "market_type": self.parse_unified_market_type(info),
             "mark_price": self.parse_str(data["markPrice"], float),
-            "raw_data": data,
+            "raw_data": self.parse_raw_data(data),
         }
 
     def parse_open_interest(self, response: dict, info: dict, market_type: str) -> dict:
@@ -230,43 +254,17 @@ class BinanceParser(Parser):
             "market_type": self.parse_unified_market_type(info),
             "oi_contract": self.parse_str(data["openInterest"], float),
             "oi_currency": None,
-            "raw_data": data,
+            "raw_data": self.parse_raw_data(data),
         }
 
-    def parse_orderbook(self, response: dict, info: dict, market_type: str, depth: int) -> dict:
+    def parse_orderbook(
+        self, response: dict, info: dict, market_type: str, depth: int = None, as_array: bool = False
+    ) -> Union[dict, OrderBook]:
         response = self.check_response(response)
         data = response["data"]
-
-        results = {
-            "timestamp": self.get_timestamp(),
-            "instrument_id": self.parse_unified_id(info),
-            "asks": [
-                {
-                    "price": self.parse_str(ask[0], float),
-                    "volume": self.parse_str(ask[1], float),
-                    "order_number": None,
-                }
-                for ask in data["asks"]
-            ],
-            "bids": [
-                {
-                    "price": self.parse_str(bid[0], float),
-                    "volume": self.parse_str(bid[1], float),
-                    "order_number": None,
-                }
-                for bid in data["bids"]
-            ],
-            "raw_data": data,
-        }
-
-        results["bids"] = sorted(results["bids"], key=lambda x: x["price"], reverse=True)
-        results["asks"] = sorted(results["asks"], key=lambda x: x["price"])
-
-        if depth:
-            results["bids"] = results["bids"][:depth]
-            results["asks"] = results["asks"][:depth]
-
-        return results
+        return self.build_orderbook(
+            data, data["asks"], data["bids"], info, self.get_timestamp(), depth=depth, as_array=as_array
+        )
 
     def get_symbol(self, info: dict) -> str:
         return f'{info["base"]}{info["quote"]}'
@@ -294,7 +292,7 @@ class BinanceParser(Parser):
             "instrument_id": self.parse_unified_id(info),
             "market_type": self.parse_unified_market_type(info),
             "funding_rate": self.parse_str(data["lastFundingRate"], float),
-            "raw_data": data,
+            "raw_data": self.parse_raw_data(data),
         }
 
     def parse_candlesticks(self, response: dict, info: dict, market_type: str, interval: str) -> any:
@@ -307,23 +305,37 @@ class BinanceParser(Parser):
 
         for data in datas:
             results.append(
-                {
-                    "timestamp": self.parse_str(data[0], int),
-                    "instrument_id": instrument_id,
-                    "market_type": market_type,
-                    "interval": interval,
-                    "open": self.parse_str(data[1], float),
-                    "high": self.parse_str(data[2], float),
-                    "low": self.parse_str(data[3], float),
-                    "close": self.parse_str(data[4], float),
-                    "base_volume": self.parse_str(data[5], float),
-                    "quote_volume": self.parse_str(data[7], float),
-                    "contract_volume": self.parse_str(data[5], float),
-                    "raw_data": data,
-                }
+                Candle(
+                    timestamp=self.parse_str(data[0], int),
+                    instrument_id=instrument_id,
+                    market_type=market_type,
+                    interval=interval,
+                    open=self.parse_str(data[1], float),
+                    high=self.parse_str(data[2], float),
+                    low=self.parse_str(data[3], float),
+                    close=self.parse_str(data[4], float),
+                    base_volume=self.parse_str(data[5], float),
+                    quote_volume=self.parse_str(data[7], float),
+                    contract_volume=self.parse_str(data[5], float),
+                    raw_data=self.parse_raw_data(data),
+                )
             )
         return results[0] if len(results) == 1 else results
 
+    def parse_candle_frame(self, response: dict, info: dict, market_type: str, interval: str) -> CandleFrame:
+        response = self.check_response(response)
+        fields = {
+            "timestamp": 0,
+            "open": 1,
+            "high": 2,
+            "low": 3,
+            "close": 4,
+            "base_volume": 5,
+            "quote_volume": 7,
+            "contract_volume": 5,
+        }
+        return self.get_candle_frame(response["data"], fields, info, interval)
+
     def parse_margin_market_order(self, response: dict, info: dict) -> dict:
         data = response
 
@@ -338,5 +350,5 @@ class BinanceParser(Parser):
             "order_id": str(data["orderId"]),
             "order_type": data["type"].lower(),
             "status": data["status"],
-            "raw_data": data,
+            "raw_data": self.parse_raw_data(data),
         }
@@ -1,5 +1,11 @@
-from ..utils import query_dict
-from .base import Parser
+from functools import cached_property
+from typing import Union
+
+from ..candles import CandleFrame
+from ..exchange_info import ExchangeInfo
+from ..orderbook import OrderBook
+from ..records import Candle, FundingRate, Ticker
+from .base import Parser, ParserSpec
 
 
 class BitgetParser(Parser):
@@ -50,91 +56,96 @@ class BitgetParser(Parser):
         else:
             raise ValueError(f"Error in parsing Bitget response: {response}")
 
-    @property
-    def spot_exchange_info_parser(self):
-        return {
-            "active": (lambda x: x["status"] == "online"),
-            "is_spot": True,
-            "is_margin": False,
-            "is_futures": False,
-            "is_perp": False,
-            "is_linear": True,
-            "is_inverse": False,
-            "symbol": (lambda x: self.parse_unified_symbol(x["baseCoin"], x["quoteCoin"])),
-            "base": (lambda x: str(x["baseCoin"])),
-            "quote": (lambda x: str(x["quoteCoin"])),
-            "settle": (lambda x: str(x["quoteCoin"])),
-            "multiplier": 1,  # spot multiplier default 1
-            "leverage": 1,  # spot leverage default 1
-            "listing_time": None,  # api not support this field
-            "expiration_time": None,  # spot not support this field
-            "contract_size": 1,  # spot contract size default 1
-            "tick_size": None,  # Not yet implemented
-            "min_order_size": (lambda x: float(x["minTradeAmount"])),
-            "max_order_size": (lambda x: float(x["maxTradeAmount"])),
-            "raw_data": (lambda x: x),
-        }
+    @cached_property
+    def spot_exchange_info_parser(self) -> ParserSpec:
+        return ParserSpec(
+            {
+                "active": (lambda x: x["status"] == "online"),
+                "is_spot": True,
+                "is_margin": False,
+                "is_futures": False,
+                "is_perp": False,
+                "is_linear": True,
+                "is_inverse": False,
+                "symbol": (lambda x: self.parse_unified_symbol(x["baseCoin"], x["quoteCoin"])),
+                "base": (lambda x: str(x["baseCoin"])),
+                "quote": (lambda x: str(x["quoteCoin"])),
+                "settle": (lambda x: str(x["quoteCoin"])),
+                "multiplier": 1,  # spot multiplier default 1
+                "leverage": 1,  # spot leverage default 1
+                "listing_time": None,  # api not support this field
+                "expiration_time": None,  # spot not support this field
+                "contract_size": 1,  # spot contract size default 1
+                "tick_size": None,  # Not yet implemented
+                "min_order_size": (lambda x: float(x["minTradeAmount"])),
+                "max_order_size": (lambda x: float(x["maxTradeAmount"])),
+                "raw_data": self.parse_raw_info,
+            }
+        )
 
-    @property
-    def derivative_exchange_info_parser(self):
-        return {
-            "active": (lambda x: x["symbolStatus"] == "normal"),
-            "is_spot": False,
-            "is_margin": False,
-            "is_futures": (lambda x: self.parse_is_futures(x["symbolType"])),
-            "is_perp": (lambda x: self.parse_is_perpetual(x["symbolType"])),
-            "is_linear": (lambda x: False if x["quoteCoin"] in self.FIAT_CURRENCY else True),
-            "is_inverse": (lambda x: True if x["quoteCoin"] in self.FIAT_CURRENCY else False),
-            "symbol": (lambda x: self.parse_unified_symbol(x["baseCoin"], x["quoteCoin"])),
-            "base": (lambda x: self.parse_base_currency(x["baseCoin"])),
-            "quote": (lambda x: str(x["quoteCoin"])),
-            "settle": (lambda x: str(x["baseCoin"]) if x["quoteCoin"] in self.FIAT_CURRENCY else x["quoteCoin"]),
-            "multiplier": (lambda x: self.parse_multiplier(x["baseCoin"])),
-            "leverage": (lambda x: int(x["maxLever"])),
-            "listing_time": (lambda x: int(x["launchTime"]) if x["launchTime"] else None),
-            "expiration_time": (lambda x: int(x["deliveryTime"]) if x["deliveryTime"] else None),
-            "contract_size": (lambda x: float(x["sizeMultiplier"])),
-            "tick_size": None,  # not yet implemented
-            "min_order_size": None,  # API not support this field
-            "max_order_size": None,  # API not support this field
-            "raw_data": (lambda x: x),
-        }
+    @cached_property
+    def derivative_exchange_info_parser(self) -> ParserSpec:
+        return ParserSpec(
+            {
+                "active": (lambda x: x["symbolStatus"] == "normal"),
+                "is_spot": False,
+                "is_margin": False,
+                "is_futures": (lambda x: self.parse_is_futures(x["symbolType"])),
+                "is_perp": (lambda x: self.parse_is_perpetual(x["symbolType"])),
+                "is_linear": (lambda x: False if x["quoteCoin"] in self.FIAT_CURRENCY else True),
+                "is_inverse": (lambda x: True if x["quoteCoin"] in self.FIAT_CURRENCY else False),
+                "symbol": (lambda x: self.parse_unified_symbol(x["baseCoin"], x["quoteCoin"])),
+                "base": (lambda x: self.parse_base_currency(x["baseCoin"])),
+                "quote": (lambda x: str(x["quoteCoin"])),
+                "settle": (lambda x: str(x["baseCoin"]) if x["quoteCoin"] in self.FIAT_CURRENCY else x["quoteCoin"]),
+                "multiplier": (lambda x: self.parse_multiplier(x["baseCoin"])),
+                "leverage": (lambda x: int(x["maxLever"])),
+                "listing_time": (lambda x: int(x["launchTime"]) if x["launchTime"] else None),
+                "expiration_time": (lambda x: int(x["deliveryTime"]) if x["deliveryTime"] else None),
+                "contract_size": (lambda x: float(x["sizeMultiplier"])),
+                "tick_size": None,  # not yet implemented
+                "min_order_size": None,  # API not support this field
+                "max_order_size": None,  # API not support this field
+                "raw_data": self.parse_raw_info,
+            }
+        )
 
     def parse_exchange_info(self, response: dict, parser: callable):
         response = self.check_response(response)
 
         datas = response["data"]
-        results = {}
-        for data in datas:
-            result = self.get_result_with_parser(data, parser)
+        results = ExchangeInfo()
+        for result in self.get_results_with_parser(datas, parser):
             instrument_id = self.parse_unified_id(result)
             results[instrument_id] = result
         return results
 
     def get_bitget_id_map(self, exchange_info: dict, market_type: str) -> dict:
-        if market_type == "derivative":
-            infos = query_dict(exchange_info, "is_perp == True or is_futures == True")
-        else:
-            infos = query_dict(exchange_info, f"is_{market_type} == True")
+        return ExchangeInfo.of(exchange_info).get_derived(
+            ("id_map", market_type), lambda infos: self._build_id_map(infos, market_type)
+        )
+
+    def _build_id_map(self, infos: ExchangeInfo, market_type: str) -> dict:
+        ids = infos.get_ids(["perp", "futures"] if market_type == "derivative" else market_type)
 
-        return {v["raw_data"]["symbol"]: k for k, v in infos.items()}
+        return {v["raw_data"]["symbol"]: k for k, v in infos.items() if k in ids}
 
     def parse_ticker(self, response: dict, info: dict, market_type: str):
-        return {
-            "timestamp": self.parse_str(response["ts"], int),
-            "instrument_id": self.parse_unified_id(info),
-            "open_time": None,  # API not support
-            "close_time": self.parse_str(response["ts"], int),
-            "open": self.parse_str(response["open" if market_type == "spot" else "open24h"], float),
-            "high": self.parse_str(response["high24h"], float),
-            "low": self.parse_str(response["low24h"], float),
-            "last": self.parse_str(response["lastPr"], float),
-            "base_volume": self.parse_str(response["baseVolume"], float),
-            "quote_volume": self.parse_str(response["quoteVolume"], float),
-            "price_change": None,  # API not support
-            "price_change_percent": self.parse_str(response["change24h"], float),
-            "raw_data": response,
-        }
+        return Ticker(
+            timestamp=self.parse_str(response["ts"], int),
+            instrument_id=self.parse_unified_id(info),
+            open_time=None,  # API not support
+            close_time=self.parse_str(response["ts"], int),
+            open=self.parse_str(response["open" if market_type == "spot" else "open24h"], float),
+            high=self.parse_str(response["high24h"], float),
+            low=self.parse_str(response["low24h"], float),
+            last=self.parse_str(response["lastPr"], float),
+            base_volume=self.parse_str(response["baseVolume"], float),
+            quote_volume=self.parse_str(response["quoteVolume"], float),
+            price_change=None,  # API not support
+            price_change_percent=self.parse_str(response["change24h"], float),
+            raw_data=self.parse_raw_data(response),
+        )
 
     def parse_raw_ticker(self, response: dict, info: dict, market_type: str):
         response = self.check_response(response)
@@ -167,7 +178,7 @@ class BitgetParser(Parser):
             "index_price"
             if query_type == "index"
             else "mark_price": self.parse_str(data["indexPrice" if query_type == "index" else "markPrice"], float),
-            "raw_data": data,
+            "raw_data": self.parse_raw_data(data),
         }
 
     @staticmethod
@@ -204,20 +215,37 @@ class BitgetParser(Parser):
             result = self.parse_candlestick(data, info, market_type)
             result.update(update_)
             results.append(result)
-        return results if len(results) > 1 else results[0]
+        return results if len(results) != 1 else results[0]
 
-    def parse_candlestick(self, data: list, info: dict, market_type: str):
-        return {
-            "timestamp": self.parse_str(data[0], int),
-            "open": self.parse_str(data[1], float),
-            "high": self.parse_str(data[2], float),
-            "low": self.parse_str(data[3], float),
-            "close": self.parse_str(data[4], float),
-            "base_volume": self.parse_str(data[5], float),
-            "quote_volume": self.parse_str(data[6], float),
-            "contract_volume": self.parse_str(data[5], float) / (1 if market_type == "spot" else info["contract_size"]),
-            "raw_data": data,
+    def parse_candle_frame(self, response: dict, info: dict, market_type: str, interval: str) -> CandleFrame:
+        response = self.check_response(response)
+        fields = {
+            "timestamp": 0,
+            "open": 1,
+            "high": 2,
+            "low": 3,
+            "close": 4,
+            "base_volume": 5,
+            "quote_volume": 6,
+            "contract_volume": 5,
         }
+        frame = self.get_candle_frame(response["data"], fields, info, interval)
+        if market_type != "spot":
+            frame.columns["contract_volume"] /= info["contract_size"]
+        return frame
+
+    def parse_candlestick(self, data: list, info: dict, market_type: str):
+        return Candle(
+            timestamp=self.parse_str(data[0], int),
+            open=self.parse_str(data[1], float),
+            high=self.parse_str(data[2], float),
+            low=self.parse_str(data[3], float),
+            close=self.parse_str(data[4], float),
+            base_volume=self.parse_str(data[5], float),
+            quote_volume=self.parse_str(data[6], float),
+            contract_volume=self.parse_str(data[5], float) / (1 if market_type == "spot" else info["contract_size"]),
+            raw_data=self.parse_raw_data(data),
+        )
 
     def parse_current_funding_rate(self, response: dict, info: dict) -> dict:
         response = self.check_response(response)
@@ -229,7 +257,7 @@ class BitgetParser(Parser):
             "instrument_id": self.parse_unified_id(info),
             "market_type": self.parse_unified_market_type(info),
             "funding_rate": self.parse_str(data["fundingRate"], float),
-            "raw_data": data,
+            "raw_data": self.parse_raw_data(data),
         }
 
     def parse_history_funding_rate(self, response: dict, info: dict) -> dict:
@@ -240,39 +268,28 @@ class BitgetParser(Parser):
         market_type = self.parse_unified_market_type(info)
 
         return [
-            {
-                "timestamp": self.parse_str(data["fundingTime"], int),
-                "instrument_id": instrument_id,
-                "market_type": market_type,
-                "funding_rate": self.parse_str(data["fundingRate"], float),
-                "realized_rate": self.parse_str(data["fundingRate"], float),
-                "raw_data": data,
-            }
+            FundingRate(
+                timestamp=self.parse_str(data["fundingTime"], int),
+                instrument_id=instrument_id,
+                market_type=market_type,
+                funding_rate=self.parse_str(data["fundingRate"], float),
+                realized_rate=self.parse_str(data["fundingRate"], float),
+                raw_data=self.parse_raw_data(data),
+            )
             for data in datas
         ]
 
-    def parse_orderbook(self, response: dict, info: dict) -> dict:
+    def parse_orderbook(
+        self, response: dict, info: dict, depth: int = None, as_array: bool = False
+    ) -> Union[dict, OrderBook]:
         response = self.check_response(response)
         datas = response["data"]
-
-        return {
-            "timestamp": self.parse_str(datas["ts"], int),
-            "instrument_id": self.parse_unified_id(info),
-            "asks": [
-                {
-                    "price": self.parse_str(ask[0], float),
-                    "volume": self.parse_str(ask[1], float),
-                    "order_number": None,
-                }
-                for ask in datas["asks"]
-            ],
-            "bids": [
-                {
-                    "price": self.parse_str(bid[0], float),
-                    "volume": self.parse_str(bid[1], float),
-                    "order_number": None,
-                }
-                for bid in datas["bids"]
-            ],
-            "raw_data": datas,
-        }
+        return self.build_orderbook(
+            datas,
+            datas["asks"],
+            datas["bids"],
+            info,
+            self.parse_str(datas["ts"], int),
+            depth=depth,
+            as_array=as_array,
+        )
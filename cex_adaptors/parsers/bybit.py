@@ -1,4 +1,11 @@
-from .base import Parser
+from functools import cached_property
+from typing import Union
+
+from ..candles import CandleFrame
+from ..exchange_info import ExchangeInfo
+from ..orderbook import OrderBook
+from ..records import Candle, FundingRate, Ticker
+from .base import Parser, ParserSpec
 
 
 class BybitParser(Parser):
@@ -40,63 +47,67 @@ class BybitParser(Parser):
         else:
             raise ValueError(f"Invalid market type: {info}")
 
-    @property
-    def spot_exchange_info_parser(self) -> dict:
-        return {
-            "active": (lambda x: x["status"] == "Trading"),
-            "is_spot": True,
-            "is_margin": (lambda x: self.parse_is_margin(x["marginTrading"])),
-            "is_futures": False,
-            "is_perp": False,
-            "is_linear": True,
-            "is_inverse": False,
-            "symbol": (lambda x: self.parse_unified_symbol(x["baseCoin"], x["quoteCoin"])),
-            "base": (lambda x: str(x["baseCoin"])),
-            "quote": (lambda x: str(x["quoteCoin"])),
-            "settle": (lambda x: str(x["quoteCoin"])),
-            "multiplier": 1,  # spot multiplier default 1
-            "leverage": 1,  # spot leverage default 1
-            "listing_time": None,  # api not support this field
-            "expiration_time": None,  # spot not support this field
-            "contract_size": 1,  # spot contract size default 1
-            "tick_size": (lambda x: float(x["priceFilter"]["tickSize"])),
-            "min_order_size": (lambda x: float(x["lotSizeFilter"]["minOrderQty"])),
-            "max_order_size": (lambda x: float(x["lotSizeFilter"]["maxOrderQty"])),
-            "raw_data": (lambda x: x),
-        }
+    @cached_property
+    def spot_exchange_info_parser(self) -> ParserSpec:
+        return ParserSpec(
+            {
+                "active": (lambda x: x["status"] == "Trading"),
+                "is_spot": True,
+                "is_margin": (lambda x: self.parse_is_margin(x["marginTrading"])),
+                "is_futures": False,
+                "is_perp": False,
+                "is_linear": True,
+                "is_inverse": False,
+                "symbol": (lambda x: self.parse_unified_symbol(x["baseCoin"], x["quoteCoin"])),
+                "base": (lambda x: str(x["baseCoin"])),
+                "quote": (lambda x: str(x["quoteCoin"])),
+                "settle": (lambda x: str(x["quoteCoin"])),
+                "multiplier": 1,  # spot multiplier default 1
+                "leverage": 1,  # spot leverage default 1
+                "listing_time": None,  # api not support this field
+                "expiration_time": None,  # spot not support this field
+                "contract_size": 1,  # spot contract size default 1
+                "tick_size": (lambda x: float(x["priceFilter"]["tickSize"])),
+                "min_order_size": (lambda x: float(x["lotSizeFilter"]["minOrderQty"])),
+                "max_order_size": (lambda x: float(x["lotSizeFilter"]["maxOrderQty"])),
+                "raw_data": self.parse_raw_info,
+            }
+        )
 
-    @property
-    def perp_futures_exchange_info_parser(self) -> dict:
-        return {
-            "active": (lambda x: x["status"] == "Trading"),
-            "is_spot": False,
-            "is_margin": False,
-            "is_futures": (lambda x: self.parse_is_futures(x["contractType"])),
-            "is_perp": (lambda x: self.parse_is_perpetual(x["contractType"])),
-            "is_linear": (lambda x: self.parse_is_linear(x["contractType"])),
-            "is_inverse": (lambda x: self.parse_is_inverse(x["contractType"])),
-            "symbol": (lambda x: self.parse_unified_symbol(self.parse_base_currency(x["baseCoin"]), x["quoteCoin"])),
-            "base": (lambda x: self.parse_base_currency(x["baseCoin"])),
-            "quote": (lambda x: str(x["quoteCoin"])),
-            "settle": (lambda x: str(x["settleCoin"])),
-            "multiplier": (lambda x: self.parse_multiplier(x["baseCoin"])),
-            "leverage": (lambda x: float(x["leverageFilter"]["maxLeverage"])),
-            "listing_time": (lambda x: int(x["launchTime"])),
-            "expiration_time": (lambda x: int(x["deliveryTime"])),
-            "contract_size": (lambda x: float(x["lotSizeFilter"]["qtyStep"])),
-            "tick_size": (lambda x: float(x["priceFilter"]["tickSize"])),
-            "min_order_size": (lambda x: float(x["lotSizeFilter"]["minOrderQty"])),
-            "max_order_size": (lambda x: float(x["lotSizeFilter"]["maxOrderQty"])),
-            "raw_data": (lambda x: x),
-        }
+    @cached_property
+    def perp_futures_exchange_info_parser(self) -> ParserSpec:
+        return ParserSpec(
+            {
+                "active": (lambda x: x["status"] == "Trading"),
+                "is_spot": False,
+                "is_margin": False,
+                "is_futures": (lambda x: self.parse_is_futures(x["contractType"])),
+                "is_perp": (lambda x: self.parse_is_perpetual(x["contractType"])),
+                "is_linear": (lambda x: self.parse_is_linear(x["contractType"])),
+                "is_inverse": (lambda x: self.parse_is_inverse(x["contractType"])),
+                "symbol": (lambda x, base: self.parse_unified_symbol(base, x["quoteCoin"])),
+                "base": (lambda x, base: base),
+                "quote": (lambda x: str(x["quoteCoin"])),
+                "settle": (lambda x: str(x["settleCoin"])),
+                "multiplier": (lambda x: self.parse_multiplier(x["baseCoin"])),
+                "leverage": (lambda x: float(x["leverageFilter"]["maxLeverage"])),
+                "listing_time": (lambda x: int(x["launchTime"])),
+                "expiration_time": (lambda x: int(x["deliveryTime"])),
+                "contract_size": (lambda x: float(x["lotSizeFilter"]["qtyStep"])),
+                "tick_size": (lambda x: float(x["priceFilter"]["tickSize"])),
+                "min_order_size": (lambda x: float(x["lotSizeFilter"]["minOrderQty"])),
+                "max_order_size": (lambda x: float(x["lotSizeFilter"]["maxOrderQty"])),
+                "raw_data": self.parse_raw_info,
+            },
+            shared={"base": lambda x: self.parse_base_currency(x["baseCoin"])},
+        )
 
     def parse_exchange_info(self, response: dict, parser: dict) -> dict:
         response = self.check_response(response)
         datas = response["data"]
 
-        results = {}
-        for data in datas:
-            result = self.get_result_with_parser(data, parser)
+        results = ExchangeInfo()
+        for result in self.get_results_with_parser(datas, parser):
             id = self.parse_unified_id(result)
             results[id] = result
         return results
@@ -123,24 +134,24 @@ class BybitParser(Parser):
         data = response["data"][0]
         return self.parse_ticker(data, market_type, info, timestamp=response["timestamp"])
 
-    def parse_ticker(self, response: dict, market_type: str, info: dict, **kwargs) -> dict:
-        return {
-            "timestamp": self.parse_str(kwargs["timestamp"], int),
-            "instrument_id": self.parse_unified_id(info),
-            "open_time": None,
-            "close_time": self.parse_str(kwargs["timestamp"], int),
-            "open": self.parse_str(response["prevPrice24h"], float),
-            "high": self.parse_str(response["highPrice24h"], float),
-            "low": self.parse_str(response["lowPrice24h"], float),
-            "last": self.parse_str(response["lastPrice"], float),
-            "base_volume": self.parse_str(response["volume24h" if market_type != "inverse" else "turnover24h"], float),
-            "quote_volume": self.parse_str(response["turnover24h" if market_type != "inverse" else "volume24h"], float),
-            "price_change": (
+    def parse_ticker(self, response: dict, market_type: str, info: dict, **kwargs) -> Ticker:
+        return Ticker(
+            timestamp=self.parse_str(kwargs["timestamp"], int),
+            instrument_id=self.parse_unified_id(info),
+            open_time=None,
+            close_time=self.parse_str(kwargs["timestamp"], int),
+            open=self.parse_str(response["prevPrice24h"], float),
+            high=self.parse_str(response["highPrice24h"], float),
+            low=self.parse_str(response["lowPrice24h"], float),
+            last=self.parse_str(response["lastPrice"], float),
+            base_volume=self.parse_str(response["volume24h" if market_type != "inverse" else "turnover24h"], float),
+            quote_volume=self.parse_str(response["turnover24h" if market_type != "inverse" else "volume24h"], float),
+            price_change=(
                 self.parse_str(response["prevPrice24h"], float) - self.parse_str(response["lastPrice"], float)
             ),
-            "price_change_percent": self.parse_str(response["price24hPcnt"], float),
-            "raw_data": response,
-        }
+            price_change_percent=self.parse_str(response["price24hPcnt"], float),
+            raw_data=self.parse_raw_data(response),
+        )
 
     def get_interval(self, interval: str) -> str:
         if interval not in self.INTERVAL_MAP:
@@ -155,26 +166,43 @@ class BybitParser(Parser):
         instrument_id = self.parse_unified_id(info)
 
         results = [
-            {
-                "timestamp": self.parse_str(data[0], int),
-                "instrument_id": instrument_id,
-                "market_type": market,
-                "interval": interval,
-                "open": self.parse_str(data[1], float),
-                "high": self.parse_str(data[2], float),
-                "low": self.parse_str(data[3], float),
-                "close": self.parse_str(data[4], float),
-                "base_volume": self.parse_str(data[5], float),
-                "quote_volume": self.parse_str(data[6], float),
-                "contract_volume": (
+            Candle(
+                timestamp=self.parse_str(data[0], int),
+                instrument_id=instrument_id,
+                market_type=market,
+                interval=interval,
+                open=self.parse_str(data[1], float),
+                high=self.parse_str(data[2], float),
+                low=self.parse_str(data[3], float),
+                close=self.parse_str(data[4], float),
+                base_volume=self.parse_str(data[5], float),
+                quote_volume=self.parse_str(data[6], float),
+                contract_volume=(
                     self.parse_str(data[5], float) / (1 if market_type == "spot" else info["contract_size"])
                 ),
-                "raw_data": data,
-            }
+                raw_data=self.parse_raw_data(data),
+            )
             for data in datas
         ]
 
-        return results if len(results) > 1 else results[0]
+        return results if len(results) != 1 else results[0]
+
+    def parse_candle_frame(self, response: dict, info: dict, market_type: str, interval: str) -> CandleFrame:
+        response = self.check_response(response)
+        fields = {
+            "timestamp": 0,
+            "open": 1,
+            "high": 2,
+            "low": 3,
+            "close": 4,
+            "base_volume": 5,
+            "quote_volume": 6,
+            "contract_volume": 5,
+        }
+        frame = self.get_candle_frame(response["data"], fields, info, interval)
+        if market_type != "spot":
+            frame.columns["contract_volume"] /= info["contract_size"]
+        return frame
 
     def get_category(self, info: dict) -> str:
         if info["is_spot"] or info["is_margin"]:
@@ -196,14 +224,14 @@ class BybitParser(Parser):
         results = []
         for data in datas:
             results.append(
-                {
-                    "timestamp": self.parse_str(data["fundingRateTimestamp"], int),
-                    "instrument_id": instrument_id,
-                    "market_type": market_type,
-                    "funding_rate": self.parse_str(data["fundingRate"], float),
-                    "realized_rate": self.parse_str(data["fundingRate"], float),
-                    "raw_data": data,
-                }
+                FundingRate(
+                    timestamp=self.parse_str(data["fundingRateTimestamp"], int),
+                    instrument_id=instrument_id,
+                    market_type=market_type,
+                    funding_rate=self.parse_str(data["fundingRate"], float),
+                    realized_rate=self.parse_str(data["fundingRate"], float),
+                    raw_data=self.parse_raw_data(data),
+                )
             )
         return results
 
@@ -232,31 +260,19 @@ class BybitParser(Parser):
                     "timestamp": self.parse_str(datas["timestamp"], int),
                     "instrument_id": self.parse_unified_id(info),
                     "open_interest": self.parse_str(datas["openInterest"], float),
-                    "raw_data": datas,
+                    "raw_data": self.parse_raw_data(datas),
                 }
             )
         return results[0] if len(results) == 1 else results
 
-    def parse_orderbook(self, response: dict, info: dict) -> dict:
+    def parse_orderbook(
+        self, response: dict, info: dict, depth: int = None, as_array: bool = False
+    ) -> Union[dict, OrderBook]:
         response = self.check_response(response)
         datas = response["data"]
-
-        asks = datas["a"]
-        bids = datas["b"]
-
-        return {
-            "timestamp": self.parse_str(datas["ts"], int),
-            "instrument_id": self.parse_unified_id(info),
-            "asks": [
-                {"price": self.parse_str(ask[0], float), "volume": self.parse_str(ask[1], float), "order_number": None}
-                for ask in asks
-            ],
-            "bids": [
-                {"price": self.parse_str(bid[0], float), "volume": self.parse_str(bid[1], float), "order_number": None}
-                for bid in bids
-            ],
-            "raw_data": datas,
-        }
+        return self.build_orderbook(
+            datas, datas["a"], datas["b"], info, self.parse_str(datas["ts"], int), depth=depth, as_array=as_array
+        )
 
     def parse_last_price(self, response: dict, info: dict) -> dict:
         response = self.check_response(response)
@@ -269,7 +285,7 @@ class BybitParser(Parser):
             "instrument_id": instrument_id,
             "market_type": market_type,
             "last_price": self.parse_str(datas["lastPrice"], float),
-            "raw_data": datas,
+            "raw_data": self.parse_raw_data(datas),
         }
 
     def parse_index_price(self, response: dict, info: dict) -> dict:
@@ -283,7 +299,7 @@ class BybitParser(Parser):
             "instrument_id": instrument_id,
             "market_type": market_type,
             "index_price": self.parse_str(datas["indexPrice"], float),
-            "raw_data": datas,
+            "raw_data": self.parse_raw_data(datas),
         }
 
     def parse_mark_price(self, response: dict, info: dict) -> dict:
@@ -298,7 +314,7 @@ class BybitParser(Parser):
             "instrument_id": instrument_id,
             "market_type": market_type,
             "mark_price": self.parse_str(datas["markPrice"], float),
-            "raw_data": datas,
+            "raw_data": self.parse_raw_data(datas),
         }
 
     def parse_current_funding_rate(self, response: dict, info: dict) -> dict:
@@ -310,5 +326,5 @@ class BybitParser(Parser):
             "instrument_id": self.parse_unified_id(info),
             "market_type": self.parse_unified_market_type(info),
             "funding_rate": self.parse_str(data["fundingRate"], float),
-            "raw_data": data,
+            "raw_data": self.parse_raw_data(data),
         }
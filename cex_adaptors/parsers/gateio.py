@@ -1,4 +1,9 @@
-from .base import Parser
+from functools import cached_property
+
+from ..candles import CandleFrame
+from ..exchange_info import ExchangeInfo
+from ..records import Candle, FundingRate, Ticker
+from .base import Parser, ParserSpec
 
 
 class GateioParser(Parser):
@@ -23,88 +28,88 @@ class GateioParser(Parser):
     def check_response(response: dict):
         return {"code": 200, "status": "success", "data": response}
 
-    @property
-    def spot_exchange_info_parser(self) -> dict:
-        return {
-            "active": (lambda x: x["trade_status"] == "tradable"),
-            "is_spot": True,
-            "is_margin": False,
-            "is_futures": False,
-            "is_perp": False,
-            "is_linear": True,
-            "is_inverse": False,
-            "symbol": (lambda x: self.parse_unified_symbol(x["base"], x["quote"])),
-            "base": (lambda x: str(x["base"])),
-            "quote": (lambda x: str(x["quote"])),
-            "settle": (lambda x: str(x["quote"])),
-            "multiplier": 1,  # spot multiplier default 1
-            "leverage": 1,  # spot leverage default 1
-            "listing_time": (lambda x: min([int(x["sell_start"]), int(x["buy_start"])]) * 1000),
-            "expiration_time": None,  # spot not support this field
-            "contract_size": 1,  # spot contract size default 1
-            "tick_size": 1,
-            "min_order_size": (lambda x: float(x["min_quote_amount"]) if "min_quote_amount" in x else 0),
-            "max_order_size": (lambda x: float(x["max_quote_amount"]) if "max_quote_amount" in x else 0),
-            "raw_data": (lambda x: x),
-        }
+    @cached_property
+    def spot_exchange_info_parser(self) -> ParserSpec:
+        return ParserSpec(
+            {
+                "active": (lambda x: x["trade_status"] == "tradable"),
+                "is_spot": True,
+                "is_margin": False,
+                "is_futures": False,
+                "is_perp": False,
+                "is_linear": True,
+                "is_inverse": False,
+                "symbol": (lambda x: self.parse_unified_symbol(x["base"], x["quote"])),
+                "base": (lambda x: str(x["base"])),
+                "quote": (lambda x: str(x["quote"])),
+                "settle": (lambda x: str(x["quote"])),
+                "multiplier": 1,  # spot multiplier default 1
+                "leverage": 1,  # spot leverage default 1
+                "listing_time": (lambda x: min([int(x["sell_start"]), int(x["buy_start"])]) * 1000),
+                "expiration_time": None,  # spot not support this field
+                "contract_size": 1,  # spot contract size default 1
+                "tick_size": 1,
+                "min_order_size": (lambda x: float(x["min_quote_amount"]) if "min_quote_amount" in x else 0),
+                "max_order_size": (lambda x: float(x["max_quote_amount"]) if "max_quote_amount" in x else 0),
+                "raw_data": self.parse_raw_info,
+            }
+        )
 
-    @property
-    def perp_exchange_info_parser(self) -> dict:
-        return {
-            "active": True,
-            "is_spot": False,
-            "is_margin": False,
-            "is_futures": False,
-            "is_perp": True,
-            "is_linear": (lambda x: True if x["settle"] in self.STABLE_CURRENCY else False),
-            "is_inverse": (lambda x: False if x["settle"] in self.STABLE_CURRENCY else True),
-            "symbol": (
-                lambda x: self.parse_unified_symbol(
-                    self.parse_perp_name(x["name"])["base"], self.parse_perp_name(x["name"])["quote"]
-                )
-            ),
-            "base": (lambda x: self.parse_perp_name(x["name"])["base"]),
-            "quote": (lambda x: self.parse_perp_name(x["name"])["quote"]),
-            "settle": (lambda x: str(x["settle"])),
-            "multiplier": None,
-            "leverage": (lambda x: float(x["leverage_max"])),
-            "listing_time": None,
-            "expiration_time": None,
-            "contract_size": (lambda x: self.parse_str(x["quanto_multiplier"], float)),
-            "tick_size": None,
-            "min_order_size": None,
-            "max_order_size": None,
-            "raw_data": (lambda x: x),
-        }
+    @cached_property
+    def perp_exchange_info_parser(self) -> ParserSpec:
+        return ParserSpec(
+            {
+                "active": True,
+                "is_spot": False,
+                "is_margin": False,
+                "is_futures": False,
+                "is_perp": True,
+                "is_linear": (lambda x: True if x["settle"] in self.STABLE_CURRENCY else False),
+                "is_inverse": (lambda x: False if x["settle"] in self.STABLE_CURRENCY else True),
+                "symbol": (lambda x, name: self.parse_unified_symbol(name["base"], name["quote"])),
+                "base": (lambda x, name: name["base"]),
+                "quote": (lambda x, name: name["quote"]),
+                "settle": (lambda x: str(x["settle"])),
+                "multiplier": None,
+                "leverage": (lambda x: float(x["leverage_max"])),
+                "listing_time": None,
+                "expiration_time": None,
+                "contract_size": (lambda x: self.parse_str(x["quanto_multiplier"], float)),
+                "tick_size": None,
+                "min_order_size": None,
+                "max_order_size": None,
+                "raw_data": self.parse_raw_info,
+            },
+            shared={"name": lambda x: self.parse_perp_name(x["name"])},
+        )
 
-    @property
-    def futures_exchange_info_parser(self) -> dict:
-        return {
-            "active": (lambda x: not x["in_delisting"]),
-            "is_spot": False,
-            "is_margin": False,
-            "is_futures": True,
-            "is_perp": False,
-            "is_linear": (lambda x: True if x["settle"] in self.STABLE_CURRENCY else False),
-            "is_inverse": (lambda x: False if x["settle"] in self.STABLE_CURRENCY else True),
-            "symbol": (
-                lambda x: self.parse_unified_symbol(
-                    self.parse_futures_name(x["name"])["base"], self.parse_futures_name(x["name"])["quote"]
-                )
-            ),
-            "base": (lambda x: self.parse_base_currency(self.parse_futures_name(x["name"])["base"])),
-            "quote": (lambda x: self.parse_futures_name(x["name"])["quote"]),
-            "settle": (lambda x: str(x["settle"])),
-            "multiplier": (lambda x: self.parse_multiplier(self.parse_futures_name(x["name"])["base"])),
-            "leverage": 1,  # Not yet implemented
-            "listing_time": None,
-            "expiration_time": (lambda x: int(x["expire_time"]) * 1000),
-            "contract_size": (lambda x: self.parse_str(x["quanto_multiplier"], float)),
-            "tick_size": None,
-            "min_order_size": None,
-            "max_order_size": None,
-            "raw_data": (lambda x: x),
-        }
+    @cached_property
+    def futures_exchange_info_parser(self) -> ParserSpec:
+        return ParserSpec(
+            {
+                "active": (lambda x: not x["in_delisting"]),
+                "is_spot": False,
+                "is_margin": False,
+                "is_futures": True,
+                "is_perp": False,
+                "is_linear": (lambda x: True if x["settle"] in self.STABLE_CURRENCY else False),
+                "is_inverse": (lambda x: False if x["settle"] in self.STABLE_CURRENCY else True),
+                "symbol": (lambda x, name: self.parse_unified_symbol(name["base"], name["quote"])),
+                "base": (lambda x, name: self.parse_base_currency(name["base"])),
+                "quote": (lambda x, name: name["quote"]),
+                "settle": (lambda x: str(x["settle"])),
+                "multiplier": (lambda x, name: self.parse_multiplier(name["base"])),
+                "leverage": 1,  # Not yet implemented
+                "listing_time": None,
+                "expiration_time": (lambda x: int(x["expire_time"]) * 1000),
+                "contract_size": (lambda x: self.parse_str(x["quanto_multiplier"], float)),
+                "tick_size": None,
+                "min_order_size": None,
+                "max_order_size": None,
+                "raw_data": self.parse_raw_info,
+            },
+            shared={"name": lambda x: self.parse_futures_name(x["name"])},
+        )
 
     def parse_perp_name(self, name: str) -> dict:
         return {
@@ -123,22 +128,27 @@ class GateioParser(Parser):
         response = self.check_response(response)
         datas = response["data"]
 
-        results = {}
+        results = ExchangeInfo()
         for data in datas:
             data.update(kwargs)
-            result = self.get_result_with_parser(data, parser)
+        for result in self.get_results_with_parser(datas, parser):
             id = self.parse_unified_id(result)
             results[id] = result
         return results
 
     def get_id_map(self, exchange_info: dict, market_type: str) -> dict:
+        return ExchangeInfo.of(exchange_info).get_derived(
+            ("id_map", market_type), lambda infos: self._build_id_map(infos, market_type)
+        )
+
+    def _build_id_map(self, infos: ExchangeInfo, market_type: str) -> dict:
         raw_id = {
             "spot": "id",
             "futures": "name",
             "perp": "name",
         }
-        infos = self.query_dict(exchange_info, {f"is_{market_type}": True})
-        return {v["raw_data"][raw_id[market_type]]: k for k, v in infos.items()}
+        ids = infos.get_ids(market_type)
+        return {v["raw_data"][raw_id[market_type]]: k for k, v in infos.items() if k in ids}
 
     def parse_tickers(self, response: dict, exchange_info: dict, market_type: str) -> dict:
         response = self.check_response(response)
@@ -158,24 +168,22 @@ class GateioParser(Parser):
             results[instrument_id] = self.parse_ticker(data, market_type, exchange_info[instrument_id])
         return results
 
-    def parse_ticker(self, data: dict, market_type: str, info: dict) -> dict:
-        return {
-            "timestamp": self.get_timestamp(),
-            "instrument_id": self.parse_unified_id(info),
-            "open_time": None,
-            "close_time": self.get_timestamp(),
-            "open": None,
-            "high": self.parse_str(data["high_24h"], float),
-            "low": self.parse_str(data["low_24h"], float),
-            "last": self.parse_str(data["last"], float),
-            "base_volume": self.parse_str(data["base_volume" if market_type == "spot" else "volume_24h_base"], float),
-            "quote_volume": self.parse_str(
-                data["quote_volume" if market_type == "spot" else "volume_24h_quote"], float
-            ),
-            "price_change": None,
-            "price_change_percent": self.parse_str(data["change_percentage"], float) / 100,
-            "raw_data": data,
-        }
+    def parse_ticker(self, data: dict, market_type: str, info: dict) -> Ticker:
+        return Ticker(
+            timestamp=self.get_timestamp(),
+            instrument_id=self.parse_unified_id(info),
+            open_time=None,
+            close_time=self.get_timestamp(),
+            open=None,
+            high=self.parse_str(data["high_24h"], float),
+            low=self.parse_str(data["low_24h"], float),
+            last=self.parse_str(data["last"], float),
+            base_volume=self.parse_str(data["base_volume" if market_type == "spot" else "volume_24h_base"], float),
+            quote_volume=self.parse_str(data["quote_volume" if market_type == "spot" else "volume_24h_quote"], float),
+            price_change=None,
+            price_change_percent=self.parse_str(data["change_percentage"], float) / 100,
+            raw_data=self.parse_raw_data(data),
+        )
 
     def get_market_type(self, info: dict) -> str:
         if info["is_spot"]:
@@ -206,7 +214,7 @@ class GateioParser(Parser):
             "instrument_id": self.parse_unified_id(info),
             "market_type": self.parse_unified_market_type(info),
             "funding_rate": self.parse_str(data["funding_rate"], float),
-            "raw_data": data,
+            "raw_data": self.parse_raw_data(data),
         }
 
     def parse_history_funding_rate(self, response: dict, info: dict) -> list:
@@ -217,14 +225,14 @@ class GateioParser(Parser):
         market_type = self.parse_unified_market_type(info)
 
         return [
-            {
-                "timestamp": self.parse_str(data["t"], int) * 1000,
-                "instrument_id": instrument_id,
-                "market_type": market_type,
-                "funding_rate": self.parse_str(data["r"], float),
-                "realized_rate": self.parse_str(data["r"], float),
-                "raw_data": data,
-            }
+            FundingRate(
+                timestamp=self.parse_str(data["t"], int) * 1000,
+                instrument_id=instrument_id,
+                market_type=market_type,
+                funding_rate=self.parse_str(data["r"], float),
+                realized_rate=self.parse_str(data["r"], float),
+                raw_data=self.parse_raw_data(data),
+            )
             for data in datas
         ]
 
@@ -248,43 +256,67 @@ class GateioParser(Parser):
             result = method_map[market_type](data, info)
             result.update(udpate_)
             results.append(result)
-        return results if len(results) > 1 else results[0]
+        return results if len(results) != 1 else results[0]
 
-    def parse_spot_candlestick(self, data: list, info: dict) -> dict:
-        return {
-            "timestamp": self.parse_str(data[0], int) * 1000,
-            "open": self.parse_str(data[5], float),
-            "high": self.parse_str(data[3], float),
-            "low": self.parse_str(data[4], float),
-            "close": self.parse_str(data[2], float),
-            "base_volume": self.parse_str(data[6], float),
-            "quote_volume": self.parse_str(data[1], float),
-            "contract_volume": self.parse_str(data[6], float),
-            "raw_data": data,
-        }
+    def parse_candle_frame(self, response: dict, info: dict, market_type: str, interval: str) -> CandleFrame:
+        response = self.check_response(response)
+        if market_type == "spot":
+            fields = {
+                "timestamp": 0,
+                "open": 5,
+                "high": 3,
+                "low": 4,
+                "close": 2,
+                "base_volume": 6,
+                "quote_volume": 1,
+                "contract_volume": 6,
+            }
+        else:
+            fields = {"timestamp": "t", "open": "o", "high": "h", "low": "l", "close": "c", "contract_volume": "v"}
+            if market_type == "perp":
+                fields["quote_volume"] = "sum"
 
-    def parse_perp_candlestick(self, data: dict, info: dict) -> dict:
-        return {
-            "timestamp": self.parse_str(data["t"], int) * 1000,
-            "open": self.parse_str(data["o"], float),
-            "high": self.parse_str(data["h"], float),
-            "low": self.parse_str(data["l"], float),
-            "close": self.parse_str(data["c"], float),
-            "base_volume": self.parse_str(data["v"], float) * info["contract_size"],
-            "quote_volume": self.parse_str(data["sum"], float),
-            "contract_volume": self.parse_str(data["v"], float),
-            "raw_data": data,
-        }
+        frame = self.get_candle_frame(response["data"], fields, info, interval)
+        frame.columns["timestamp"] *= 1000
+        if market_type != "spot":
+            frame.columns["base_volume"] = frame.contract_volume * info["contract_size"]
+        return frame
 
-    def parse_futures_candlestick(self, data: dict, info: dict) -> dict:
-        return {
-            "timestamp": self.parse_str(data["t"], int) * 1000,
-            "open": self.parse_str(data["o"], float),
-            "high": self.parse_str(data["h"], float),
-            "low": self.parse_str(data["l"], float),
-            "close": self.parse_str(data["c"], float),
-            "base_volume": self.parse_str(data["v"], float) * info["contract_size"],
-            "quote_volume": None,
-            "contract_volume": self.parse_str(data["v"], float),
-            "raw_data": data,
-        }
+    def parse_spot_candlestick(self, data: list, info: dict) -> Candle:
+        return Candle(
+            timestamp=self.parse_str(data[0], int) * 1000,
+            open=self.parse_str(data[5], float),
+            high=self.parse_str(data[3], float),
+            low=self.parse_str(data[4], float),
+            close=self.parse_str(data[2], float),
+            base_volume=self.parse_str(data[6], float),
+            quote_volume=self.parse_str(data[1], float),
+            contract_volume=self.parse_str(data[6], float),
+            raw_data=self.parse_raw_data(data),
+        )
+
+    def parse_perp_candlestick(self, data: dict, info: dict) -> Candle:
+        return Candle(
+            timestamp=self.parse_str(data["t"], int) * 1000,
+            open=self.parse_str(data["o"], float),
+            high=self.parse_str(data["h"], float),
+            low=self.parse_str(data["l"], float),
+            close=self.parse_str(data["c"], float),
+            base_volume=self.parse_str(data["v"], float) * info["contract_size"],
+            quote_volume=self.parse_str(data["sum"], float),
+            contract_volume=self.parse_str(data["v"], float),
+            raw_data=self.parse_raw_data(data),
+        )
+
+    def parse_futures_candlestick(self, data: dict, info: dict) -> Candle:
+        return Candle(
+            timestamp=self.parse_str(data["t"], int) * 1000,
+            open=self.parse_str(data["o"], float),
+            high=self.parse_str(data["h"], float),
+            low=self.parse_str(data["l"], float),
+            close=self.parse_str(data["c"], float),
+            base_volume=self.parse_str(data["v"], float) * info["contract_size"],
+            quote_volume=None,
+            contract_volume=self.parse_str(data["v"], float),
+            raw_data=self.parse_raw_data(data),
+        )
@@ -1,5 +1,9 @@
-from ..utils import query_dict
-from .base import Parser
+from functools import cached_property
+
+from ..candles import CandleFrame
+from ..exchange_info import ExchangeInfo
+from ..records import Candle, FundingRate, Ticker
+from .base import Parser, ParserSpec
 
 
 class HtxParser(Parser):
@@ -64,107 +68,116 @@ class HtxParser(Parser):
         else:
             raise ValueError(f"Error when parsing HTX response: {response}")
 
-    @property
-    def spot_exchange_info_parser(self) -> dict:
-        return {
-            "active": (lambda x: x["state"] == "online"),
-            "is_spot": True,
-            "is_margin": False,
-            "is_futures": False,
-            "is_perp": False,
-            "is_linear": True,
-            "is_inverse": False,
-            "symbol": (lambda x: self.parse_unified_symbol(x["bcdn"], x["qcdn"])),
-            "base": (lambda x: self.parse_base_currency(x["bcdn"])),
-            "quote": (lambda x: str(x["qcdn"])),
-            "settle": (lambda x: str(x["qcdn"])),
-            "multiplier": 1,  # spot and margin default multiplier is 1
-            "leverage": (lambda x: float(x["lr"]) if x["lr"] else 1),  # spot and margin default leverage is 1
-            "listing_time": (lambda x: int(x["toa"])),
-            "expiration_time": None,  # spot not support this field
-            "contract_size": 1,
-            "tick_size": None,  # not yet implemented
-            "min_order_size": None,  # not yet implemented
-            "max_order_size": None,  # not yet implemented
-            "raw_data": (lambda x: x),
-        }
-
-    @property
-    def linear_exchange_info_parser(self) -> dict:
-        return {
-            "active": (lambda x: x["contract_status"] == 1),
-            "is_spot": False,
-            "is_margin": False,
-            "is_futures": (lambda x: self.parse_is_futures(x["business_type"])),
-            "is_perp": (lambda x: self.parse_is_perpetual(x["business_type"])),
-            "is_linear": True,
-            "is_inverse": False,
-            "symbol": (lambda x: self.parse_unified_symbol(self.parse_pair(x)["base"], self.parse_pair(x)["quote"])),
-            "base": (lambda x: self.parse_base_currency(self.parse_pair(x)["base"])),
-            "quote": (lambda x: self.parse_pair(x)["quote"]),
-            "settle": (lambda x: self.parse_pair(x)["quote"]),
-            "multiplier": 1,
-            "leverage": None,  # not yet implemented
-            "listing_time": (lambda x: self.parse_str_to_timestamp(x["create_date"]) if x["create_date"] else None),
-            "expiration_time": (
-                lambda x: self.parse_str_to_timestamp(x["delivery_date"]) if x["delivery_date"] else None
-            ),
-            "contract_size": (lambda x: float(x["contract_size"])),
-            "tick_size": (lambda x: float(x["price_tick"])),
-            "min_order_size": None,  # not yet implemented
-            "max_order_size": None,  # not yet implemented
-            "raw_data": (lambda x: x),
-        }
+    @cached_property
+    def spot_exchange_info_parser(self) -> ParserSpec:
+        return ParserSpec(
+            {
+                "active": (lambda x: x["state"] == "online"),
+                "is_spot": True,
+                "is_margin": False,
+                "is_futures": False,
+                "is_perp": False,
+                "is_linear": True,
+                "is_inverse": False,
+                "symbol": (lambda x: self.parse_unified_symbol(x["bcdn"], x["qcdn"])),
+                "base": (lambda x: self.parse_base_currency(x["bcdn"])),
+                "quote": (lambda x: str(x["qcdn"])),
+                "settle": (lambda x: str(x["qcdn"])),
+                "multiplier": 1,  # spot and margin default multiplier is 1
+                "leverage": (lambda x: float(x["lr"]) if x["lr"] else 1),  # spot and margin default leverage is 1
+                "listing_time": (lambda x: int(x["toa"])),
+                "expiration_time": None,  # spot not support this field
+                "contract_size": 1,
+                "tick_size": None,  # not yet implemented
+                "min_order_size": None,  # not yet implemented
+                "max_order_size": None,  # not yet implemented
+                "raw_data": self.parse_raw_info,
+            }
+        )
 
-    @property
-    def inverse_futures_exchange_info_parser(self):
-        return {
-            "active": (lambda x: x["contract_status"] == 1),
-            "is_spot": False,
-            "is_margin": False,
-            "is_futures": True,
-            "is_perp": False,
-            "is_linear": False,
-            "is_inverse": True,
-            "symbol": (lambda x: self.parse_unified_symbol(x["symbol"], "USD")),
-            "base": (lambda x: str(x["symbol"])),
-            "quote": "USD",
-            "settle": (lambda x: str(x["symbol"])),
-            "multiplier": 1,
-            "leverage": None,  # not yet implemented
-            "listing_time": (lambda x: self.parse_str_to_timestamp(x["create_date"]) if x["create_date"] else None),
-            "expiration_time": (lambda x: int(x["delivery_time"]) if x["delivery_time"] else None),
-            "contract_size": (lambda x: float(x["contract_size"])),
-            "tick_size": (lambda x: float(x["price_tick"])),
-            "min_order_size": None,  # not yet implemented
-            "max_order_size": None,  # not yet implemented
-            "raw_data": (lambda x: x),
-        }
+    @cached_property
+    def linear_exchange_info_parser(self) -> ParserSpec:
+        return ParserSpec(
+            {
+                "active": (lambda x: x["contract_status"] == 1),
+                "is_spot": False,
+                "is_margin": False,
+                "is_futures": (lambda x: self.parse_is_futures(x["business_type"])),
+                "is_perp": (lambda x: self.parse_is_perpetual(x["business_type"])),
+                "is_linear": True,
+                "is_inverse": False,
+                "symbol": (lambda x, pair: self.parse_unified_symbol(pair["base"], pair["quote"])),
+                "base": (lambda x, pair: self.parse_base_currency(pair["base"])),
+                "quote": (lambda x, pair: pair["quote"]),
+                "settle": (lambda x, pair: pair["quote"]),
+                "multiplier": 1,
+                "leverage": None,  # not yet implemented
+                "listing_time": (lambda x: self.parse_str_to_timestamp(x["create_date"]) if x["create_date"] else None),
+                "expiration_time": (
+                    lambda x: self.parse_str_to_timestamp(x["delivery_date"]) if x["delivery_date"] else None
+                ),
+                "contract_size": (lambda x: float(x["contract_size"])),
+                "tick_size": (lambda x: float(x["price_tick"])),
+                "min_order_size": None,  # not yet implemented
+                "max_order_size": None,  # not yet implemented
+                "raw_data": self.parse_raw_info,
+            },
+            shared={"pair": self.parse_pair},
+        )
+
+    @cached_property
+    def inverse_futures_exchange_info_parser(self) -> ParserSpec:
+        return ParserSpec(
+            {
+                "active": (lambda x: x["contract_status"] == 1),
+                "is_spot": False,
+                "is_margin": False,
+                "is_futures": True,
+                "is_perp": False,
+                "is_linear": False,
+                "is_inverse": True,
+                "symbol": (lambda x: self.parse_unified_symbol(x["symbol"], "USD")),
+                "base": (lambda x: str(x["symbol"])),
+                "quote": "USD",
+                "settle": (lambda x: str(x["symbol"])),
+                "multiplier": 1,
+                "leverage": None,  # not yet implemented
+                "listing_time": (lambda x: self.parse_str_to_timestamp(x["create_date"]) if x["create_date"] else None),
+                "expiration_time": (lambda x: int(x["delivery_time"]) if x["delivery_time"] else None),
+                "contract_size": (lambda x: float(x["contract_size"])),
+                "tick_size": (lambda x: float(x["price_tick"])),
+                "min_order_size": None,  # not yet implemented
+                "max_order_size": None,  # not yet implemented
+                "raw_data": self.parse_raw_info,
+            }
+        )
 
-    @property
-    def inverse_perp_exchange_info_parser(self):
-        return {
-            "active": (lambda x: x["contract_status"] == 1),
-            "is_spot": False,
-            "is_margin": False,
-            "is_futures": False,
-            "is_perp": True,
-            "is_linear": False,
-            "is_inverse": True,
-            "symbol": (lambda x: self.parse_unified_symbol(x["symbol"], "USD")),
-            "base": (lambda x: str(x["symbol"])),
-            "quote": "USD",
-            "settle": (lambda x: str(x["symbol"])),
-            "multiplier": 1,
-            "leverage": None,  # not yet implemented
-            "listing_time": (lambda x: self.parse_str_to_timestamp(x["create_date"]) if x["create_date"] else None),
-            "expiration_time": None,
-            "contract_size": (lambda x: float(x["contract_size"])),
-            "tick_size": (lambda x: float(x["price_tick"])),
-            "min_order_size": None,  # not yet implemented
-            "max_order_size": None,  # not yet implemented
-            "raw_data": (lambda x: x),
-        }
+    @cached_property
+    def inverse_perp_exchange_info_parser(self) -> ParserSpec:
+        return ParserSpec(
+            {
+                "active": (lambda x: x["contract_status"] == 1),
+                "is_spot": False,
+                "is_margin": False,
+                "is_futures": False,
+                "is_perp": True,
+                "is_linear": False,
+                "is_inverse": True,
+                "symbol": (lambda x: self.parse_unified_symbol(x["symbol"], "USD")),
+                "base": (lambda x: str(x["symbol"])),
+                "quote": "USD",
+                "settle": (lambda x: str(x["symbol"])),
+                "multiplier": 1,
+                "leverage": None,  # not yet implemented
+                "listing_time": (lambda x: self.parse_str_to_timestamp(x["create_date"]) if x["create_date"] else None),
+                "expiration_time": None,
+                "contract_size": (lambda x: float(x["contract_size"])),
+                "tick_size": (lambda x: float(x["price_tick"])),
+                "min_order_size": None,  # not yet implemented
+                "max_order_size": None,  # not yet implemented
+                "raw_data": self.parse_raw_info,
+            }
+        )
 
     @staticmethod
     def parse_pair(response: dict) -> dict:
@@ -183,15 +196,19 @@ class HtxParser(Parser):
     def parse_exchange_info(self, response: dict, parser: dict):
         response = self.check_htx_response(response)
 
-        results = {}
+        results = ExchangeInfo()
         datas = response["data"]
-        for data in datas:
-            result = self.get_result_with_parser(data, parser)
+        for result in self.get_results_with_parser(datas, parser):
             id = self.parse_unified_id(result)
             results[id] = result
         return results
 
     def get_htx_id_map(self, exchange_info: dict, market_type: str) -> dict:
+        return ExchangeInfo.of(exchange_info).get_derived(
+            ("id_map", market_type), lambda infos: self._build_id_map(infos, market_type)
+        )
+
+    def _build_id_map(self, infos: ExchangeInfo, market_type: str) -> dict:
         keys_map = {
             "spot": "sc",
             "linear": "contract_code",
@@ -199,15 +216,15 @@ class HtxParser(Parser):
             "inverse_futures": "symbol",
         }
         if market_type == "linear":
-            infos = query_dict(exchange_info, "(is_perp == True or is_futures == True) and is_linear == True")
+            ids = infos.get_ids(["perp", "futures"]) & infos.get_ids("linear")
         elif market_type == "inverse_perp":
-            infos = query_dict(exchange_info, "is_perp == True and is_inverse == True")
+            ids = infos.get_ids("perp") & infos.get_ids("inverse")
         elif market_type == "inverse_futures":
-            infos = query_dict(exchange_info, "is_futures == True and is_inverse == True")
-            return {self.parse_inverse_futures_symbol(v["raw_data"]): k for k, v in infos.items()}
+            ids = infos.get_ids("futures") & infos.get_ids("inverse")
+            return {self.parse_inverse_futures_symbol(v["raw_data"]): k for k, v in infos.items() if k in ids}
         else:
-            infos = self.query_dict(exchange_info, {f"is_{market_type}": True})
-        return {v["raw_data"][keys_map[market_type]]: k for k, v in infos.items()}
+            ids = infos.get_ids(market_type)
+        return {v["raw_data"][keys_map[market_type]]: k for k, v in infos.items() if k in ids}
 
     def parse_inverse_futures_symbol(self, datas: dict) -> str:
         contract_type_map = {
@@ -268,72 +285,72 @@ class HtxParser(Parser):
         return method_map[market_type](**params)
 
     def parse_spot_ticker(self, response: dict, info: dict, timestamp: str):
-        return {
-            "timestamp": self.parse_str(timestamp, int),
-            "instrument_id": self.parse_unified_id(info),
-            "open_time": None,
-            "close_time": None,
-            "open": self.parse_str(response["open"], float),
-            "high": self.parse_str(response["high"], float),
-            "low": self.parse_str(response["low"], float),
-            "last": self.parse_str(response["close"], float),
-            "base_volume": self.parse_str(response["amount"], float),
-            "quote_volume": self.parse_str(response["vol"], float),
-            "price_change": self.parse_str(response["close"], float) - self.parse_str(response["open"], float),
-            "price_change_percent": None,
-            "raw_data": response,
-        }
+        return Ticker(
+            timestamp=self.parse_str(timestamp, int),
+            instrument_id=self.parse_unified_id(info),
+            open_time=None,
+            close_time=None,
+            open=self.parse_str(response["open"], float),
+            high=self.parse_str(response["high"], float),
+            low=self.parse_str(response["low"], float),
+            last=self.parse_str(response["close"], float),
+            base_volume=self.parse_str(response["amount"], float),
+            quote_volume=self.parse_str(response["vol"], float),
+            price_change=self.parse_str(response["close"], float) - self.parse_str(response["open"], float),
+            price_change_percent=None,
+            raw_data=self.parse_raw_data(response),
+        )
 
     def parse_linear_ticker(self, response: dict, info: dict):
-        return {
-            "timestamp": self.parse_str(response["ts"], int),
-            "instrument_id": self.parse_unified_id(info),
-            "open_time": None,
-            "close_time": self.parse_str(response["ts"], int),
-            "open": self.parse_str(response["open"], float),
-            "high": self.parse_str(response["high"], float),
-            "low": self.parse_str(response["low"], float),
-            "last": self.parse_str(response["close"], float),
-            "base_volume": self.parse_str(response["amount"], float) * info["contract_size"],
-            "quote_volume": self.parse_str(response["vol"], float),
-            "price_change": self.parse_str(response["close"], float) - self.parse_str(response["open"], float),
-            "price_change_percent": None,
-            "raw_data": response,
-        }
+        return Ticker(
+            timestamp=self.parse_str(response["ts"], int),
+            instrument_id=self.parse_unified_id(info),
+            open_time=None,
+            close_time=self.parse_str(response["ts"], int),
+            open=self.parse_str(response["open"], float),
+            high=self.parse_str(response["high"], float),
+            low=self.parse_str(response["low"], float),
+            last=self.parse_str(response["close"], float),
+            base_volume=self.parse_str(response["amount"], float) * info["contract_size"],
+            quote_volume=self.parse_str(response["vol"], float),
+            price_change=self.parse_str(response["close"], float) - self.parse_str(response["open"], float),
+            price_change_percent=None,
+            raw_data=self.parse_raw_data(response),
+        )
 
     def parse_inverse_perp_ticker(self, response: dict, info: dict):
-        return {
-            "timestamp": self.parse_str(response["ts"], int),
-            "instrument_id": self.parse_unified_id(info),
-            "open_time": None,
-            "close_time": self.parse_str(response["ts"], int),
-            "open": self.parse_str(response["open"], float),
-            "high": self.parse_str(response["high"], float),
-            "low": self.parse_str(response["low"], float),
-            "last": self.parse_str(response["close"], float),
-            "base_volume": self.parse_str(response["amount"], float),
-            "quote_volume": self.parse_str(response["vol"], float),
-            "price_change": self.parse_str(response["close"], float) - self.parse_str(response["open"], float),
-            "price_change_percent": None,
-            "raw_data": response,
-        }
+        return Ticker(
+            timestamp=self.parse_str(response["ts"], int),
+            instrument_id=self.parse_unified_id(info),
+            open_time=None,
+            close_time=self.parse_str(response["ts"], int),
+            open=self.parse_str(response["open"], float),
+            high=self.parse_str(response["high"], float),
+            low=self.parse_str(response["low"], float),
+            last=self.parse_str(response["close"], float),
+            base_volume=self.parse_str(response["amount"], float),
+            quote_volume=self.parse_str(response["vol"], float),
+            price_change=self.parse_str(response["close"], float) - self.parse_str(response["open"], float),
+            price_change_percent=None,
+            raw_data=self.parse_raw_data(response),
+        )
 
     def parse_inverse_futures_ticker(self, response: dict, info: dict):
-        return {
-            "timestamp": self.parse_str(response["ts"], int),
-            "instrument_id": self.parse_unified_id(info),
-            "open_time": None,
-            "close_time": self.parse_str(response["ts"], int),
-            "open": self.parse_str(response["open"], float),
-            "high": self.parse_str(response["high"], float),
-            "low": self.parse_str(response["low"], float),
-            "last": self.parse_str(response["close"], float),
-            "base_volume": self.parse_str(response["amount"], float),
-            "quote_volume": self.parse_str(response["vol"], float),
-            "price_change": self.parse_str(response["close"], float) - self.parse_str(response["open"], float),
-            "price_change_percent": None,
-            "raw_data": response,
-        }
+        return Ticker(
+            timestamp=self.parse_str(response["ts"], int),
+            instrument_id=self.parse_unified_id(info),
+            open_time=None,
+            close_time=self.parse_str(response["ts"], int),
+            open=self.parse_str(response["open"], float),
+            high=self.parse_str(response["high"], float),
+            low=self.parse_str(response["low"], float),
+            last=self.parse_str(response["close"], float),
+            base_volume=self.parse_str(response["amount"], float),
+            quote_volume=self.parse_str(response["vol"], float),
+            price_change=self.parse_str(response["close"], float) - self.parse_str(response["open"], float),
+            price_change_percent=None,
+            raw_data=self.parse_raw_data(response),
+        )
 
     def get_market_type(self, info: dict) -> str:
         if info["is_spot"]:
@@ -363,7 +380,7 @@ class HtxParser(Parser):
             "instrument_id": self.parse_unified_id(info),
             "market_type": self.parse_unified_market_type(info),
             "funding_rate": self.parse_str(data["funding_rate"], float),
-            "raw_data": data,
+            "raw_data": self.parse_raw_data(data),
         }
 
     def parse_history_funding_rate(self, response: dict, info: dict) -> list:
@@ -374,14 +391,14 @@ class HtxParser(Parser):
         market_type = self.parse_unified_market_type(info)
 
         return [
-            {
-                "timestamp": self.parse_str(data["funding_time"], int),
-                "instrument_id": instrument_id,
-                "market_type": market_type,
-                "funding_rate": self.parse_str(data["funding_rate"], float),
-                "realized_rate": self.parse_str(data["realized_rate"], float),
-                "raw_data": data,
-            }
+            FundingRate(
+                timestamp=self.parse_str(data["funding_time"], int),
+                instrument_id=instrument_id,
+                market_type=market_type,
+                funding_rate=self.parse_str(data["funding_rate"], float),
+                realized_rate=self.parse_str(data["realized_rate"], float),
+                raw_data=self.parse_raw_data(data),
+            )
             for data in datas
         ]
 
@@ -444,24 +461,42 @@ class HtxParser(Parser):
             result.update(update_)
             results.append(result)
 
-        return results if len(results) > 1 else results[0]
-
-    def parse_candlestick(self, data: dict, info: dict, market_type: str) -> dict:
+        return results if len(results) != 1 else results[0]
 
-        return {
-            "timestamp": self.parse_str(data["id"], int) * 1000,
-            "open": self.parse_str(data["open"], float),
-            "high": self.parse_str(data["high"], float),
-            "low": self.parse_str(data["low"], float),
-            "close": self.parse_str(data["close"], float),
-            "base_volume": self.parse_str(data["amount"], float),
-            "quote_volume": (
+    def parse_candle_frame(self, response: dict, info: dict, market_type: str, interval: str) -> CandleFrame:
+        response = self.check_htx_response(response)
+        fields = {
+            "timestamp": "id",
+            "open": "open",
+            "high": "high",
+            "low": "low",
+            "close": "close",
+            "base_volume": "amount",
+            "quote_volume": "vol" if market_type != "linear" else "trade_turnover",
+            "contract_volume": "amount" if market_type == "spot" else "vol",
+        }
+        frame = self.get_candle_frame(response["data"], fields, info, interval)
+        frame.columns["timestamp"] *= 1000
+        if not info["is_linear"]:
+            frame.columns["quote_volume"] *= info["contract_size"]
+        return frame
+
+    def parse_candlestick(self, data: dict, info: dict, market_type: str) -> Candle:
+
+        return Candle(
+            timestamp=self.parse_str(data["id"], int) * 1000,
+            open=self.parse_str(data["open"], float),
+            high=self.parse_str(data["high"], float),
+            low=self.parse_str(data["low"], float),
+            close=self.parse_str(data["close"], float),
+            base_volume=self.parse_str(data["amount"], float),
+            quote_volume=(
                 self.parse_str(data["vol" if market_type != "linear" else "trade_turnover"], float)
                 * (1 if info["is_linear"] else info["contract_size"])
             ),
-            "contract_volume": self.parse_str(data["amount" if market_type == "spot" else "vol"], float),
-            "raw_data": data,
-        }
+            contract_volume=self.parse_str(data["amount" if market_type == "spot" else "vol"], float),
+            raw_data=self.parse_raw_data(data),
+        )
 
     def parse_index_price(self, response: dict, info: dict, market_type: str) -> dict:
         response = self.check_htx_response(response)
@@ -471,7 +506,7 @@ class HtxParser(Parser):
             "instrument_id": self.parse_unified_id(info),
             "market_type": self.parse_unified_market_type(info),
             "index_price": self.parse_str(data["index_price"], float),
-            "raw_data": data,
+            "raw_data": self.parse_raw_data(data),
         }
 
     def parse_mark_price(self, response: dict, info: dict, market_type: str) -> dict:
@@ -482,5 +517,5 @@ class HtxParser(Parser):
             "instrument_id": self.parse_unified_id(info),
             "market_type": self.parse_unified_market_type(info),
             "mark_price": self.parse_str(data["close"], float),
-            "raw_data": data,
+            "raw_data": self.parse_raw_data(data),
         }
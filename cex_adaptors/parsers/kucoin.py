@@ -1,5 +1,11 @@
-from ..utils import query_dict
-from .base import Parser
+from functools import cached_property
+from typing import Union
+
+from ..candles import CandleFrame
+from ..exchange_info import ExchangeInfo
+from ..orderbook import OrderBook
+from ..records import Candle, FundingRate, Ticker
+from .base import Parser, ParserSpec
 
 
 class KucoinParser(Parser):
@@ -44,73 +50,78 @@ class KucoinParser(Parser):
         base = base.replace("XBT", "BTC")
         return self.parse_base_currency(base)
 
-    @property
-    def spot_exchange_info_parser(self) -> dict:
-        return {
-            "active": (lambda x: x["enableTrading"]),
-            "is_spot": True,
-            "is_margin": (lambda x: x["isMarginEnabled"]),
-            "is_futures": False,
-            "is_perp": False,
-            "is_linear": True,
-            "is_inverse": False,
-            "symbol": (lambda x: self.parse_unified_symbol(x["baseCurrency"], x["quoteCurrency"])),
-            "base": (lambda x: self.parse_kucoin_base_currency(x["baseCurrency"])),
-            "quote": (lambda x: str(x["quoteCurrency"])),
-            "settle": (lambda x: str(x["quoteCurrency"])),
-            "multiplier": 1,  # spot multiplier default 1
-            "leverage": 1,  # spot leverage default 1
-            "listing_time": None,  # api not support this field
-            "expiration_time": None,  # spot not support this field
-            "contract_size": 1,  # spot contract size default 1
-            "tick_size": None,  # Not yet implemented
-            "min_order_size": None,  # Not yet implemented
-            "max_order_size": None,  # Not yet implemented
-            "raw_data": (lambda x: x),
-        }
+    @cached_property
+    def spot_exchange_info_parser(self) -> ParserSpec:
+        return ParserSpec(
+            {
+                "active": (lambda x: x["enableTrading"]),
+                "is_spot": True,
+                "is_margin": (lambda x: x["isMarginEnabled"]),
+                "is_futures": False,
+                "is_perp": False,
+                "is_linear": True,
+                "is_inverse": False,
+                "symbol": (lambda x: self.parse_unified_symbol(x["baseCurrency"], x["quoteCurrency"])),
+                "base": (lambda x: self.parse_kucoin_base_currency(x["baseCurrency"])),
+                "quote": (lambda x: str(x["quoteCurrency"])),
+                "settle": (lambda x: str(x["quoteCurrency"])),
+                "multiplier": 1,  # spot multiplier default 1
+                "leverage": 1,  # spot leverage default 1
+                "listing_time": None,  # api not support this field
+                "expiration_time": None,  # spot not support this field
+                "contract_size": 1,  # spot contract size default 1
+                "tick_size": None,  # Not yet implemented
+                "min_order_size": None,  # Not yet implemented
+                "max_order_size": None,  # Not yet implemented
+                "raw_data": self.parse_raw_info,
+            }
+        )
 
-    @property
-    def futures_exchange_info_parser(self) -> dict:
-        return {
-            "active": (lambda x: x["status"] == "Open"),
-            "is_spot": False,
-            "is_margin": False,
-            "is_futures": (lambda x: True if x["expireDate"] else False),
-            "is_perp": (lambda x: False if x["expireDate"] else True),
-            "is_linear": (lambda x: True),  # Not yet implemented
-            "is_inverse": (lambda x: False),  # Not yet implemented
-            "symbol": (lambda x: self.parse_unified_symbol(x["baseCurrency"], x["quoteCurrency"])),
-            "base": (lambda x: self.parse_kucoin_base_currency(x["baseCurrency"])),
-            "quote": (lambda x: str(x["quoteCurrency"])),
-            "settle": (lambda x: str(x["quoteCurrency"])),
-            "multiplier": (lambda x: self.parse_multiplier(x["baseCurrency"])),
-            "leverage": (lambda x: x["maxLeverage"]),
-            "listing_time": (lambda x: x["firstOpenDate"] if x["firstOpenDate"] else None),
-            "expiration_time": (lambda x: x["expireDate"] if x["expireDate"] else None),
-            "contract_size": (lambda x: abs(int(x["multiplier"]))),
-            "tick_size": None,  # Not yet implemented
-            "min_order_size": None,  # Not yet implemented
-            "max_order_size": None,  # Not yet implemented
-            "raw_data": (lambda x: x),
-        }
+    @cached_property
+    def futures_exchange_info_parser(self) -> ParserSpec:
+        return ParserSpec(
+            {
+                "active": (lambda x: x["status"] == "Open"),
+                "is_spot": False,
+                "is_margin": False,
+                "is_futures": (lambda x: True if x["expireDate"] else False),
+                "is_perp": (lambda x: False if x["expireDate"] else True),
+                "is_linear": (lambda x: True),  # Not yet implemented
+                "is_inverse": (lambda x: False),  # Not yet implemented
+                "symbol": (lambda x: self.parse_unified_symbol(x["baseCurrency"], x["quoteCurrency"])),
+                "base": (lambda x: self.parse_kucoin_base_currency(x["baseCurrency"])),
+                "quote": (lambda x: str(x["quoteCurrency"])),
+                "settle": (lambda x: str(x["quoteCurrency"])),
+                "multiplier": (lambda x: self.parse_multiplier(x["baseCurrency"])),
+                "leverage": (lambda x: x["maxLeverage"]),
+                "listing_time": (lambda x: x["firstOpenDate"] if x["firstOpenDate"] else None),
+                "expiration_time": (lambda x: x["expireDate"] if x["expireDate"] else None),
+                "contract_size": (lambda x: abs(int(x["multiplier"]))),
+                "tick_size": None,  # Not yet implemented
+                "min_order_size": None,  # Not yet implemented
+                "max_order_size": None,  # Not yet implemented
+                "raw_data": self.parse_raw_info,
+            }
+        )
 
     def parse_exchange_info(self, response: dict, parser: dict) -> dict:
         response = self.check_response(response)
 
         datas = response["data"]
-        results = {}
-        for data in datas:
-            result = self.get_result_with_parser(data, parser)
+        results = ExchangeInfo()
+        for result in self.get_results_with_parser(datas, parser):
             id = self.parse_unified_id(result)
             results[id] = result
         return results
 
     def get_id_map(self, infos: dict, market_type: str) -> dict:
-        if market_type == "derivative":
-            infos = query_dict(infos, f"is_futures == True or is_perp == True")
-        else:
-            infos = query_dict(infos, f"is_{market_type} == True")
-        return {v["raw_data"]["symbol"]: k for k, v in infos.items()}
+        return ExchangeInfo.of(infos).get_derived(
+            ("id_map", market_type), lambda infos: self._build_id_map(infos, market_type)
+        )
+
+    def _build_id_map(self, infos: ExchangeInfo, market_type: str) -> dict:
+        ids = infos.get_ids(["futures", "perp"] if market_type == "derivative" else market_type)
+        return {v["raw_data"]["symbol"]: k for k, v in infos.items() if k in ids}
 
     def parse_spot_tickers(self, response: dict, infos: dict) -> dict:
         response = self.check_response(response)
@@ -174,7 +185,7 @@ class KucoinParser(Parser):
         else:
             return self.parse_derivative_ticker(data, info)
 
-    def parse_spot_ticker(self, response: dict, info: dict) -> dict:
+    def parse_spot_ticker(self, response: dict, info: dict) -> Ticker:
         data = response
 
         last = self.parse_str(data["last"], float)
@@ -183,44 +194,44 @@ class KucoinParser(Parser):
 
         timestamp = self.parse_str(data["time"], int) if "time" in data else self.get_timestamp()
 
-        return {
-            "timestamp": timestamp,
-            "instrument_id": self.parse_unified_id(info),
-            "open_time": None,
-            "close_time": timestamp,
-            "open": open,
-            "high": self.parse_str(data["high"], float),
-            "low": self.parse_str(data["low"], float),
-            "last": last,
-            "base_volume": None,  # not yet implemented
-            "quote_volume": self.parse_str(data["volValue"], float),
-            "price_change": change_price,
-            "price_change_percent": self.parse_str(data["changeRate"], float),
-            "raw_data": response,
-        }
+        return Ticker(
+            timestamp=timestamp,
+            instrument_id=self.parse_unified_id(info),
+            open_time=None,
+            close_time=timestamp,
+            open=open,
+            high=self.parse_str(data["high"], float),
+            low=self.parse_str(data["low"], float),
+            last=last,
+            base_volume=None,  # not yet implemented
+            quote_volume=self.parse_str(data["volValue"], float),
+            price_change=change_price,
+            price_change_percent=self.parse_str(data["changeRate"], float),
+            raw_data=self.parse_raw_data(response),
+        )
 
-    def parse_derivative_ticker(self, response: dict, info: dict) -> dict:
+    def parse_derivative_ticker(self, response: dict, info: dict) -> Ticker:
         data = response
 
         last = self.parse_str(data["lastTradePrice"], float)
         change_price = self.parse_str(data["priceChg"], float)
         open = last - change_price
 
-        return {
-            "timestamp": self.get_timestamp(),
-            "instrument_id": self.parse_unified_id(info),
-            "open_time": None,
-            "close_time": self.get_timestamp(),
-            "open": open,
-            "high": self.parse_str(data["highPrice"], float),
-            "low": self.parse_str(data["lowPrice"], float),
-            "last": last,
-            "base_volume": self.parse_str(data["volumeOf24h"], float),
-            "quote_volume": self.parse_str(data["turnoverOf24h"], float),
-            "price_change": change_price,
-            "price_change_percent": self.parse_str(data["priceChgPct"], float),
-            "raw_data": response,
-        }
+        return Ticker(
+            timestamp=self.get_timestamp(),
+            instrument_id=self.parse_unified_id(info),
+            open_time=None,
+            close_time=self.get_timestamp(),
+            open=open,
+            high=self.parse_str(data["highPrice"], float),
+            low=self.parse_str(data["lowPrice"], float),
+            last=last,
+            base_volume=self.parse_str(data["volumeOf24h"], float),
+            quote_volume=self.parse_str(data["turnoverOf24h"], float),
+            price_change=change_price,
+            price_change_percent=self.parse_str(data["priceChgPct"], float),
+            raw_data=self.parse_raw_data(response),
+        )
 
     def parse_mark_price(self, response: dict, info: dict) -> dict:
         response = self.check_response(response)
@@ -231,7 +242,7 @@ class KucoinParser(Parser):
             "instrument_id": self.parse_unified_id(info),
             "market_type": self.parse_unified_market_type(info),
             "mark_price": self.parse_str(data["value"], float),
-            "raw_data": data,
+            "raw_data": self.parse_raw_data(data),
         }
 
     def parse_index_price(
@@ -247,34 +258,17 @@ class KucoinParser(Parser):
             "instrument_id": self.parse_unified_id(info),
             "market_type": self.parse_unified_market_type(info),
             "index_price": self.parse_str(data["indexPrice"], float),
-            "raw_data": data,
+            "raw_data": self.parse_raw_data(data),
         }
 
-    def parse_orderbook(self, response: dict, info: dict, market_type: str) -> dict:
+    def parse_orderbook(
+        self, response: dict, info: dict, market_type: str, depth: int = None, as_array: bool = False
+    ) -> Union[dict, OrderBook]:
         response = self.check_response(response)
         data = response["data"]
-
-        return {
-            "timestamp": self.parse_str(data["ts"], int),
-            "instrument_id": self.parse_unified_id(info),
-            "bids": [
-                {
-                    "price": self.parse_str(bid[0], float),
-                    "volume": self.parse_str(bid[1], float),
-                    "order_number": None,
-                }
-                for bid in data["bids"]
-            ],
-            "asks": [
-                {
-                    "price": self.parse_str(ask[0], float),
-                    "volume": self.parse_str(ask[1], float),
-                    "order_number": None,
-                }
-                for ask in data["asks"]
-            ],
-            "raw_data": data,
-        }
+        # spot books are stamped with "time", futures books with "ts"
+        timestamp = self.parse_str(data["time"] if "time" in data else data["ts"], int)
+        return self.build_orderbook(data, data["asks"], data["bids"], info, timestamp, depth=depth, as_array=as_array)
 
     def parse_current_funding_rate(self, response: dict, info: dict) -> dict:
         response = self.check_response(response)
@@ -285,7 +279,7 @@ class KucoinParser(Parser):
             "instrument_id": self.parse_unified_id(info),
             "market_type": self.parse_unified_market_type(info),
             "funding_rate": self.parse_str(data["value"], float),
-            "raw_data": data,
+            "raw_data": self.parse_raw_data(data),
         }
 
     def parse_history_funding_rate(self, response: dict, info: dict) -> list:
@@ -296,14 +290,14 @@ class KucoinParser(Parser):
         market_type = self.parse_unified_market_type(info)
 
         results = [
-            {
-                "timestamp": self.parse_str(data["timepoint"], int),
-                "instrument_id": instrument_id,
-                "market_type": market_type,
-                "funding_rate": self.parse_str(data["fundingRate"], float),
-                "realized_rate": self.parse_str(data["fundingRate"], float),
-                "raw_data": data,
-            }
+            FundingRate(
+                timestamp=self.parse_str(data["timepoint"], int),
+                instrument_id=instrument_id,
+                market_type=market_type,
+                funding_rate=self.parse_str(data["fundingRate"], float),
+                realized_rate=self.parse_str(data["fundingRate"], float),
+                raw_data=self.parse_raw_data(data),
+            )
             for data in datas
         ]
 
@@ -341,15 +335,28 @@ class KucoinParser(Parser):
 
         return results
 
-    def parse_candlestick(self, data: dict, info: dict, market_type) -> dict:
-        return {
-            "timestamp": self.parse_str(data[0], int) * (1000 if len(str(data[0])) == 10 else 1),
-            "open": self.parse_str(data[1], float),
-            "high": self.parse_str(data[3], float),
-            "low": self.parse_str(data[4], float),
-            "close": self.parse_str(data[2], float),
-            "base_volume": self.parse_str(data[5], float) if market_type == "spot" else None,
-            "quote_volume": self.parse_str(data[6 if market_type == "spot" else 5], float),
-            "contract_volume": self.parse_str(data[5], float) if market_type == "spot" else None,
-            "raw_data": data,
-        }
+    def parse_candle_frame(self, response: dict, info: dict, market_type: str, interval: str) -> CandleFrame:
+        response = self.check_response(response)
+        fields = {"timestamp": 0, "open": 1, "high": 3, "low": 4, "close": 2, "quote_volume": 6}
+        if market_type == "spot":
+            fields.update({"base_volume": 5, "contract_volume": 5})
+        else:
+            fields["quote_volume"] = 5
+
+        frame = self.get_candle_frame(response["data"], fields, info, interval)
+        # spot timestamps are in seconds
+        frame.columns["timestamp"][frame.timestamp < 10**10] *= 1000
+        return frame
+
+    def parse_candlestick(self, data: dict, info: dict, market_type) -> Candle:
+        return Candle(
+            timestamp=self.parse_str(data[0], int) * (1000 if len(str(data[0])) == 10 else 1),
+            open=self.parse_str(data[1], float),
+            high=self.parse_str(data[3], float),
+            low=self.parse_str(data[4], float),
+            close=self.parse_str(data[2], float),
+            base_volume=self.parse_str(data[5], float) if market_type == "spot" else None,
+            quote_volume=self.parse_str(data[6 if market_type == "spot" else 5], float),
+            contract_volume=self.parse_str(data[5], float) if market_type == "spot" else None,
+            raw_data=self.parse_raw_data(data),
+        )
@@ -1,4 +1,11 @@
-from .base import Parser
+from functools import cached_property
+from typing import Union
+
+from ..candles import CandleFrame
+from ..exchange_info import ExchangeInfo
+from ..orderbook import OrderBook
+from ..records import Candle, FundingRate, Ticker
+from .base import Parser, ParserSpec
 
 
 class OkxParser(Parser):
@@ -45,65 +52,70 @@ class OkxParser(Parser):
                 symbol = f"{data['settleCcy']}/{data['ctValCcy']}"
         return symbol
 
-    @property
-    def spot_margin_exchange_info_parser(self):
-        return {
-            "active": (lambda x: x["state"] == "live"),
-            "is_spot": (lambda x: self.parse_is_spot(x["instType"])),
-            "is_margin": (lambda x: self.parse_is_margin(x["instType"])),
-            "is_futures": False,
-            "is_perp": False,
-            "is_linear": True,
-            "is_inverse": False,
-            "symbol": (lambda x: self._parse_symbol(x)),
-            "base": (lambda x: self.parse_base_currency(x["baseCcy"])),
-            "quote": (lambda x: str(x["quoteCcy"])),
-            "settle": (lambda x: str(x["quoteCcy"])),
-            "multiplier": 1,  # spot and margin default multiplier is 1
-            "leverage": (lambda x: self._parse_leverage(x["lever"])),
-            "listing_time": (lambda x: int(x["listTime"])),
-            "expiration_time": None,  # spot not support this field
-            "contract_size": 1,
-            "tick_size": (lambda x: float(x["tickSz"])),
-            "min_order_size": (lambda x: float(x["minSz"])),
-            "max_order_size": (lambda x: float(x["maxMktSz"])),
-            "raw_data": (lambda x: x),
-        }
-
-    @property
-    def futures_perp_exchange_info_parser(self):
-        return {
-            "active": (lambda x: x["state"] == "live"),
-            "is_spot": False,
-            "is_margin": False,
-            "is_futures": (lambda x: self.parse_is_futures(x["instType"])),
-            "is_perp": (lambda x: self.parse_is_perpetual(x["instType"])),
-            "is_linear": (lambda x: self.parse_is_linear(x["ctType"])),
-            "is_inverse": (lambda x: self.parse_is_inverse(x["ctType"])),
-            "symbol": (lambda x: self._parse_symbol(x)),
-            "base": (lambda x: self.parse_base_currency(x["ctValCcy"] if x["ctType"] == "linear" else x["settleCcy"])),
-            "quote": (lambda x: str(x["settleCcy"] if x["ctType"] == "linear" else x["ctValCcy"])),
-            "settle": (lambda x: str(x["settleCcy"])),
-            "multiplier": (lambda x: self.parse_multiplier(x["ctMult"])),
-            "leverage": (lambda x: self._parse_leverage(x["lever"])),
-            "listing_time": (lambda x: int(x["listTime"])),
-            "expiration_time": (lambda x: int(x["expTime"]) if x["expTime"] else None),
-            "contract_size": (
-                lambda x: float(x["ctVal"])
-            ),  # linear will be how many base ccy and inverse will be how many quote ccy
-            "tick_size": (lambda x: float(x["tickSz"])),
-            "min_order_size": (lambda x: float(x["minSz"])),
-            "max_order_size": (lambda x: float(x["maxMktSz"])),
-            "raw_data": (lambda x: x),
-        }
+    @cached_property
+    def spot_margin_exchange_info_parser(self) -> ParserSpec:
+        return ParserSpec(
+            {
+                "active": (lambda x: x["state"] == "live"),
+                "is_spot": (lambda x: self.parse_is_spot(x["instType"])),
+                "is_margin": (lambda x: self.parse_is_margin(x["instType"])),
+                "is_futures": False,
+                "is_perp": False,
+                "is_linear": True,
+                "is_inverse": False,
+                "symbol": (lambda x: self._parse_symbol(x)),
+                "base": (lambda x: self.parse_base_currency(x["baseCcy"])),
+                "quote": (lambda x: str(x["quoteCcy"])),
+                "settle": (lambda x: str(x["quoteCcy"])),
+                "multiplier": 1,  # spot and margin default multiplier is 1
+                "leverage": (lambda x: self._parse_leverage(x["lever"])),
+                "listing_time": (lambda x: int(x["listTime"])),
+                "expiration_time": None,  # spot not support this field
+                "contract_size": 1,
+                "tick_size": (lambda x: float(x["tickSz"])),
+                "min_order_size": (lambda x: float(x["minSz"])),
+                "max_order_size": (lambda x: float(x["maxMktSz"])),
+                "raw_data": self.parse_raw_info,
+            }
+        )
+
+    @cached_property
+    def futures_perp_exchange_info_parser(self) -> ParserSpec:
+        return ParserSpec(
+            {
+                "active": (lambda x: x["state"] == "live"),
+                "is_spot": False,
+                "is_margin": False,
+                "is_futures": (lambda x: self.parse_is_futures(x["instType"])),
+                "is_perp": (lambda x: self.parse_is_perpetual(x["instType"])),
+                "is_linear": (lambda x: self.parse_is_linear(x["ctType"])),
+                "is_inverse": (lambda x: self.parse_is_inverse(x["ctType"])),
+                "symbol": (lambda x: self._parse_symbol(x)),
+                "base": (
+                    lambda x: self.parse_base_currency(x["ctValCcy"] if x["ctType"] == "linear" else x["settleCcy"])
+                ),
+                "quote": (lambda x: str(x["settleCcy"] if x["ctType"] == "linear" else x["ctValCcy"])),
+                "settle": (lambda x: str(x["settleCcy"])),
+                "multiplier": (lambda x: self.parse_multiplier(x["ctMult"])),
+                "leverage": (lambda x: self._parse_leverage(x["lever"])),
+                "listing_time": (lambda x: int(x["listTime"])),
+                "expiration_time": (lambda x: int(x["expTime"]) if x["expTime"] else None),
+                "contract_size": (
+                    lambda x: float(x["ctVal"])
+                ),  # linear will be how many base ccy and inverse will be how many quote ccy
+                "tick_size": (lambda x: float(x["tickSz"])),
+                "min_order_size": (lambda x: float(x["minSz"])),
+                "max_order_size": (lambda x: float(x["maxMktSz"])),
+                "raw_data": self.parse_raw_info,
+            }
+        )
 
     def parse_exchange_info(self, response: dict, parser: dict) -> dict:
         response = self.check_response(response)
 
         datas = response["data"]
-        results = {}
-        for data in datas:
-            result = self.get_result_with_parser(data, parser)
+        results = ExchangeInfo()
+        for result in self.get_results_with_parser(datas, parser):
             id = self.parse_unified_id(result)
             results[id] = result
         return results
@@ -132,7 +144,7 @@ class OkxParser(Parser):
                 spots[instrument_id] = spot
         return spots
 
-    def parse_ticker(self, response: any, market_type: str, info: dict) -> dict:
+    def parse_ticker(self, response: any, market_type: str, info: dict) -> Ticker:
         if "data" in response:
             response = response["data"][0]
 
@@ -143,26 +155,30 @@ class OkxParser(Parser):
             base_volume = float(response["volCcy24h"])
             quote_volume = float(response["volCcy24h"]) * (float(response["last"]) + float(response["open24h"])) / 2
 
-        return {
-            "timestamp": self.parse_str(response["ts"], int),
-            "instrument_id": self.parse_unified_id(info),
-            "open_time": None,
-            "close_time": self.parse_str(response["ts"], int),
-            "open": self.parse_str(response["open24h"], float),
-            "high": self.parse_str(response["high24h"], float),
-            "low": self.parse_str(response["low24h"], float),
-            "last": self.parse_str(response["last"], float),
-            "base_volume": base_volume,
-            "quote_volume": quote_volume,
-            "price_change": None,
-            "price_change_percent": None,
-            "raw_data": response,
-        }
+        return Ticker(
+            timestamp=self.parse_str(response["ts"], int),
+            instrument_id=self.parse_unified_id(info),
+            open_time=None,
+            close_time=self.parse_str(response["ts"], int),
+            open=self.parse_str(response["open24h"], float),
+            high=self.parse_str(response["high24h"], float),
+            low=self.parse_str(response["low24h"], float),
+            last=self.parse_str(response["last"], float),
+            base_volume=base_volume,
+            quote_volume=quote_volume,
+            price_change=None,
+            price_change_percent=None,
+            raw_data=self.parse_raw_data(response),
+        )
 
     def get_id_map(self, infos: dict, market_type: str = None) -> dict:
-        if market_type:
-            infos = self.query_dict(infos, {f"is_{market_type}": True})
-        return {v["raw_data"]["instId"]: k for k, v in infos.items()}
+        return ExchangeInfo.of(infos).get_derived(
+            ("id_map", market_type), lambda infos: self._build_id_map(infos, market_type)
+        )
+
+    def _build_id_map(self, infos: ExchangeInfo, market_type: str) -> dict:
+        ids = infos.get_ids(market_type)
+        return {v["raw_data"]["instId"]: k for k, v in infos.items() if k in ids}
 
     def parse_tickers(self, response: dict, market_type: str, infos: dict) -> dict:
         response = self.check_response(response)
@@ -183,14 +199,14 @@ class OkxParser(Parser):
         results = []
         for data in datas:
             results.append(
-                {
-                    "timestamp": self.parse_str(data["fundingTime"], int),
-                    "instrument_id": self.parse_unified_id(info),
-                    "market_type": self.parse_unified_market_type(info),
-                    "funding_rate": self.parse_str(data["fundingRate"], float),
-                    "realized_rate": self.parse_str(data["realizedRate"], float),
-                    "raw_data": data,
-                }
+                FundingRate(
+                    timestamp=self.parse_str(data["fundingTime"], int),
+                    instrument_id=self.parse_unified_id(info),
+                    market_type=self.parse_unified_market_type(info),
+                    funding_rate=self.parse_str(data["fundingRate"], float),
+                    realized_rate=self.parse_str(data["realizedRate"], float),
+                    raw_data=self.parse_raw_data(data),
+                )
             )
         return results
 
@@ -203,7 +219,7 @@ class OkxParser(Parser):
             "instrument_id": self.parse_unified_id(info),
             "market_type": self._market_type_map[data["instType"]],
             "funding_rate": self.parse_str(data["fundingRate"], float),
-            "raw_data": data,
+            "raw_data": self.parse_raw_data(data),
         }
 
     def parse_balance(self, response: dict) -> dict:
@@ -216,7 +232,7 @@ class OkxParser(Parser):
             results[currency] = {
                 "balance": float(data["cashBal"]),
                 "available_balance": float(data["availBal"]),
-                "raw_data": data,
+                "raw_data": self.parse_raw_data(data),
             }
         return results
 
@@ -240,7 +256,7 @@ class OkxParser(Parser):
             "main_account_id": data["mainUid"],
             "key_name": data["label"],
             "permission": data["perm"].split(","),
-            "raw_data": data,
+            "raw_data": self.parse_raw_data(data),
         }
 
     def get_interval(self, interval: str) -> str:
@@ -267,7 +283,7 @@ class OkxParser(Parser):
             "order_id": str(data["ordId"]),
             "order_type": data["ordType"],
             "status": data["state"],
-            "raw_data": data,
+            "raw_data": self.parse_raw_data(data),
         }
 
     def parse_cancel_order(self, response: dict) -> dict:
@@ -275,7 +291,7 @@ class OkxParser(Parser):
         data = response["data"][0]
         return {
             "order_id": str(data["ordId"]),
-            "raw_data": data,
+            "raw_data": self.parse_raw_data(data),
         }
 
     def parse_opened_orders(self, response: dict, infos: dict) -> list:
@@ -298,7 +314,7 @@ class OkxParser(Parser):
                     "order_id": str(data["ordId"]),
                     "order_type": data["ordType"],
                     "status": data["state"],
-                    "raw_data": data,
+                    "raw_data": self.parse_raw_data(data),
                 }
             )
         return results
@@ -326,7 +342,7 @@ class OkxParser(Parser):
                     "order_type": data["ordType"],
                     "order_id": str(data["ordId"]),
                     "status": data["state"],
-                    "raw_data": data,
+                    "raw_data": self.parse_raw_data(data),
                 }
             )
         return results
@@ -339,7 +355,7 @@ class OkxParser(Parser):
             "instrument_id": self.parse_unified_id(info),
             "market_type": self.parse_unified_market_type(info),
             "last_price": self.parse_str(data["last"], float),
-            "raw_data": data,
+            "raw_data": self.parse_raw_data(data),
         }
 
     def parse_index_price(self, response: dict, info: dict) -> dict:
@@ -350,7 +366,7 @@ class OkxParser(Parser):
             "instrument_id": self.parse_unified_id(info),
             "market_type": self.parse_unified_market_type(info),
             "index_price": self.parse_str(data["idxPx"], float),
-            "raw_data": data,
+            "raw_data": self.parse_raw_data(data),
         }
 
     def parse_mark_price(self, response: dict, info: dict) -> dict:
@@ -361,7 +377,7 @@ class OkxParser(Parser):
             "instrument_id": self.parse_unified_id(info),
             "market_type": self.parse_unified_market_type(info),
             "mark_price": self.parse_str(data["markPx"], float),
-            "raw_data": data,
+            "raw_data": self.parse_raw_data(data),
         }
 
     def parse_open_interest(self, response: dict, infos: dict) -> any:
@@ -379,39 +395,27 @@ class OkxParser(Parser):
                     "market_type": self._market_type_map[data["instType"]],
                     "oi_contract": self.parse_str(data["oi"], float),
                     "oi_currency": self.parse_str(data["oiCcy"], float),
-                    "raw_data": data,
+                    "raw_data": self.parse_raw_data(data),
                 }
             )
 
         return results[0] if len(results) == 1 else results
 
-    def parse_orderbook(self, response: dict, info: dict) -> dict:
+    def parse_orderbook(
+        self, response: dict, info: dict, depth: int = None, as_array: bool = False
+    ) -> Union[dict, OrderBook]:
         response = self.check_response(response)
         datas = response["data"][0]
-
-        asks = datas["asks"]
-        bids = datas["bids"]
-        return {
-            "timestamp": self.parse_str(datas["ts"], int),
-            "instrument_id": self.parse_unified_id(info),
-            "asks": [
-                {
-                    "price": self.parse_str(ask[0], float),
-                    "volume": self.parse_str(ask[1], float),
-                    "order_number": self.parse_str(ask[3], int),
-                }
-                for ask in asks
-            ],
-            "bids": [
-                {
-                    "price": self.parse_str(bid[0], float),
-                    "volume": self.parse_str(bid[1], float),
-                    "order_number": self.parse_str(bid[3], int),
-                }
-                for bid in bids
-            ],
-            "raw_data": datas,
-        }
+        return self.build_orderbook(
+            datas,
+            datas["asks"],
+            datas["bids"],
+            info,
+            self.parse_str(datas["ts"], int),
+            depth=depth,
+            as_array=as_array,
+            order_number=3,
+        )
 
     def parse_candlesticks(self, response: dict, info: dict, interval: str) -> any:
         def parse_volumes(data: list, market_type: str) -> dict:
@@ -431,20 +435,34 @@ class OkxParser(Parser):
         for data in datas:
             volumes = parse_volumes(data, market_type)
             results.append(
-                {
-                    "timestamp": self.parse_str(data[0], int),
-                    "instrument_id": instrument_id,
-                    "market_type": market_type,
-                    "interval": interval,
-                    "open": self.parse_str(data[1], float),
-                    "high": self.parse_str(data[2], float),
-                    "low": self.parse_str(data[3], float),
-                    "close": self.parse_str(data[4], float),
-                    "base_volume": volumes["base_volume"],
-                    "quote_volume": volumes["quote_volume"],
-                    "contract_volume": volumes["contract_volume"],
-                    "raw_data": data,
-                }
+                Candle(
+                    timestamp=self.parse_str(data[0], int),
+                    instrument_id=instrument_id,
+                    market_type=market_type,
+                    interval=interval,
+                    open=self.parse_str(data[1], float),
+                    high=self.parse_str(data[2], float),
+                    low=self.parse_str(data[3], float),
+                    close=self.parse_str(data[4], float),
+                    base_volume=volumes["base_volume"],
+                    quote_volume=volumes["quote_volume"],
+                    contract_volume=volumes["contract_volume"],
+                    raw_data=self.parse_raw_data(data),
+                )
             )
 
-        return results if len(results) > 1 else results[0]
+        return results if len(results) != 1 else results[0]
+
+    def parse_candle_frame(self, response: dict, info: dict, interval: str) -> CandleFrame:
+        response = self.check_response(response)
+        fields = {
+            "timestamp": 0,
+            "open": 1,
+            "high": 2,
+            "low": 3,
+            "close": 4,
+            "base_volume": 5 if info["is_spot"] else 6,
+            "quote_volume": 7,
+            "contract_volume": 5,
+        }
+        return self.get_candle_frame(response["data"], fields, info, interval)
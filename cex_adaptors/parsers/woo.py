@@ -46,7 +46,7 @@ class WOOParser(Parser):
                 "tick_size": self.parse_str(data["quote_tick"], float),
                 "min_order_size": self.parse_str(data["quote_max"], float),
                 "max_order_size": self.parse_str(data["quote_min"], float),
-                "raw_data": data,
+                "raw_data": self.parse_raw_info(data),
             }
             instrument_id = self.parse_unified_id(result)
             results[instrument_id] = result
@@ -0,0 +1,60 @@
+import tracemalloc
+from contextlib import contextmanager
+
+# allocations made by the profiler itself or by imports are left out of the report
+IGNORED_FILES = [tracemalloc.__file__, "<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>"]
+
+
+class AllocationReport(object):
+    """
+    Allocations made inside a `profile_allocations` block, filled in when the block exits.
+    :param limit: number of allocation sites kept
+    """
+
+    def __init__(self, limit: int = 10):
+        self.limit = limit
+        # allocation sites sorted by the memory they still hold at the end of the block, as tracemalloc.StatisticDiff
+        self.stats = []
+        # memory still held at the end of the block and the most held at once during it, in bytes
+        self.size = 0
+        self.peak = 0
+
+    def __repr__(self) -> str:
+        return f"AllocationReport(size={self.size}, peak={self.peak}, sites={len(self.stats)})"
+
+    def __str__(self) -> str:
+        lines = [f"held {self.size / 1024:.1f} KiB at exit, peak {self.peak / 1024:.1f} KiB"]
+        lines.extend(str(stat) for stat in self.stats)
+        return "\n".join(lines)
+
+
+@contextmanager
+def profile_allocations(limit: int = 10, key_type: str = "lineno", frames: int = 1):
+    """
+    Trace the Python allocations made inside the block and report the sites holding the most memory at its end, e.g.
+    `with profile_allocations() as report: await exchange.sync_exchange_info()` then `print(report)`.
+    Tracing slows every allocation down, so it only runs inside the block, unless it was already started elsewhere.
+    :param limit: number of allocation sites reported
+    :param key_type: how allocations are grouped, "lineno", "filename" or "traceback"
+    :param frames: frames kept per allocation, more than 1 is only useful with "traceback"
+    """
+    report = AllocationReport(limit)
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start(frames)
+
+    filters = [tracemalloc.Filter(False, filename) for filename in IGNORED_FILES]
+    before = tracemalloc.take_snapshot().filter_traces(filters)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    try:
+        yield report
+    finally:
+        after = tracemalloc.take_snapshot().filter_traces(filters)
+        current, peak = tracemalloc.get_traced_memory()
+        if started:
+            tracemalloc.stop()
+
+        report.stats = after.compare_to(before, key_type)[:limit]
+        report.size = current - size
+        report.peak = peak - size
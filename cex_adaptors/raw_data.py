@@ -0,0 +1,129 @@
+import contextvars
+import json
+from contextlib import contextmanager
+
+from .exchanges.decoder import get_default_decoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+RAW_DATA_POLICIES = ["full", "none", "lazy"]
+
+_default_policy = "full"
+_policy = contextvars.ContextVar("raw_data_policy", default=None)
+
+
+def check_raw_data_policy(policy):
+    """
+    :param policy: "full" keeps the exchange's data as is, "none" drops it, "lazy" keeps it as JSON bytes decoded on
+        access, and a list of field names keeps only those fields of dict data
+    """
+    if isinstance(policy, str):
+        if policy not in RAW_DATA_POLICIES:
+            raise ValueError(
+                f"Invalid raw_data policy: {policy}, expected one of {RAW_DATA_POLICIES} or a list of fields"
+            )
+        return policy
+    return frozenset(policy)
+
+
+def set_raw_data_policy(policy) -> None:
+    """
+    Choose how every parser keeps `raw_data`, see `check_raw_data_policy`
+    """
+    global _default_policy
+    _default_policy = check_raw_data_policy(policy)
+
+
+def get_raw_data_policy():
+    policy = _policy.get()
+    return _default_policy if policy is None else policy
+
+
+@contextmanager
+def raw_data_policy(policy):
+    """
+    Use `policy` for everything parsed inside the block, including tasks started from it, e.g.
+    `with raw_data_policy("none"): tickers = await exchange.get_tickers()`
+    """
+    token = _policy.set(check_raw_data_policy(policy))
+    try:
+        yield
+    finally:
+        _policy.reset(token)
+
+
+def encode(data) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+class LazyRawData(object):
+    """
+    Raw data kept as compact JSON bytes and decoded on every access, so it costs a fraction of the decoded objects
+    while it is not used.
+    :param data: JSON bytes
+    :param fields: values available without decoding
+    """
+
+    __slots__ = ("data", "fields")
+
+    def __init__(self, data: bytes, fields: dict = None):
+        self.data = data
+        self.fields = fields or {}
+
+    def decode(self):
+        return get_default_decoder()(self.data)
+
+    def __getitem__(self, key):
+        if key in self.fields:
+            return self.fields[key]
+        return self.decode()[key]
+
+    def get(self, key, default=None):
+        if key in self.fields:
+            return self.fields[key]
+        return self.decode().get(key, default)
+
+    def __contains__(self, key) -> bool:
+        return key in self.decode()
+
+    def __iter__(self):
+        return iter(self.decode())
+
+    def __len__(self) -> int:
+        return len(self.decode())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, LazyRawData):
+            other = other.decode()
+        return self.decode() == other
+
+    def __reduce__(self):
+        return self.__class__, (self.data, self.fields)
+
+    def __repr__(self) -> str:
+        return f"LazyRawData({self.data[:60]!r}{'...' if len(self.data) > 60 else ''})"
+
+
+def apply_raw_data_policy(data, keep: list = None):
+    """
+    Raw data as kept under the current policy
+    :param keep: fields kept whatever the policy, e.g. the exchange symbols the adaptors look instruments up by
+    """
+    policy = get_raw_data_policy()
+    if policy == "full":
+        return data
+
+    is_dict = isinstance(data, dict)
+    if policy == "lazy":
+        fields = {key: data[key] for key in keep if key in data} if keep and is_dict else None
+        return LazyRawData(encode(data), fields)
+
+    fields = set(keep or []) | (set() if policy == "none" else policy)
+    if not fields or not is_dict:
+        return None
+    return {key: value for key, value in data.items() if key in fields}
@@ -0,0 +1,183 @@
+import sys
+from collections.abc import MutableMapping
+
+
+def intern(value):
+    return sys.intern(value) if value.__class__ is str else value
+
+
+class Record(MutableMapping):
+    """
+    Parsed row stored in slots instead of a dict, a fraction of the memory of the dict it replaces.
+    Records behave like the dicts the parsers used to return: `record["last"]`, `record.get("last")`, iteration over
+    the field names, `update` and comparison with dicts all work, while `record.last` is faster to read.
+    Fields cannot be added or removed, use `to_dict` to get a plain dict, e.g. for JSON serialization.
+    Instrument ids, market types and intervals are interned so millions of records share a few strings.
+    """
+
+    __slots__ = ()
+    FIELDS = ()
+
+    def __getitem__(self, key: str):
+        if key in self.FIELDS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value) -> None:
+        if key not in self.FIELDS:
+            raise KeyError(f"{self.__class__.__name__} has no field {key}")
+        setattr(self, key, intern(value))
+
+    def __delitem__(self, key: str) -> None:
+        raise TypeError(f"{self.__class__.__name__} fields cannot be removed")
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self) -> int:
+        return len(self.FIELDS)
+
+    def __contains__(self, key) -> bool:
+        return key in self.FIELDS
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.to_dict()})"
+
+    def __getstate__(self) -> tuple:
+        return tuple(getattr(self, field) for field in self.FIELDS)
+
+    def __setstate__(self, state: tuple) -> None:
+        for field, value in zip(self.FIELDS, state):
+            setattr(self, field, value)
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def copy(self) -> "Record":
+        return self.__class__(**self.to_dict())
+
+
+class Ticker(Record):
+    FIELDS = (
+        "timestamp",
+        "instrument_id",
+        "open_time",
+        "close_time",
+        "open",
+        "high",
+        "low",
+        "last",
+        "base_volume",
+        "quote_volume",
+        "price_change",
+        "price_change_percent",
+        "raw_data",
+    )
+    __slots__ = FIELDS
+
+    def __init__(
+        self,
+        timestamp: int = None,
+        instrument_id: str = None,
+        open_time: int = None,
+        close_time: int = None,
+        open: float = None,
+        high: float = None,
+        low: float = None,
+        last: float = None,
+        base_volume: float = None,
+        quote_volume: float = None,
+        price_change: float = None,
+        price_change_percent: float = None,
+        raw_data=None,
+    ):
+        self.timestamp = timestamp
+        self.instrument_id = intern(instrument_id)
+        self.open_time = open_time
+        self.close_time = close_time
+        self.open = open
+        self.high = high
+        self.low = low
+        self.last = last
+        self.base_volume = base_volume
+        self.quote_volume = quote_volume
+        self.price_change = price_change
+        self.price_change_percent = price_change_percent
+        self.raw_data = raw_data
+
+
+class Candle(Record):
+    FIELDS = (
+        "timestamp",
+        "instrument_id",
+        "market_type",
+        "interval",
+        "open",
+        "high",
+        "low",
+        "close",
+        "base_volume",
+        "quote_volume",
+        "contract_volume",
+        "raw_data",
+    )
+    __slots__ = FIELDS
+
+    def __init__(
+        self,
+        timestamp: int = None,
+        instrument_id: str = None,
+        market_type: str = None,
+        interval: str = None,
+        open: float = None,
+        high: float = None,
+        low: float = None,
+        close: float = None,
+        base_volume: float = None,
+        quote_volume: float = None,
+        contract_volume: float = None,
+        raw_data=None,
+    ):
+        self.timestamp = timestamp
+        self.instrument_id = intern(instrument_id)
+        self.market_type = intern(market_type)
+        self.interval = intern(interval)
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.base_volume = base_volume
+        self.quote_volume = quote_volume
+        self.contract_volume = contract_volume
+        self.raw_data = raw_data
+
+
+class FundingRate(Record):
+    FIELDS = ("timestamp", "instrument_id", "market_type", "funding_rate", "realized_rate", "raw_data")
+    __slots__ = FIELDS
+
+    def __init__(
+        self,
+        timestamp: int = None,
+        instrument_id: str = None,
+        market_type: str = None,
+        funding_rate: float = None,
+        realized_rate: float = None,
+        raw_data=None,
+    ):
+        self.timestamp = timestamp
+        self.instrument_id = intern(instrument_id)
+        self.market_type = intern(market_type)
+        self.funding_rate = funding_rate
+        self.realized_rate = realized_rate
+        self.raw_data = raw_data
+
+
+class OrderBookLevel(Record):
+    FIELDS = ("price", "volume", "order_number")
+    __slots__ = FIELDS
+
+    def __init__(self, price: float = None, volume: float = None, order_number: int = None):
+        self.price = price
+        self.volume = volume
+        self.order_number = order_number
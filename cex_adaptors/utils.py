@@ -1,4 +1,8 @@
-import pandas as pd
+import asyncio
+from bisect import bisect_left
+
+# sub-market requests of one facade call running at the same time
+FANOUT_LIMIT = 8
 
 
 def query_dict(dictionary: dict, query: str, query_env: dict = None) -> dict:
@@ -12,6 +16,9 @@ def query_dict(dictionary: dict, query: str, query_env: dict = None) -> dict:
     if not query:
         return dictionary
 
+    # pandas takes longer to import than the rest of the package, only queries pay for it
+    import pandas as pd
+
     df = pd.DataFrame(dictionary).T
 
     if query_env:
@@ -36,3 +43,44 @@ def nested_query_dict(dictionary: dict, key: str, query: str) -> dict:
 
     queried_dict = query_dict(new_dict, query)
     return {key: dictionary[key] for key in queried_dict.keys()}
+
+
+def get_depth_limit(depth: int, tiers) -> int:
+    """
+    Smallest order book depth an endpoint serves that covers `depth` levels
+    :param depth: levels wanted per side
+    :param tiers: depths the endpoint accepts in ascending order, e.g. `range(1, 401)` for any depth up to 400
+    :return: the tier, or None if `depth` is not given or deeper than every tier
+    """
+    if not depth:
+        return None
+    index = bisect_left(tiers, depth)
+    return tiers[index] if index < len(tiers) else None
+
+
+async def gather_bounded(*aws, limit: int = FANOUT_LIMIT) -> list:
+    """
+    Run awaitables concurrently, at most `limit` at a time
+    If one fails the others are cancelled before its error is raised, so no request outlives the call
+    :param aws: coroutines or futures
+    :param limit: maximum number of awaitables running at once
+    :return: results in the order of `aws`
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def _run(aw):
+        try:
+            async with semaphore:
+                return await aw
+        finally:
+            # coroutines cancelled before their turn were never started
+            if asyncio.iscoroutine(aw):
+                aw.close()
+
+    tasks = [asyncio.ensure_future(_run(aw)) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
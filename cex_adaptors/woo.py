@@ -1,10 +1,16 @@
+import aiohttp
+
+from .exchanges.cache import ResponseCache
+from .exchanges.retry import RetryPolicy
 from .exchanges.woo import WOOUnified
 from .parsers.woo import WOOParser
 
 
 class WOO(WOOUnified, WOOParser):
-    def __init__(self):
-        super().__init__()
+    def __init__(
+        self, session: aiohttp.ClientSession = None, retry_policy: RetryPolicy = None, cache: ResponseCache = None
+    ):
+        super().__init__(session=session, retry_policy=retry_policy, cache=cache)
         self.exchange_info = {}
 
     async def sync_exchange_info(self):
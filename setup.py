@@ -11,6 +11,7 @@ setup(
     version="1.0.7",
     packages=find_packages(),
     install_requires=load_requirements(),
+    extras_require={"orjson": ["orjson"], "msgspec": ["msgspec"]},
     long_description=open("README.md").read(),
     long_description_content_type="text/markdown",
 )
@@ -0,0 +1,48 @@
+import unittest
+
+import numpy as np
+
+from cex_adaptors.candles import CandleFrame
+from cex_adaptors.parsers.binance import BinanceParser
+
+INFO = {
+    "is_spot": True,
+    "is_margin": False,
+    "is_futures": False,
+    "is_perp": False,
+    "base": "BTC",
+    "quote": "USDT",
+    "settle": "USDT",
+    "multiplier": 1,
+}
+
+
+def make_klines(timestamps: list) -> list:
+    return [[t, "1.0", "2.0", "0.5", "1.5", "10.0", t + 59999, "15.0", 7, "5.0", "7.5", "0"] for t in timestamps]
+
+
+class TestCandleFrame(unittest.TestCase):
+    def setUp(self):
+        self.parser = BinanceParser()
+
+    def test_matches_dict_candlesticks(self):
+        klines = make_klines([60000 * i for i in range(5)])
+        frame = self.parser.parse_candle_frame(klines, INFO, "spot", "1m")
+        self.assertEqual(frame.timestamp.dtype, np.int64)
+        self.assertEqual(frame.close.dtype, np.float64)
+
+        records = [
+            {key: value for key, value in record.items() if key != "raw_data"}
+            for record in self.parser.parse_candlesticks(klines, INFO, "spot", "1m")
+        ]
+        self.assertEqual(frame.to_records(), records)
+
+    def test_to_pandas_shares_memory(self):
+        frame = self.parser.parse_candle_frame(make_klines([0, 60000]), INFO, "spot", "1m")
+        df = frame.to_pandas()
+        self.assertTrue(all(np.shares_memory(df[name].to_numpy(), frame[name]) for name in CandleFrame.COLUMNS))
+        self.assertEqual(df.attrs["instrument_id"], "BTC/USDT:USDT")
+
+
+if __name__ == "__main__":
+    unittest.main()
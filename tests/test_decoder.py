@@ -0,0 +1,53 @@
+import json
+import unittest
+from unittest import mock
+
+from cex_adaptors.exchanges import decoder
+from cex_adaptors.exchanges.decoder import (
+    DECODERS,
+    get_decoder,
+    get_default_decoder,
+    set_default_decoder,
+)
+
+PAYLOAD = {
+    "code": "0",
+    "data": [
+        {"instId": "BTC-USDT", "last": "67000.1", "ts": 1700000000000, "ratio": 0.125, "open": None, "live": True},
+        {"instId": "ÄÖ-USDT", "tags": ["新币", "☃"], "nested": {"depth": [[1.5, 2], [1e-8, 3e20]]}},
+    ],
+}
+
+
+class TestDecoders(unittest.TestCase):
+    def test_backends_agree(self):
+        body = json.dumps(PAYLOAD, ensure_ascii=False).encode()
+        for name, backend in DECODERS.items():
+            with self.subTest(backend=name):
+                self.assertEqual(backend(body), PAYLOAD)
+                with self.assertRaises(backend.errors):
+                    backend(b'{"code": "0", "data": [')
+
+    def test_auto_selection(self):
+        installed = [name for name in ["orjson", "msgspec", "json"] if name in DECODERS]
+        self.assertEqual(get_decoder("auto").name, installed[0])
+        with self.assertRaises(ValueError):
+            get_decoder("simdjson")
+
+        # without the optional backends the standard library is used
+        with mock.patch.dict(DECODERS, {"json": DECODERS["json"]}, clear=True):
+            self.assertEqual(get_decoder("auto").name, "json")
+            with self.assertRaises(ValueError):
+                get_decoder("orjson")
+
+    def test_set_default_decoder(self):
+        default = get_default_decoder()
+        try:
+            self.assertEqual(set_default_decoder("json").name, "json")
+            self.assertIs(get_default_decoder(), DECODERS["json"])
+        finally:
+            decoder._default_decoder = default
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,303 @@
+import asyncio
+import os
+import pickle
+import tempfile
+import unittest
+from unittest import IsolatedAsyncioTestCase
+
+from cex_adaptors.exchange_info import ExchangeInfo
+from cex_adaptors.exchange_info_cache import (
+    load_exchange_info,
+    save_exchange_info,
+    sync_cached_exchange_info,
+)
+from cex_adaptors.exchange_info_refresher import (
+    ExchangeInfoMixin,
+    ExchangeInfoRefresher,
+)
+from cex_adaptors.parsers.base import ParserSpec
+from cex_adaptors.parsers.binance import BinanceParser
+from cex_adaptors.raw_data import raw_data_policy
+from cex_adaptors.utils import query_dict
+
+
+def make_info(base: str, quote: str, settle: str, market_type: str, symbol: str, linear: bool = True) -> dict:
+    return {
+        "active": True,
+        "is_spot": market_type == "spot",
+        "is_margin": False,
+        "is_futures": market_type == "futures",
+        "is_perp": market_type == "perp",
+        "is_linear": linear,
+        "is_inverse": not linear,
+        "base": base,
+        "quote": quote,
+        "settle": settle,
+        "raw_data": {"symbol": symbol},
+    }
+
+
+INFOS = {
+    "BTC/USDT:USDT": make_info("BTC", "USDT", "USDT", "spot", "BTCUSDT"),
+    "ETH/USDT:USDT": make_info("ETH", "USDT", "USDT", "spot", "ETHUSDT"),
+    "BTC/USDT:USDT-PERP": make_info("BTC", "USDT", "USDT", "perp", "BTCUSDT"),
+    "BTC/USD:BTC-PERP": make_info("BTC", "USD", "BTC", "perp", "BTCUSD_PERP", linear=False),
+    "BTC/USD:BTC-240628": make_info("BTC", "USD", "BTC", "futures", "BTCUSD_240628", linear=False),
+}
+
+
+class TestExchangeInfo(unittest.TestCase):
+    def setUp(self):
+        self.info = ExchangeInfo(INFOS)
+
+    def test_filters_match_query_dict(self):
+        for market_type in ExchangeInfo.MARKET_TYPES:
+            expected = query_dict(INFOS, f"is_{market_type} == True")
+            self.assertEqual(self.info.filter(market_type), expected)
+
+    def test_set_based_lookups(self):
+        self.assertEqual(
+            self.info.get_ids(["perp", "futures"]) & self.info.get_ids("inverse"),
+            {"BTC/USD:BTC-PERP", "BTC/USD:BTC-240628"},
+        )
+        self.assertEqual(self.info.get_ids("spot", base="ETH"), {"ETH/USDT:USDT"})
+        self.assertEqual(self.info.get_ids(settle="BTC", quote="USD"), {"BTC/USD:BTC-PERP", "BTC/USD:BTC-240628"})
+        self.assertEqual(self.info.get_ids_by_raw_symbol("BTCUSDT"), {"BTC/USDT:USDT", "BTC/USDT:USDT-PERP"})
+        self.assertEqual(self.info.get_ids_by_raw_symbol("BTCUSDT", "perp"), {"BTC/USDT:USDT-PERP"})
+
+    def test_indexes_follow_changes(self):
+        version = self.info.version
+        del self.info["ETH/USDT:USDT"]
+        self.info["SOL/USDT:USDT"] = make_info("SOL", "USDT", "USDT", "spot", "SOLUSDT")
+        self.assertEqual(self.info.get_ids("spot"), {"BTC/USDT:USDT", "SOL/USDT:USDT"})
+        self.assertEqual(self.info.get_ids(base="ETH"), set())
+        self.assertGreater(self.info.version, version)
+
+    def test_apply_delta(self):
+        infos = dict(INFOS)
+        del infos["BTC/USD:BTC-240628"]
+        infos["ETH/USDT:USDT"] = dict(infos["ETH/USDT:USDT"], active=False)
+        infos["ETH/USDT:USDT-PERP"] = make_info("ETH", "USDT", "USDT", "perp", "ETHUSDT")
+        live = self.info
+
+        delta = self.info.apply(infos)
+        self.assertEqual(list(delta.added), ["ETH/USDT:USDT-PERP"])
+        self.assertEqual(list(delta.removed), ["BTC/USD:BTC-240628"])
+        self.assertEqual(list(delta.changed), ["ETH/USDT:USDT"])
+        self.assertIs(self.info, live)
+        self.assertEqual(dict(self.info), infos)
+        self.assertEqual(self.info.get_ids("futures"), set())
+        self.assertEqual(self.info.get_ids_by_raw_symbol("ETHUSDT"), {"ETH/USDT:USDT", "ETH/USDT:USDT-PERP"})
+        self.assertFalse(self.info.apply(infos))
+
+    def test_merge_keeps_indexes(self):
+        spot = ExchangeInfo({k: v for k, v in INFOS.items() if v["is_spot"]})
+        derivatives = ExchangeInfo({k: v for k, v in INFOS.items() if not v["is_spot"]})
+        merged = ExchangeInfo.merge(spot, derivatives)
+        self.assertEqual(merged, self.info)
+        for market_type in ExchangeInfo.MARKET_TYPES:
+            self.assertEqual(merged.get_ids(market_type), self.info.get_ids(market_type))
+        self.assertEqual(merged.get_ids(settle="BTC"), self.info.get_ids(settle="BTC"))
+        self.assertEqual(merged.get_ids_by_raw_symbol("BTCUSDT"), self.info.get_ids_by_raw_symbol("BTCUSDT"))
+        # the parts are not modified through the merged indexes
+        merged["SOL/USDT:USDT"] = make_info("SOL", "USDT", "USDT", "spot", "SOLUSDT")
+        self.assertEqual(len(spot.get_ids("spot")), 2)
+
+        # later parts win on duplicate ids
+        inactive = {"ETH/USDT:USDT": dict(INFOS["ETH/USDT:USDT"], active=False)}
+        self.assertFalse(ExchangeInfo.merge(spot, inactive)["ETH/USDT:USDT"]["active"])
+        self.assertIs(ExchangeInfo.of(merged), merged)
+
+    def test_pickle_rebuilds_indexes(self):
+        info = pickle.loads(pickle.dumps(self.info))
+        self.assertEqual(info, self.info)
+        self.assertEqual(info.get_ids("perp"), self.info.get_ids("perp"))
+
+    def test_parser_id_map(self):
+        self.assertEqual(
+            BinanceParser().get_id_map(self.info, "perp"),
+            {"BTCUSDT": "BTC/USDT:USDT-PERP", "BTCUSD_PERP": "BTC/USD:BTC-PERP"},
+        )
+
+    def test_id_map_rebuilt_only_on_change(self):
+        parser = BinanceParser()
+        id_map = parser.get_id_map(self.info, "spot")
+        self.assertIs(parser.get_id_map(self.info, "spot"), id_map)
+
+        self.info["SOL/USDT:USDT"] = make_info("SOL", "USDT", "USDT", "spot", "SOLUSDT")
+        self.assertIsNot(parser.get_id_map(self.info, "spot"), id_map)
+        self.assertEqual(parser.get_id_map(self.info, "spot")["SOLUSDT"], "SOL/USDT:USDT")
+
+
+class FakeExchange(object):
+    name = "binance"
+
+    def __init__(self):
+        self.exchange_info = ExchangeInfo()
+        self.downloads = 0
+
+    async def get_exchange_info(self) -> dict:
+        self.downloads += 1
+        return INFOS
+
+
+class FakeClient(object):
+    closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeAdaptor(ExchangeInfoMixin, FakeExchange, FakeClient):
+    pass
+
+
+class TestExchangeInfoCache(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = self.directory.name
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_validation(self):
+        self.assertEqual(load_exchange_info(self.path, "binance"), (None, None))
+        save_exchange_info(self.path, "binance", ExchangeInfo(INFOS))
+        infos, state = load_exchange_info(self.path, "binance")
+        self.assertEqual((dict(infos), state), (INFOS, "fresh"))
+        self.assertEqual(infos.get_ids("perp", settle="BTC"), {"BTC/USD:BTC-PERP"})
+        self.assertEqual(load_exchange_info(self.path, "binance", ttl=0)[1], "stale")
+        self.assertEqual(load_exchange_info(self.path, "okx"), (None, None))
+
+        with open(os.path.join(self.path, "binance.exchange_info"), "r+b") as f:
+            f.truncate(100)
+        self.assertEqual(load_exchange_info(self.path, "binance"), (None, None))
+
+    async def test_sync(self):
+        exchange = FakeExchange()
+        await sync_cached_exchange_info(exchange, self.path)
+        self.assertEqual((exchange.downloads, len(exchange.exchange_info)), (1, len(INFOS)))
+
+        exchange = FakeExchange()
+        await sync_cached_exchange_info(exchange, self.path)
+        self.assertEqual((exchange.downloads, len(exchange.exchange_info)), (0, len(INFOS)))
+        self.assertIsNone(exchange.exchange_info_refresh)
+
+        # a stale cache is used right away and refreshed in the background
+        await sync_cached_exchange_info(exchange, self.path, ttl=0)
+        self.assertEqual((exchange.downloads, len(exchange.exchange_info)), (0, len(INFOS)))
+        await exchange.exchange_info_refresh
+        self.assertEqual(exchange.downloads, 1)
+
+    async def test_refresher(self):
+        exchange = FakeExchange()
+        exchange.exchange_info = ExchangeInfo({k: v for k, v in INFOS.items() if k != "BTC/USDT:USDT-PERP"})
+        deltas = []
+        refresher = ExchangeInfoRefresher(exchange, interval=0, cache_path=self.path)
+        refresher.subscribe(deltas.append)
+        refresher.start()
+        while exchange.downloads < 3:
+            await asyncio.sleep(0)
+        await refresher.stop()
+
+        # only the first refresh changed anything
+        self.assertEqual([list(delta.added) for delta in deltas], [["BTC/USDT:USDT-PERP"]])
+        self.assertEqual(dict(exchange.exchange_info), INFOS)
+        self.assertEqual(len(load_exchange_info(self.path, "binance")[0]), len(INFOS))
+        self.assertFalse(refresher.running)
+
+    async def test_failing_listener(self):
+        exchange = FakeExchange()
+        deltas = []
+
+        def fail(delta):
+            raise ValueError("listener")
+
+        refresher = ExchangeInfoRefresher(exchange, interval=0)
+        refresher.subscribe(fail)
+        refresher.subscribe(deltas.append)
+        refresher.start()
+        while exchange.downloads < 3:
+            await asyncio.sleep(0)
+        self.assertTrue(refresher.running)
+        await refresher.stop()
+
+        self.assertEqual(len(deltas), 1)
+        self.assertIsNone(refresher.last_error)
+
+    async def test_close_stops_background_tasks(self):
+        save_exchange_info(self.path, "binance", ExchangeInfo(INFOS))
+        exchange = FakeAdaptor()
+        await exchange.sync_exchange_info(cache_path=self.path, cache_ttl=0)
+        download = exchange.exchange_info_refresh
+        refresher = exchange.start_exchange_info_refresher(interval=60)
+
+        await exchange.close()
+        self.assertTrue(exchange.closed)
+        self.assertTrue(download.done())
+        self.assertFalse(refresher.running)
+        self.assertIsNone(exchange.exchange_info_refresh)
+
+
+class TestParserSpec(unittest.TestCase):
+    def test_compiled_spec(self):
+        calls = []
+
+        def split(x):
+            calls.append(x)
+            return x["pair"].split("-")
+
+        spec = ParserSpec(
+            {
+                "active": (lambda x: x["status"] == 1),
+                "is_spot": False,
+                "base": (lambda x, pair: pair[0]),
+                "quote": (lambda x, pair: pair[1]),
+            },
+            shared={"pair": split},
+        )
+        data = {"status": 1, "pair": "BTC-USDT"}
+        result = {"active": True, "is_spot": False, "base": "BTC", "quote": "USDT"}
+        self.assertEqual(spec.convert(data), result)
+        self.assertEqual(BinanceParser().get_result_with_parser(data, spec), result)
+        self.assertEqual(len(calls), 2)
+
+        with self.assertRaises(ValueError):
+            ParserSpec({"base": (lambda x, unknown: unknown)})
+
+    def test_convert_rows_reuses_unchanged_rows(self):
+        calls = []
+
+        def base(x):
+            calls.append(x["pair"])
+            return x["pair"].split("-")[0]
+
+        spec = ParserSpec({"base": base, "active": (lambda x: x["status"] == 1)})
+        rows = [{"status": 1, "pair": "BTC-USDT"}, {"status": 1, "pair": "ETH-USDT"}]
+        parser = BinanceParser()
+        self.assertEqual(parser.get_results_with_parser(rows, spec), [spec.convert(row) for row in rows])
+        calls.clear()
+
+        # the same payload, then an equal one, are not converted again
+        parser.get_results_with_parser(rows, spec)
+        parser.get_results_with_parser([dict(row) for row in rows], spec)
+        self.assertEqual(calls, [])
+
+        # only the changed and the new rows are
+        changed = [{"status": 0, "pair": "BTC-USDT"}, rows[1], {"status": 1, "pair": "SOL-USDT"}]
+        results = parser.get_results_with_parser(changed, spec)
+        self.assertEqual(calls, ["BTC-USDT", "SOL-USDT"])
+        self.assertEqual([result["active"] for result in results], [False, True, True])
+
+        # results are copies, changing one does not change the next call's
+        results[1]["active"] = False
+        self.assertTrue(parser.get_results_with_parser(changed, spec)[1]["active"])
+
+        # a different raw_data policy converts again
+        with raw_data_policy("none"):
+            parser.get_results_with_parser(changed, spec)
+        self.assertEqual(len(calls), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
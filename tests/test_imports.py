@@ -0,0 +1,31 @@
+import subprocess
+import sys
+import unittest
+
+import cex_adaptors
+
+
+class TestImports(unittest.TestCase):
+    def test_registry(self):
+        from cex_adaptors.okx import Okx
+
+        self.assertIs(cex_adaptors.get_exchange_class("okx"), Okx)
+        self.assertIs(cex_adaptors.Okx, Okx)
+        with self.assertRaises(ValueError):
+            cex_adaptors.get_exchange_class("ftx")
+        with self.assertRaises(AttributeError):
+            cex_adaptors.Ftx
+
+    def test_lazy_imports(self):
+        # a fresh interpreter, this one may have imported anything already
+        script = (
+            "import sys, cex_adaptors\n"
+            "assert [m for m in sys.modules if m.startswith('cex_adaptors.')] == []\n"
+            "for name in cex_adaptors.EXCHANGES: cex_adaptors.get_exchange_class(name)\n"
+            "assert 'pandas' not in sys.modules\n"
+        )
+        subprocess.run([sys.executable, "-c", script], check=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
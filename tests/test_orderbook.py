@@ -0,0 +1,67 @@
+import unittest
+
+import numpy as np
+
+from cex_adaptors.orderbook import OrderBook
+from cex_adaptors.parsers.okx import OkxParser
+from cex_adaptors.utils import get_depth_limit
+
+INFO = {"is_spot": True, "is_margin": False, "is_futures": False, "is_perp": False, "multiplier": 1}
+INFO.update({"base": "BTC", "quote": "USDT", "settle": "USDT"})
+ASKS = [["10.2", "1", "0", "4"], ["10.1", "2", "0", "3"], ["10.3", "1", "0", "1"]]
+BIDS = [["10", "1", "0", "2"], ["9.9", "3", "0", "5"]]
+
+
+class TestOrderBook(unittest.TestCase):
+    def setUp(self):
+        self.book = OrderBook.from_levels(ASKS, BIDS, "BTC/USDT:USDT", 0, order_number=3)
+
+    def test_sorted_and_truncated(self):
+        self.assertEqual(self.book.asks.shape, (3, 2))
+        self.assertEqual(self.book.asks[:, 0].tolist(), [10.1, 10.2, 10.3])
+        self.assertEqual(self.book.ask_orders.tolist(), [3, 4, 1])
+
+        book = OrderBook.from_levels(ASKS, BIDS, "BTC/USDT:USDT", 0, depth=1)
+        self.assertEqual(book.asks.tolist(), [[10.1, 2.0]])
+        self.assertEqual(book.bids.tolist(), [[10.0, 1.0]])
+        self.assertEqual(self.book.truncate(1).asks.tolist(), book.asks.tolist())
+
+        # levels past `depth` of a sorted side are never converted beyond their price
+        asks = [["10.1", "2", "0", "3"], ["10.2", "n/a", "0", "n/a"]]
+        book = OrderBook.from_levels(asks, BIDS, "BTC/USDT:USDT", 0, depth=1, order_number=3)
+        self.assertEqual(book.asks.tolist(), [[10.1, 2.0]])
+        self.assertEqual(book.ask_orders.tolist(), [3])
+
+    def test_queries(self):
+        self.assertEqual(self.book.best_ask, 10.1)
+        self.assertEqual(self.book.best_bid, 10.0)
+        self.assertAlmostEqual(self.book.mid, 10.05)
+        self.assertAlmostEqual(self.book.spread, 0.1)
+        self.assertEqual(self.book.cumulative_depth("bids").tolist(), [1.0, 4.0])
+        self.assertAlmostEqual(self.book.vwap(2.5, "asks"), (10.1 * 2 + 10.2 * 0.5) / 2.5)
+        self.assertTrue(np.isnan(self.book.vwap(10, "asks")))
+
+        empty = OrderBook.from_levels([], [], "BTC/USDT:USDT", 0)
+        self.assertEqual(empty.asks.shape, (0, 2))
+        self.assertTrue(np.isnan(empty.mid))
+
+    def test_parser_dict_format(self):
+        parser = OkxParser()
+        response = {"code": "0", "data": [{"asks": ASKS, "bids": BIDS, "ts": "1"}]}
+        result = parser.parse_orderbook(response, INFO, depth=2)
+        self.assertEqual(
+            result["asks"],
+            [{"price": 10.1, "volume": 2.0, "order_number": 3}, {"price": 10.2, "volume": 1.0, "order_number": 4}],
+        )
+        self.assertIsInstance(parser.parse_orderbook(response, INFO, as_array=True), OrderBook)
+
+    def test_depth_limit(self):
+        tiers = [5, 10, 20, 50, 100, 500, 1000, 5000]
+        self.assertEqual([get_depth_limit(depth, tiers) for depth in [1, 5, 6, 101, 5000]], [5, 5, 10, 500, 5000])
+        self.assertIsNone(get_depth_limit(None, tiers))
+        self.assertIsNone(get_depth_limit(5001, tiers))
+        self.assertEqual(get_depth_limit(250, range(1, 401)), 250)
+
+
+if __name__ == "__main__":
+    unittest.main()
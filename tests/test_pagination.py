@@ -0,0 +1,252 @@
+import asyncio
+import unittest
+from unittest import IsolatedAsyncioTestCase
+
+from cex_adaptors.bybit import Bybit
+from cex_adaptors.pagination import (
+    HistoryMixin,
+    PageAccumulator,
+    fetch_windows,
+    get_interval_ms,
+    iter_completed,
+    iter_windows,
+    plan_funding_windows,
+    plan_windows,
+)
+from cex_adaptors.parsers.binance import BinanceParser
+from cex_adaptors.records import FundingRate
+
+INFO = {"is_spot": True, "is_margin": False, "is_futures": False, "is_perp": False, "multiplier": 1}
+INFO.update({"base": "BTC", "quote": "USDT", "settle": "USDT"})
+
+
+def make_rates(timestamps: list) -> list:
+    return [FundingRate(timestamp=t, instrument_id="BTC/USDT:USDT-PERP", funding_rate=t / 1e6) for t in timestamps]
+
+
+MINUTE = 60 * 1000
+LISTING = 1_700_000_000_000 // MINUTE * MINUTE
+
+
+def make_klines(timestamps: list) -> list:
+    return [[t, "1.0", "2.0", "0.5", "1.5", "10.0", t + 59999, "15.0", 7, "5.0", "7.5", "0"] for t in timestamps]
+
+
+class TestPageAccumulator(unittest.TestCase):
+    def test_backward_pages(self):
+        results = PageAccumulator()
+        self.assertEqual(results.add(make_rates([400, 300, 200])), 3)
+        self.assertEqual((results.page_start, results.page_end), (200, 400))
+        self.assertEqual(results.add(make_rates([200, 100])), 1)
+        self.assertEqual(results.add(make_rates([0])[0]), 1)
+        self.assertEqual((results.page_start, results.start, results.end), (0, 0, 400))
+        self.assertEqual(len(results), 5)
+
+        self.assertEqual([v.timestamp for v in results.get_results()], [0, 100, 200, 300, 400])
+        self.assertEqual([v.timestamp for v in results.get_results(100, 300)], [100, 200, 300])
+        self.assertEqual([v.timestamp for v in results.get_results(num=2)], [300, 400])
+
+    def test_overlapping_pages(self):
+        results = PageAccumulator()
+        for page in [[0, 300, 600], [100, 400], [200, 500]]:
+            results.add(make_rates(page))
+        self.assertEqual([v["timestamp"] for v in results.get_results()], [0, 100, 200, 300, 400, 500, 600])
+
+        results.add([])
+        self.assertIsNone(results.page_start)
+        self.assertEqual(PageAccumulator().get_results(), [])
+
+    def test_candle_frames(self):
+        parser = BinanceParser()
+        results = PageAccumulator()
+        for timestamps in [[240000, 180000, 120000], [120000, 60000, 0]]:
+            results.add(parser.parse_candle_frame(make_klines(timestamps), INFO, "spot", "1m"))
+
+        self.assertEqual(results.get_results().timestamp.tolist(), [0, 60000, 120000, 180000, 240000])
+        self.assertEqual(results.get_results(60000, 180000).timestamp.tolist(), [60000, 120000, 180000])
+        self.assertEqual(results.get_results(num=2).timestamp.tolist(), [180000, 240000])
+
+        empty = PageAccumulator()
+        empty.add(parser.parse_candle_frame([], INFO, "spot", "1m"))
+        self.assertEqual(len(empty.get_results()), 0)
+
+
+class TestWindows(IsolatedAsyncioTestCase):
+    def test_plan_windows(self):
+        self.assertEqual(get_interval_ms("4h"), 4 * 60 * 60 * 1000)
+        self.assertIsNone(get_interval_ms("1M"))
+        self.assertEqual(plan_windows(30000, 330000, "1m", 2), [(60000, 179999), (180000, 299999), (300000, 330000)])
+        self.assertEqual(plan_windows(0, 100, "1M", 2), [])
+        hour = 60 * 60 * 1000
+        self.assertEqual(plan_funding_windows(5, 3 * hour, 2), [(5, 3 * hour - 1), (3 * hour, 3 * hour)])
+        self.assertEqual(plan_funding_windows(5, 10, 2), [(5, 10)])
+
+    async def test_fetch_windows(self):
+        rates = make_rates(list(range(0, 100 * 60000, 60000)))
+        calls = []
+
+        async def fetch(start: int, end: int):
+            # serves at most 5 rows, fewer than the 10 the windows were planned for
+            calls.append(end)
+            return [v for v in rates if v.timestamp <= end][-5:]
+
+        start, end = 570000, 3570000
+        results = await fetch_windows(fetch, plan_windows(start, end, "1m", 10))
+        self.assertEqual([v.timestamp for v in results.get_results(start, end)], list(range(10 * 60000, end, 60000)))
+        # two 5 row requests per 10 row window
+        self.assertEqual(len(calls), 5 * 2)
+
+    async def test_iter_windows(self):
+        running = []
+
+        async def fetch(start: int, end: int):
+            running.append(start)
+            # later windows finish first
+            await asyncio.sleep((10 - start) / 1000)
+            return [] if start == 3 else [start]
+
+        chunks = []
+        async for chunk in iter_windows(fetch, [(i, i) for i in range(10)], prefetch=4):
+            self.assertLessEqual(len(running) - len(chunks), 4 + 1)
+            chunks.append(chunk)
+        self.assertEqual(chunks, [[i] for i in range(10) if i != 3])
+
+        running.clear()
+        async for chunk in iter_windows(fetch, [(i, i) for i in range(10)], prefetch=2):
+            break
+        self.assertEqual(running, [0, 1])
+
+    async def test_iter_completed(self):
+        running, peak, reported = set(), [], []
+
+        async def fetch(key: int):
+            running.add(key)
+            peak.append(len(running))
+            try:
+                await asyncio.sleep((10 - key) / 1000)
+            finally:
+                running.discard(key)
+            if key == 7:
+                raise ValueError(key)
+            return key * 2
+
+        results = [
+            item
+            async for item in iter_completed(
+                fetch, range(10), limit=3, progress=lambda *args: reported.append(args), return_exceptions=True
+            )
+        ]
+        self.assertEqual(max(peak), 3)
+        self.assertEqual(sorted(key for key, _ in results), list(range(10)))
+        self.assertIsInstance(dict(results)[7], ValueError)
+        self.assertEqual(dict(results)[4], 8)
+        self.assertEqual([args[1:] for args in reported], [(i, 10) for i in range(1, 11)])
+
+        with self.assertRaises(ValueError):
+            async for _ in iter_completed(fetch, range(10), limit=3):
+                pass
+        await asyncio.sleep(0)
+        self.assertEqual(running, set())
+
+
+class FakeAdaptor(HistoryMixin):
+    CANDLESTICK_LIMIT = 2
+    FUNDING_RATE_LIMIT = 8
+
+    def __init__(self):
+        self.calls = []
+
+    async def get_history_candlesticks(self, instrument_id, interval, start, end, as_array=False):
+        self.calls.append((instrument_id, start, end))
+        return [instrument_id, start]
+
+    async def get_history_funding_rate(self, instrument_id, start, end):
+        return make_rates(range(start, end + 1, 8 * 3600 * 1000))
+
+
+class TestHistoryMixin(IsolatedAsyncioTestCase):
+    async def test_iter_history_candlesticks(self):
+        adaptor = FakeAdaptor()
+        chunks = [chunk async for chunk in adaptor.iter_history_candlesticks("BTC", "1m", 0, 5 * 60000)]
+        self.assertEqual([start for _, start in chunks], [start for _, start, _ in adaptor.calls])
+        self.assertEqual(len(chunks), 3)
+
+    async def test_many_from_generator(self):
+        adaptor = FakeAdaptor()
+        results = await adaptor.get_history_candlesticks_many((i for i in ["BTC", "ETH"]), "1m", 0, 60000)
+        self.assertEqual(list(results), ["BTC", "ETH"])
+        self.assertEqual(results["ETH"], ["ETH", 0])
+
+    async def test_many_shares_request_slots(self):
+        running, peak = [0], []
+
+        class WindowedAdaptor(FakeAdaptor):
+            async def get_history_candlesticks(self, instrument_id, interval, start, end, as_array=False):
+                async def fetch(window_start: int, window_end: int):
+                    running[0] += 1
+                    peak.append(running[0])
+                    await asyncio.sleep(0.001)
+                    running[0] -= 1
+                    return make_rates(range(window_start, window_end + 1, 60000))
+
+                windows = plan_windows(start, end, interval, self.CANDLESTICK_LIMIT)
+                return (await fetch_windows(fetch, windows)).get_results(start, end)
+
+        results = await WindowedAdaptor().get_history_candlesticks_many(
+            ["BTC", "ETH", "SOL", "XRP"], "1m", 0, 40 * 60000, concurrency=3
+        )
+        self.assertEqual(max(peak), 3)
+        self.assertEqual([len(candlesticks) for candlesticks in results.values()], [41] * 4)
+
+    async def test_iter_history_funding_rate(self):
+        adaptor = FakeAdaptor()
+        hour = 3600 * 1000
+        chunks = [chunk async for chunk in adaptor.iter_history_funding_rate("BTC", 0, 48 * hour)]
+        self.assertGreater(len(chunks), 1)
+
+        adaptor.FUNDING_RATE_LIMIT = None
+        chunks = [chunk async for chunk in adaptor.iter_history_funding_rate("BTC", 0, 48 * hour)]
+        self.assertEqual(len(chunks), 1)
+
+
+class ListedBybit(Bybit):
+    """
+    Bybit serving 1m candlesticks from `LISTING` on, newest first like the exchange
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.exchange_info = {
+            "BTC/USDT:USDT-PERP": dict(INFO, is_spot=False, is_perp=True, is_linear=True, contract_size=1)
+        }
+        self.exchange_info["BTC/USDT:USDT-PERP"]["raw_data"] = {"symbol": "BTCUSDT"}
+
+    async def _get_klines(self, symbol, interval, category=None, start=None, end=None, limit=None):
+        timestamps = range(end // MINUTE * MINUTE, max(LISTING - MINUTE, end - limit * MINUTE), -MINUTE)
+        rows = [[str(t), "1", "2", "0.5", "1.5", "10", "15"] for t in timestamps]
+        return {"retCode": 0, "result": {"list": rows}, "time": end}
+
+
+class TestHistoryBeforeListing(IsolatedAsyncioTestCase):
+    async def test_windows_before_listing(self):
+        bybit = ListedBybit()
+        start, end = LISTING - 5000 * MINUTE, LISTING + 1500 * MINUTE
+        for as_array in (False, True):
+            candlesticks = await bybit.get_history_candlesticks(
+                "BTC/USDT:USDT-PERP", "1m", start, end, as_array=as_array
+            )
+            timestamps = [
+                int(t) for t in (candlesticks.timestamp if as_array else [c["timestamp"] for c in candlesticks])
+            ]
+            self.assertEqual(timestamps, list(range(LISTING, end + 1, MINUTE)))
+
+    async def test_stream_before_listing(self):
+        bybit = ListedBybit()
+        start, end = LISTING - 5000 * MINUTE, LISTING + 1500 * MINUTE
+        chunks = [chunk async for chunk in bybit.iter_history_candlesticks("BTC/USDT:USDT-PERP", "1m", start, end)]
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual([c["timestamp"] for chunk in chunks for c in chunk], list(range(LISTING, end + 1, MINUTE)))
+
+
+if __name__ == "__main__":
+    unittest.main()
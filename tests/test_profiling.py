@@ -0,0 +1,35 @@
+import tracemalloc
+import unittest
+
+from cex_adaptors.profiling import profile_allocations
+
+
+def allocate() -> list:
+    return [bytearray(1024) for _ in range(1000)]
+
+
+class TestProfileAllocations(unittest.TestCase):
+    def test_report(self):
+        with profile_allocations(limit=3) as report:
+            kept = allocate()
+
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertGreaterEqual(report.size, 1000 * 1024)
+        self.assertGreaterEqual(report.peak, report.size)
+        self.assertLessEqual(len(report.stats), 3)
+        self.assertEqual(report.stats[0].traceback[0].filename, __file__)
+        self.assertIn(__file__, str(report))
+        del kept
+
+    def test_already_tracing(self):
+        tracemalloc.start()
+        try:
+            with profile_allocations():
+                allocate()
+            self.assertTrue(tracemalloc.is_tracing())
+        finally:
+            tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import asyncio
+import time
+import unittest
+from unittest import IsolatedAsyncioTestCase
+
+from aiohttp import web
+
+from cex_adaptors.exchanges.binance import BinanceLinear, BinanceSpot
+from cex_adaptors.exchanges.gateio import GateioUnified
+from cex_adaptors.exchanges.okx import OkxUnified
+from cex_adaptors.exchanges.rate_limit import RateLimiter, TokenBucket
+
+
+class TestTokenBucket(IsolatedAsyncioTestCase):
+    async def test_reserve_within_capacity(self):
+        bucket = TokenBucket(10, 1)
+        self.assertEqual(bucket.reserve(4), 0)
+        self.assertEqual(bucket.reserve(6), 0)
+        self.assertGreater(bucket.reserve(5), 0)
+
+    async def test_acquire_queues_without_blocking_loop(self):
+        limiter = RateLimiter({"default": (5, 0.5)})
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.05)
+
+        start = time.monotonic()
+        await asyncio.gather(ticker(), *[limiter.acquire({"default": 1}) for _ in range(10)])
+        self.assertGreaterEqual(time.monotonic() - start, 0.45)
+        self.assertEqual(len(ticks), 5)
+        self.assertLess(ticks[1] - ticks[0], 0.2)
+
+    async def test_cancelled_waiter_refunds(self):
+        limiter = RateLimiter({"default": (1, 10)})
+        await limiter.acquire({"default": 1})
+        task = asyncio.ensure_future(limiter.acquire({"default": 1}))
+        await asyncio.sleep(0)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertAlmostEqual(limiter.get_bucket("default").tokens, 0, places=1)
+
+    async def test_sync_follows_server_budget(self):
+        bucket = TokenBucket(100, 60)
+        bucket.reserve(10)
+        bucket.sync(30)
+        self.assertAlmostEqual(bucket.tokens, 30, places=0)
+        bucket.sync(90, limit=120)
+        self.assertEqual(bucket.capacity, 120)
+        self.assertAlmostEqual(bucket.tokens, 90, places=0)
+        bucket.sync(0, reset_in=5)
+        self.assertAlmostEqual(bucket.reserve(1), 5 + 1 / bucket.rate, places=1)
+
+    async def test_observe_learns_endpoint_bucket(self):
+        limiter = RateLimiter({"default": (600, 5)})
+        limiter.observe("/v5/market/tickers", 0, limit=10, reset_in=1)
+        self.assertEqual(limiter.get_bucket("/v5/market/tickers").capacity, 10)
+        self.assertGreaterEqual(limiter.get_bucket("/v5/market/tickers").reserve(1), 1)
+
+    async def test_reported_budget_includes_answered_request(self):
+        async def handler(request):
+            # the exchange reports the weight used including this request's own 20
+            return web.json_response({}, headers={"X-MBX-USED-WEIGHT-1M": "120"})
+
+        app = web.Application()
+        app.router.add_route("*", "/{path:.*}", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+        client = BinanceSpot(api_key=None, api_secret=None)
+        client._rate_limiter = RateLimiter(client.RATE_LIMITS)
+        try:
+            await client._get(url + "/api/v3/exchangeInfo")
+        finally:
+            await client.close()
+            await runner.cleanup()
+        bucket = client.rate_limiter.get_bucket("default")
+        self.assertAlmostEqual(bucket.tokens, 6000 - 120, places=0)
+        self.assertEqual(bucket.in_flight, 0)
+
+
+class TestEndpointWeights(unittest.TestCase):
+    def test_binance_weights(self):
+        spot = BinanceSpot(api_key=None, api_secret=None)
+        self.assertEqual(spot._get_request_weights("/api/v3/ticker/24hr", {}), {"default": 80})
+        self.assertEqual(spot._get_request_weights("/api/v3/depth", {"limit": 5000}), {"default": 250})
+        self.assertEqual(spot._get_request_weights("/sapi/v1/margin/account", {}), {"sapi": 10})
+        linear = BinanceLinear()
+        self.assertEqual(linear._get_request_weights("/fapi/v1/klines", {"limit": 1000}), {"default": 5})
+
+    def test_per_endpoint_buckets(self):
+        okx = OkxUnified(api_key=None, api_secret=None, passphrase=None)
+        self.assertEqual(
+            okx._get_request_weights("/api/v5/market/candles", {}), {"default": 1, "/api/v5/market/candles": 1}
+        )
+        gateio = GateioUnified()
+        self.assertEqual(
+            gateio._get_request_weights("/api/v4/futures/usdt/tickers", {}),
+            {"default": 1, "/api/v4/futures/{}/tickers": 1},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import pickle
+import unittest
+
+from cex_adaptors.exchange_info import ExchangeInfo
+from cex_adaptors.parsers.binance import BinanceParser
+from cex_adaptors.raw_data import LazyRawData, raw_data_policy, set_raw_data_policy
+
+SYMBOL = {
+    "symbol": "BTCUSDT",
+    "status": "TRADING",
+    "baseAsset": "BTC",
+    "quoteAsset": "USDT",
+    "isMarginTradingAllowed": True,
+    "filters": [{"filterType": "PRICE_FILTER", "tickSize": "0.01"}],
+}
+TICKER = {
+    "symbol": "BTCUSDT",
+    "lastPrice": "42000.1",
+    "openPrice": "41000.0",
+    "highPrice": "43000.0",
+    "lowPrice": "40000.0",
+    "volume": "1000.0",
+    "quoteVolume": "42000000.0",
+    "priceChange": "1000.1",
+    "priceChangePercent": "2.439",
+    "openTime": 1699913600000,
+    "closeTime": 1700000000000,
+}
+
+
+class TestRawDataPolicy(unittest.TestCase):
+    def setUp(self):
+        self.parser = BinanceParser()
+
+    def tearDown(self):
+        set_raw_data_policy("full")
+
+    def parse_info(self) -> ExchangeInfo:
+        return ExchangeInfo(
+            self.parser.parse_exchange_info({"symbols": [SYMBOL]}, self.parser.spot_exchange_info_parser)
+        )
+
+    def parse_ticker(self) -> dict:
+        return self.parser.parse_ticker(TICKER, self.parse_info()["BTC/USDT:USDT"])
+
+    def test_full_by_default(self):
+        self.assertIs(self.parse_ticker()["raw_data"], TICKER)
+
+    def test_none_keeps_lookup_symbols(self):
+        with raw_data_policy("none"):
+            info = self.parse_info()
+            ticker = self.parse_ticker()
+        self.assertIsNone(ticker["raw_data"])
+        self.assertEqual(info["BTC/USDT:USDT"]["raw_data"], {"symbol": "BTCUSDT"})
+        self.assertEqual(info.get_ids_by_raw_symbol("BTCUSDT"), {"BTC/USDT:USDT"})
+        # the policy only applies inside the block
+        self.assertIs(self.parse_ticker()["raw_data"], TICKER)
+
+    def test_whitelist(self):
+        set_raw_data_policy(["lastPrice", "closeTime"])
+        self.assertEqual(self.parse_ticker()["raw_data"], {"lastPrice": "42000.1", "closeTime": 1700000000000})
+
+    def test_lazy(self):
+        set_raw_data_policy("lazy")
+        info = self.parse_info()
+        raw_data = info["BTC/USDT:USDT"]["raw_data"]
+        self.assertIsInstance(raw_data, LazyRawData)
+        self.assertEqual(raw_data["symbol"], "BTCUSDT")
+        self.assertEqual(raw_data["filters"], SYMBOL["filters"])
+        self.assertEqual(raw_data, SYMBOL)
+        self.assertEqual(info.get_ids_by_raw_symbol("BTCUSDT"), {"BTC/USDT:USDT"})
+        self.assertEqual(pickle.loads(pickle.dumps(info)), info)
+
+    def test_invalid_policy(self):
+        with self.assertRaises(ValueError):
+            set_raw_data_policy("partial")
+
+
+if __name__ == "__main__":
+    unittest.main()
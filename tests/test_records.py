@@ -0,0 +1,76 @@
+import json
+import pickle
+import unittest
+from collections.abc import Mapping
+
+import pandas as pd
+
+from cex_adaptors.parsers.binance import BinanceParser
+from cex_adaptors.records import Candle, OrderBookLevel, Ticker
+
+INFO = {"is_spot": True, "is_margin": False, "is_futures": False, "is_perp": False, "multiplier": 1}
+INFO.update({"base": "BTC", "quote": "USDT", "settle": "USDT"})
+KLINE = [0, "1.0", "2.0", "0.5", "1.5", "10.0", 59999, "15.0", 7, "5.0", "7.5", "0"]
+
+
+class TestRecords(unittest.TestCase):
+    def test_mapping_compatible(self):
+        level = OrderBookLevel(price=1.5, volume=2.0)
+        expected = {"price": 1.5, "volume": 2.0, "order_number": None}
+        self.assertEqual(level, expected)
+        self.assertEqual(dict(level), expected)
+        self.assertEqual(level.to_dict(), expected)
+        self.assertEqual(level["price"], level.price)
+        self.assertEqual(level.get("missing", 0), 0)
+
+        level["volume"] = 3.0
+        self.assertEqual(level.volume, 3.0)
+        with self.assertRaises(KeyError):
+            level["missing"] = 1
+        with self.assertRaises(AttributeError):
+            level.missing = 1
+
+    def test_dict_compatibility(self):
+        tickers = [Ticker(timestamp=i, instrument_id="BTC/USDT:USDT", last=10.5 + i) for i in range(2)]
+
+        # records are mappings but not dicts, JSON goes through `to_dict`
+        self.assertIsInstance(tickers[0], Mapping)
+        self.assertNotIsInstance(tickers[0], dict)
+        with self.assertRaises(TypeError):
+            json.dumps(tickers[0])
+        self.assertEqual(json.loads(json.dumps([ticker.to_dict() for ticker in tickers])), tickers)
+        self.assertEqual(json.loads(json.dumps(tickers[0], default=dict)), tickers[0])
+
+        # a DataFrame of records holds the same data as one of dicts, columns sorted by name
+        df = pd.DataFrame(tickers)
+        expected = pd.DataFrame([ticker.to_dict() for ticker in tickers])
+        pd.testing.assert_frame_equal(df, expected[sorted(expected.columns)])
+        self.assertEqual(list(pd.DataFrame.from_records([t.to_dict() for t in tickers]).columns), list(Ticker.FIELDS))
+
+        with self.assertRaises(KeyError):
+            tickers[0]["exchange"] = "binance"
+        with self.assertRaises(TypeError):
+            del tickers[0]["raw_data"]
+
+    def test_interned_and_picklable(self):
+        candle = Candle(timestamp=0, instrument_id="".join(["BTC/USDT", ":USDT"]), interval="1m", close=1.0)
+        candle.update({"market_type": "".join(["sp", "ot"])})
+        self.assertIs(candle.instrument_id, Candle(instrument_id="BTC/USDT:USDT").instrument_id)
+        self.assertIs(candle.market_type, "spot")
+        self.assertEqual(pickle.loads(pickle.dumps(candle)), candle)
+        self.assertEqual(candle.copy(), candle)
+
+    def test_parser_records(self):
+        ticker = Ticker(timestamp=1, instrument_id="BTC/USDT:USDT", last=10.5)
+        df = pd.DataFrame([ticker, ticker])
+        self.assertEqual(set(df.columns), set(Ticker.FIELDS))
+        self.assertEqual(df["last"].tolist(), [10.5, 10.5])
+
+        candles = BinanceParser().parse_candlesticks([KLINE, KLINE], INFO, "spot", "1m")
+        self.assertIsInstance(candles[0], Candle)
+        self.assertEqual(candles[0]["close"], 1.5)
+        self.assertEqual(candles[0].instrument_id, "BTC/USDT:USDT")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+
+from cex_adaptors.exceptions import HTTPError, NetworkError, RateLimitError, ServerError
+from cex_adaptors.exchanges.retry import RetryPolicy, parse_retry_after
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_should_retry(self):
+        policy = RetryPolicy(max_retries=2)
+        self.assertTrue(policy.should_retry(ServerError(503, "Service Unavailable", ""), 0, idempotent=True))
+        self.assertTrue(policy.should_retry(NetworkError("reset"), 1, idempotent=True))
+        self.assertFalse(policy.should_retry(ServerError(503, "Service Unavailable", ""), 2, idempotent=True))
+        self.assertFalse(policy.should_retry(HTTPError(400, "Bad Request", ""), 0, idempotent=True))
+        self.assertFalse(policy.should_retry(ServerError(503, "Service Unavailable", ""), 0, idempotent=False))
+        self.assertTrue(RetryPolicy(retry_post=True).should_retry(NetworkError("reset"), 0, idempotent=False))
+
+    def test_delay(self):
+        policy = RetryPolicy(backoff=1, max_backoff=5, jitter=False)
+        self.assertEqual([policy.get_delay(NetworkError(), attempt) for attempt in range(4)], [1, 2, 4, 5])
+        error = RateLimitError(429, "Too Many Requests", "", retry_after=10)
+        self.assertEqual(policy.get_delay(error, 0), 10)
+        self.assertFalse(RetryPolicy(max_retry_after=5).should_retry(error, 0, idempotent=True))
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("3"), 3)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
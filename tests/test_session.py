@@ -0,0 +1,90 @@
+import asyncio
+import unittest
+from unittest import IsolatedAsyncioTestCase
+
+from aiohttp import web
+
+from cex_adaptors.exchanges.session import SessionConfig, SessionRegistry, warm_up
+
+
+class TestSessionRegistry(IsolatedAsyncioTestCase):
+    async def test_shared_until_last_release(self):
+        registry = SessionRegistry()
+        first, second = registry.acquire(), registry.acquire()
+        self.assertIs(first, second)
+
+        await registry.release(first)
+        self.assertFalse(first.closed)
+        await registry.release(second)
+        self.assertTrue(first.closed)
+
+        # a new session is created once the shared one was closed
+        third = registry.acquire()
+        self.assertIsNot(third, first)
+        await registry.release(third)
+
+    async def test_host_semaphores(self):
+        registry = SessionRegistry(SessionConfig(host_limits={"api.binance.com": 2}))
+        semaphore = registry.get_host_semaphore("api.binance.com")
+        self.assertIs(registry.get_host_semaphore("api.binance.com"), semaphore)
+        self.assertIsNone(registry.get_host_semaphore("www.okx.com"))
+
+        async with semaphore, semaphore:
+            self.assertTrue(semaphore.locked())
+
+    async def test_warm_up(self):
+        hits = []
+
+        async def handler(request):
+            hits.append((request.method, request.path))
+            return web.Response()
+
+        app = web.Application()
+        app.router.add_route("*", "/{path:.*}", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+        registry = SessionRegistry()
+        session = registry.acquire()
+        try:
+            # unreachable urls are skipped, not raised
+            await warm_up(session, [url + "/a", url + "/b", "http://127.0.0.1:1/"], connections=2)
+        finally:
+            await registry.release(session)
+            await runner.cleanup()
+        self.assertEqual(sorted(hits), [("HEAD", "/a")] * 2 + [("HEAD", "/b")] * 2)
+
+
+class TestSessionRegistryLoops(unittest.TestCase):
+    def test_session_per_loop(self):
+        registry = SessionRegistry()
+
+        async def acquire():
+            session = registry.acquire()
+            registry.get_host_semaphore("api.binance.com")
+            return session
+
+        # the first loop closes without releasing its session
+        first = asyncio.run(acquire())
+        self.assertEqual(len(registry._sessions), 1)
+
+        async def acquire_and_release():
+            session = await acquire()
+            self.assertEqual(len(registry._sessions), 1)
+            self.assertEqual(len(registry._host_semaphores), 1)
+            await registry.release(session)
+            return session
+
+        second = asyncio.run(acquire_and_release())
+        self.assertIsNot(second, first)
+        self.assertTrue(first.closed)
+        self.assertTrue(second.closed)
+        self.assertEqual(registry._sessions, {})
+        self.assertEqual(registry._refs, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
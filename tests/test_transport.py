@@ -0,0 +1,143 @@
+import asyncio
+import unittest
+from unittest import IsolatedAsyncioTestCase, mock
+
+from aiohttp import web
+
+from cex_adaptors.exceptions import DecodeError, ServerError
+from cex_adaptors.exchanges.bybit import BybitUnified
+from cex_adaptors.exchanges.cache import ResponseCache
+from cex_adaptors.exchanges.decoder import DECODERS
+from cex_adaptors.exchanges.okx import OkxUnified
+from cex_adaptors.exchanges.retry import RetryPolicy
+
+
+class TestTransport(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.hits = []
+
+        async def handler(request):
+            self.hits.append(request.path_qs)
+            if request.path == "/flaky" and len(self.hits) < 3:
+                return web.Response(status=503, text="busy")
+            if request.path.startswith("/api/v5/trade/") and self.hits.count(request.path_qs) < 2:
+                return web.Response(status=503, text="busy")
+            if request.path == "/invalid":
+                return web.Response(body=b'{"path": "/inv')
+            await asyncio.sleep(0.05)
+            return web.json_response({"path": request.path_qs})
+
+        app = web.Application()
+        app.router.add_route("*", "/{path:.*}", handler)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+        self.client = BybitUnified(retry_policy=RetryPolicy(backoff=0.01))
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.runner.cleanup()
+
+    async def test_identical_gets_are_coalesced(self):
+        results = await asyncio.gather(
+            *[self.client._get(self.url + "/v5/market/tickers", params={"category": "spot"}) for _ in range(5)],
+            self.client._get(self.url + "/v5/market/tickers", params={"category": "linear"}),
+        )
+        self.assertEqual(len(self.hits), 2)
+        self.assertEqual(results[0], {"path": "/v5/market/tickers?category=spot"})
+        self.assertEqual(self.client._in_flight, {})
+
+    async def test_get_retried_post_not(self):
+        with self.assertRaises(ServerError):
+            await self.client._post(self.url + "/flaky")
+        self.assertEqual(len(self.hits), 1)
+        self.assertEqual(await self.client._get(self.url + "/flaky"), {"path": "/flaky"})
+        self.assertEqual(len(self.hits), 3)
+
+    async def test_idempotent_post_retried(self):
+        client = OkxUnified("key", "secret", "passphrase", retry_policy=RetryPolicy(backoff=0.01))
+        client.BASE_ENDPOINT = self.url
+        try:
+            with self.assertRaises(ServerError):
+                await client._place_order("BTC-USDT", "buy", "1")
+            self.assertEqual(len(self.hits), 1)
+            self.assertEqual(await client._cancel_order("BTC-USDT", "1"), {"path": self.hits[-1]})
+            self.assertEqual(len(self.hits), 3)
+        finally:
+            await client.close()
+
+    async def test_invalid_json_raises_decode_error(self):
+        for name, decoder in DECODERS.items():
+            with self.subTest(backend=name):
+                self.client.decoder = decoder
+                with self.assertRaisesRegex(DecodeError, f"{self.url}/invalid"):
+                    await self.client._get(self.url + "/invalid")
+
+    async def test_cache_serves_stale_while_revalidating(self):
+        self.client.cache = ResponseCache()
+        self.client.CACHE_TTLS = {"/v5/market/tickers": 0.2}
+        url = self.url + "/v5/market/tickers"
+
+        await self.client._get(url, params={"category": "spot"})
+        await self.client._get(url, params={"category": "spot"})
+        self.assertEqual(len(self.hits), 1)
+
+        await asyncio.sleep(0.25)
+        await self.client._get(url, params={"category": "spot"})
+        await asyncio.sleep(0.1)
+        self.assertEqual(len(self.hits), 2)
+        self.assertEqual(
+            self.client.cache.get_stats(), {"size": 1, "hits": 1, "stale_hits": 1, "misses": 1, "evictions": 0}
+        )
+
+        # endpoints without a TTL are never cached
+        await self.client._get(self.url + "/v5/market/kline")
+        await self.client._get(self.url + "/v5/market/kline")
+        self.assertEqual(len(self.hits), 4)
+
+    async def test_failed_revalidation_keeps_stale_response(self):
+        self.client.cache = ResponseCache()
+        self.client.CACHE_TTLS = {"/v5/market/tickers": 0.1}
+        url = self.url + "/v5/market/tickers"
+        response = await self.client._get(url)
+        await asyncio.sleep(0.15)
+
+        with mock.patch.object(self.client, "_send_with_retry", side_effect=RuntimeError("connection lost")):
+            self.assertIs(await self.client._get(url), response)
+            task = next(iter(self.client._revalidating.values()))
+            await asyncio.wait([task], timeout=1)
+        self.assertTrue(task.done())
+        self.assertIsNone(task.exception())
+        # the stale response is still served, and revalidated again
+        self.assertIs(await self.client._get(url), response)
+        await asyncio.sleep(0.1)
+        self.assertEqual(len(self.hits), 2)
+
+    async def test_unchanged_payload_decoded_once(self):
+        url = self.url + "/v5/market/instruments-info"
+        first = await self.client._get(url, params={"category": "spot"})
+        self.assertIs(await self.client._get(url, params={"category": "spot"}), first)
+        self.assertIsNot(await self.client._get(url, params={"category": "linear"}), first)
+        self.assertEqual(len(self.hits), 3)
+
+        # bodies of endpoints that are not hashed are always decoded again
+        ticker = await self.client._get(self.url + "/v5/market/tickers")
+        self.assertIsNot(await self.client._get(self.url + "/v5/market/tickers"), ticker)
+
+
+class TestResponseCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = ResponseCache(maxsize=2)
+        cache.set(("a",), 1, ttl=10)
+        cache.set(("b",), 2, ttl=10)
+        cache.get(("a",))
+        cache.set(("c",), 3, ttl=10)
+        self.assertEqual(cache.get(("b",)), (None, None))
+        self.assertEqual(cache.get(("a",)), (1, "fresh"))
+        self.assertEqual(cache.evictions, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import asyncio
+import unittest
+from unittest import IsolatedAsyncioTestCase
+
+from cex_adaptors.utils import gather_bounded
+
+
+class TestGatherBounded(IsolatedAsyncioTestCase):
+    async def test_limit_and_order(self):
+        running, peak = set(), []
+
+        async def fetch(key: int):
+            running.add(key)
+            peak.append(len(running))
+            try:
+                # later keys finish first
+                await asyncio.sleep((10 - key) / 1000)
+            finally:
+                running.discard(key)
+            return key * 2
+
+        self.assertEqual(await gather_bounded(*[fetch(key) for key in range(10)], limit=3), [k * 2 for k in range(10)])
+        self.assertEqual(max(peak), 3)
+        self.assertEqual(await gather_bounded(), [])
+
+    async def test_failure_cancels_the_rest(self):
+        started, cancelled = [], []
+
+        async def fetch(key: int):
+            started.append(key)
+            try:
+                await asyncio.sleep(0 if key == 1 else 1)
+            except asyncio.CancelledError:
+                cancelled.append(key)
+                raise
+            if key == 1:
+                raise ValueError(key)
+            return key
+
+        with self.assertRaises(ValueError):
+            await gather_bounded(*[fetch(key) for key in range(10)], limit=3)
+        # every started one was cancelled, the waiting ones never started
+        self.assertLess(len(started), 10)
+        self.assertEqual(sorted(cancelled), sorted(key for key in started if key != 1))
+        self.assertEqual([task for task in asyncio.all_tasks() if task is not asyncio.current_task()], [])
+
+
+if __name__ == "__main__":
+    unittest.main()